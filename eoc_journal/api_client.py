@@ -2,13 +2,9 @@
 A wrapper around the Edx API.
 """
 from __future__ import unicode_literals
-# pylint: disable=wrong-import-position,wrong-import-order
-from future import standard_library  # noqa
-standard_library.install_aliases()  # noqa
-
-from urllib.parse import urlencode
 
 import requests
+from six.moves.urllib.parse import urlencode  # pylint: disable=import-error
 from django.conf import settings
 from edx_rest_api_client.exceptions import HttpClientError
 
@@ -20,6 +16,7 @@ class ApiClient(BaseApiClient):
     Object builds an API client to make calls to the LMS user API.
     """
     API_PATH = '/api/server'
+    METRICS_NAME = 'server_api'
 
     @staticmethod
     def _get_edx_api_key():
@@ -34,8 +31,7 @@ class ApiClient(BaseApiClient):
             return settings.EDX_API_KEY
         return None
 
-    @staticmethod
-    def _get(url, params=None):
+    def _get(self, url, params=None):
         """
         Sends a GET request to the URL and returns the parsed JSON response.
         """
@@ -43,7 +39,10 @@ class ApiClient(BaseApiClient):
 
         if key:
             headers = {'X-Edx-Api-Key': key}
-            return requests.get(url, headers=headers, params=params).json()
+            response = self._request(url, get=requests.get, headers=headers, params=params)
+            data = response.json()
+            self._record_response_size(response, len(response.content))
+            return data
         return None
 
     def get_user_engagement_metrics(self):
@@ -67,9 +66,11 @@ class ApiClient(BaseApiClient):
         the current course.
         """
         try:
-            course = self.client.get(self.api_url + '/courses', params={"depth": 5}).json()
+            response = self._request(self.api_url + '/courses', params={"depth": 5})
+            course = response.json()
         except HttpClientError:
             return None
+        self._record_response_size(response, len(response.content))
 
         return course
 
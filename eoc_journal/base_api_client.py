@@ -2,17 +2,29 @@
 A base client for API integrations.
 """
 from __future__ import unicode_literals
+import time
 from builtins import object
 from django.conf import settings
+from requests.exceptions import Timeout
 
+from .compat import accumulate_custom_attribute
+from .deadline import UpstreamTimeout, timeout as deadline_timeout
+from .stats import record_http_call
 from .utils import build_jwt_edx_client
 
+# Seconds to wait for the LMS APIs to connect and for every read of their responses. The time left
+# before the deadline of the current render is used when it is shorter (see `eoc_journal.deadline`).
+# Can be overridden with the EOC_JOURNAL_API_TIMEOUT Django setting.
+DEFAULT_API_TIMEOUT = 30
+
 
 # pylint: disable=too-few-public-methods,useless-object-inheritance
 class BaseApiClient(object):
     """
     Base API client abstract class.
     """
+    # Name of the API in the custom monitoring attributes recording response sizes.
+    METRICS_NAME = 'api'
 
     def __init__(self, user, course_id):
         """
@@ -33,3 +45,39 @@ class BaseApiClient(object):
         Connect to the REST API, authenticating with a JWT for the current user.
         """
         self.client = build_jwt_edx_client(self.user)
+
+    def _request(self, url, get=None, **kwargs):
+        """
+        Sends a GET request with `get` (the client session by default) and returns the response.
+
+        The call is given the API timeout, or the time left before the current deadline if it is
+        shorter, and raises `UpstreamTimeout` when it times out or the deadline already passed. The
+        time until the response headers were received, and whether the call failed, are recorded in
+        the process statistics of the client class.
+        """
+        get = get or self.client.get
+        timeout = deadline_timeout(getattr(settings, 'EOC_JOURNAL_API_TIMEOUT', DEFAULT_API_TIMEOUT))
+        start = time.time()
+        try:
+            response = get(url, timeout=timeout, **kwargs)
+        except Timeout as error:
+            record_http_call(type(self).__name__, time.time() - start, error=True)
+            raise UpstreamTimeout('{} timed out: {}'.format(url, error))  # pylint: disable=raise-missing-from
+        except Exception:
+            record_http_call(type(self).__name__, time.time() - start, error=True)
+            raise
+        record_http_call(type(self).__name__, time.time() - start, error=response.status_code >= 400)
+        return response
+
+    def _record_response_size(self, response, decoded_bytes=None):
+        """
+        Records the size of a response whose body was read, as received over the network (compressed
+        or not) and, if given, once decoded, in the `eoc_journal_<METRICS_NAME>_response_bytes` and
+        `eoc_journal_<METRICS_NAME>_decoded_bytes` custom monitoring attributes, summed per request.
+        """
+        tell = getattr(response.raw, 'tell', None)
+        response_bytes = tell() if tell is not None else None
+        if isinstance(response_bytes, int):
+            accumulate_custom_attribute('eoc_journal_{}_response_bytes'.format(self.METRICS_NAME), response_bytes)
+        if decoded_bytes is not None:
+            accumulate_custom_attribute('eoc_journal_{}_decoded_bytes'.format(self.METRICS_NAME), decoded_bytes)
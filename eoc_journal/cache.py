@@ -0,0 +1,101 @@
+"""
+Caching helpers built on top of the Django cache.
+"""
+from __future__ import unicode_literals
+import hashlib
+import threading
+import time
+from builtins import object
+from collections import OrderedDict
+
+import six
+from django.core.cache import cache
+
+from .stats import record_cache_lookup
+
+KEY_PREFIX = 'eoc_journal'
+MAX_KEY_LENGTH = 200
+
+
+def make_key(*parts):
+    """
+    Builds a cache key from `parts`.
+
+    Keys which would be too long or contain characters memcached does not accept are hashed.
+    """
+    key = ':'.join([KEY_PREFIX] + [six.text_type(part) for part in parts])
+    if len(key) > MAX_KEY_LENGTH or any(char.isspace() for char in key):
+        key = '{}:{}'.format(KEY_PREFIX, hashlib.md5(key.encode('utf-8')).hexdigest())
+    return key
+
+
+def get_or_set(key, compute, timeout, layer='django'):
+    """
+    Returns the value cached under `key`, calling `compute` and caching its result on a miss.
+
+    Values are wrapped before being cached, so that `None` results are cached as well. Hits and
+    misses are counted under the statistics of `layer`.
+    """
+    cached = cache.get(key)
+    record_cache_lookup(layer, cached is not None)
+    if cached is not None:
+        return cached[0]
+    value = compute()
+    cache.set(key, (value,), timeout)
+    return value
+
+
+def store(key, value, timeout):
+    """
+    Caches `value` under `key`, wrapped as `get_or_set` reads it.
+    """
+    cache.set(key, (value,), timeout)
+
+
+def delete(key):
+    """
+    Removes the value cached under `key`.
+    """
+    cache.delete(key)
+
+
+class LRUCache(object):  # pylint: disable=useless-object-inheritance
+    """
+    Thread-safe in-process cache of the `maxsize` most recently used values.
+
+    Hits and misses are counted under the statistics of the cache `name`.
+    """
+
+    def __init__(self, maxsize, name='lru'):
+        self.maxsize = maxsize
+        self.name = name
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_set(self, key, compute, timeout=None):
+        """
+        Returns the value cached under `key`, calling `compute` and caching its result for
+        `timeout` seconds (forever if None) on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            if key in self._values:
+                expires, value = self._values.pop(key)
+                if expires is None or expires > now:
+                    self._values[key] = (expires, value)
+                    record_cache_lookup(self.name, True)
+                    return value
+        record_cache_lookup(self.name, False)
+        value = compute()
+        with self._lock:
+            self._values[key] = (None if timeout is None else now + timeout, value)
+            while len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+        return value
+
+    def clear(self):
+        """
+        Removes all cached values.
+        """
+        with self._lock:
+            self._values.clear()
@@ -14,3 +14,181 @@ def create_jwt_for_user(user):
     # pylint: disable=import-outside-toplevel
     from openedx.core.djangoapps.oauth_dispatch.jwt import create_jwt_for_user as openedx_create_jwt_for_user
     return openedx_create_jwt_for_user(user)
+
+
+def get_course_version(course_key):
+    """
+    Returns the version of the published course content, which changes whenever the course is published.
+
+    Returns None outside of edx-platform, and an empty string for modulestores which do not
+    version courses (old mongo).
+    """
+    # pylint: disable=import-outside-toplevel
+    try:
+        from xmodule.modulestore import ModuleStoreEnum
+        from xmodule.modulestore.django import modulestore
+    except ImportError:
+        return None
+    store = modulestore()
+    with store.branch_setting(ModuleStoreEnum.Branch.published_only, course_key):
+        course = store.get_course(course_key, depth=0)
+    version = getattr(course, 'course_version', None)
+    return str(version) if version else ''
+
+
+def connect_course_published(receiver):
+    """
+    Connects `receiver(sender, course_key, **kwargs)` to the signal sent when a course is published.
+
+    Does nothing outside of edx-platform.
+    """
+    # pylint: disable=import-outside-toplevel
+    try:
+        from xmodule.modulestore.django import SignalHandler
+    except ImportError:
+        return
+    SignalHandler.course_published.connect(receiver, weak=False, dispatch_uid='eoc_journal.' + receiver.__name__)
+
+
+def connect_user_retired(receiver):
+    """
+    Connects `receiver(sender, user, **kwargs)` to the signal sent when the account of a user is retired.
+
+    Does nothing outside of edx-platform.
+    """
+    # pylint: disable=import-outside-toplevel
+    try:
+        from openedx.core.djangoapps.user_api.accounts.signals import USER_RETIRE_LMS_MISC
+    except ImportError:
+        return
+    USER_RETIRE_LMS_MISC.connect(receiver, weak=False, dispatch_uid='eoc_journal.' + receiver.__name__)
+
+
+def get_anonymous_user_ids(user):
+    """
+    Returns the anonymous ids of `user` in all courses.
+    """
+    # pylint: disable=import-outside-toplevel
+    try:
+        from common.djangoapps.student.models import AnonymousUserId
+    except ImportError:
+        from student.models import AnonymousUserId
+    return list(AnonymousUserId.objects.filter(user=user).values_list('anonymous_user_id', flat=True))
+
+
+def set_custom_attribute(name, value):
+    """
+    Records a custom attribute of the current request in the monitoring system (e.g. New Relic).
+
+    Does nothing when edx-django-utils is not installed.
+    """
+    # pylint: disable=import-outside-toplevel
+    try:
+        from edx_django_utils.monitoring import set_custom_attribute as edx_set_custom_attribute
+    except ImportError:
+        return
+    edx_set_custom_attribute(name, value)
+
+
+def accumulate_custom_attribute(name, value):
+    """
+    Adds `value` to a custom attribute of the current request in the monitoring system.
+
+    Does nothing when edx-django-utils is not installed.
+    """
+    # pylint: disable=import-outside-toplevel
+    try:
+        from edx_django_utils.monitoring import accumulate
+    except ImportError:
+        return
+    accumulate(name, value)
+
+
+def get_request_cache(namespace):
+    """
+    Returns the dict of the request cache `namespace`, which the LMS clears at the start of every request.
+
+    Returns None when edx-django-utils is not installed.
+    """
+    # pylint: disable=import-outside-toplevel
+    try:
+        from edx_django_utils.cache import RequestCache
+    except ImportError:
+        return None
+    return RequestCache(namespace).data
+
+
+def get_course_block_usage_keys(course_key, category):
+    """
+    Returns the usage keys of the published blocks of type `category` in the course.
+    """
+    # pylint: disable=import-outside-toplevel
+    from xmodule.modulestore import ModuleStoreEnum
+    from xmodule.modulestore.django import modulestore
+    store = modulestore()
+    with store.branch_setting(ModuleStoreEnum.Branch.published_only, course_key):
+        return [block.location for block in store.get_items(course_key, qualifiers={'category': category})]
+
+
+def get_user_partition_groups(course_key, user):
+    """
+    Returns the sorted (partition id, group id) pairs of the groups of `user` in the partitions of the
+    course (cohorts, enrollment tracks, content type gating...), which decide the content visible to learners.
+
+    Returns None for course staff, who see all content, and outside of edx-platform.
+    """
+    # pylint: disable=import-outside-toplevel
+    try:
+        from lms.djangoapps.courseware.access import has_access
+        from xmodule.modulestore.django import modulestore
+        from xmodule.partitions import partitions_service
+    except ImportError:
+        return None
+    course = modulestore().get_course(course_key, depth=0)
+    if has_access(user, 'staff', course):
+        return None
+    groups = partitions_service.get_user_partition_groups(
+        course_key, partitions_service.get_all_partitions_for_course(course), user, 'id'
+    )
+    return sorted((partition_id, group.id) for partition_id, group in groups.items() if group is not None)
+
+
+def iter_active_learners(course_key):
+    """
+    Yields the users actively enrolled in the course.
+    """
+    # pylint: disable=import-outside-toplevel
+    try:
+        from common.djangoapps.student.models import CourseEnrollment
+    except ImportError:
+        from student.models import CourseEnrollment
+    enrollments = CourseEnrollment.objects.filter(course_id=course_key, is_active=True).select_related('user')
+    for enrollment in enrollments.iterator():
+        yield enrollment.user
+
+
+def load_block_for_user(user, usage_key):
+    """
+    Returns the block with the given usage key, bound to the LMS runtime of `user`.
+    """
+    # pylint: disable=import-outside-toplevel
+    from django.test.client import RequestFactory
+    try:
+        from lms.djangoapps.courseware.block_render import load_single_xblock
+    except ImportError:
+        from lms.djangoapps.courseware.module_render import load_single_xblock
+    request = RequestFactory().get('/')
+    request.user = user
+    return load_single_xblock(request, user.id, str(usage_key.course_key), str(usage_key))
+
+
+def get_user_by_anonymous_id(anonymous_user_id):
+    """
+    Returns the user with the given anonymous id, or None if there is no such user.
+    """
+    # pylint: disable=import-outside-toplevel
+    try:
+        from common.djangoapps.student.models import user_by_anonymous_id
+    except ImportError:
+        from student.models import user_by_anonymous_id
+    return user_by_anonymous_id(anonymous_user_id)
@@ -12,6 +12,7 @@ class CompletionApiClient(BaseApiClient):
     Object builds an API client to make calls to the LMS Grades API.
     """
     API_PATH = '/api/completion-aggregator/v1'
+    METRICS_NAME = 'completion_api'
 
     def get_user_progress(self, **kwargs):
         """
@@ -22,7 +23,9 @@ class CompletionApiClient(BaseApiClient):
             course_id=self.course_id,
         )
         try:
-            data = self.client.get(url, params=dict(username=self.user.username, **kwargs)).json()
+            response = self._request(url, params=dict(username=self.user.username, **kwargs))
+            data = response.json()
+            self._record_response_size(response, len(response.content))
             return data['results'][0]['completion']['percent'] * 100
         except (HttpClientError, IndexError, KeyError):
             return None
@@ -3,7 +3,68 @@ An XBlock that allows learners to download their activity after they finish thei
 """
 from __future__ import unicode_literals
 
+from urllib3.exceptions import ReadTimeoutError
+
 from .base_api_client import BaseApiClient
+from .deadline import UpstreamTimeout
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+def trim_block(block, fields):
+    """
+    Returns a copy of `block` with only the given `fields`.
+
+    Fields of nested dicts are given as dotted names, e.g. 'student_view_data.name'.
+    """
+    trimmed = {}
+    for field in fields:
+        name, _, subfield = field.partition('.')
+        if name not in block:
+            continue
+        if not subfield:
+            trimmed[name] = block[name]
+        elif isinstance(block[name], dict) and subfield in block[name]:
+            trimmed.setdefault(name, {})[subfield] = block[name][subfield]
+    return trimmed
+
+
+def _build_value(events):
+    """
+    Builds the JSON value whose parse events come next in `events`.
+    """
+    builder = ijson.ObjectBuilder()
+    depth = 0
+    for _, event, value in events:
+        builder.event(event, value)
+        if event in ('start_map', 'start_array'):
+            depth += 1
+        elif event in ('end_map', 'end_array'):
+            depth -= 1
+        if depth == 0:
+            break
+    return builder.value
+
+
+def parse_blocks(stream, fields):
+    """
+    Parses a Course Blocks API response from the file-like `stream` as it is read, keeping only
+    the given `fields` of every block (see `trim_block`).
+
+    Only one block of the response is fully built at a time, so memory use depends on the size
+    of the trimmed blocks rather than on the size of the response.
+    """
+    response = {'root': None, 'blocks': {}}
+    events = ijson.parse(stream)
+    for prefix, event, value in events:
+        if prefix == 'root' and event == 'string':
+            response['root'] = value
+        elif prefix == 'blocks' and event == 'map_key':
+            response['blocks'][value] = trim_block(_build_value(events), fields)
+    return response
 
 
 # pylint: disable=R0903
@@ -12,12 +73,35 @@ class CourseBlocksApiClient(BaseApiClient):
     Object builds an API client to make calls to the LMS Grades API.
     """
     API_PATH = '/api/courses/v1'
+    METRICS_NAME = 'course_blocks_api'
 
-    def get_blocks(self, **kwargs):
+    def get_blocks(self, fields=None, **kwargs):
         """
         Fetches and returns blocks from the Course API.
+
+        If `fields` is given, only these fields of every block are returned (see `trim_block`).
+        The response is then parsed as it is downloaded when ijson is installed, so that the
+        whole response is never held in memory.
         """
-        return self.client.get(
-            self.api_url + '/blocks',
-            params=dict(course_id=self.course_id, **kwargs)
-        ).json()
+        url = self.api_url + '/blocks'
+        params = dict(course_id=self.course_id, **kwargs)
+        if fields is None or ijson is None:
+            response = self._request(url, params=params)
+            data = response.json()
+            self._record_response_size(response, len(response.content))
+            if fields is not None:
+                data['blocks'] = {
+                    block_id: trim_block(block, fields) for block_id, block in data.get('blocks', {}).items()
+                }
+            return data
+
+        response = self._request(url, params=params, stream=True)
+        try:
+            response.raw.decode_content = True
+            data = parse_blocks(response.raw, fields)
+            self._record_response_size(response)
+            return data
+        except ReadTimeoutError as error:
+            raise UpstreamTimeout('{} timed out: {}'.format(url, error))  # pylint: disable=raise-missing-from
+        finally:
+            response.close()
@@ -0,0 +1,234 @@
+"""
+Course content and learner data read by the Course Journal blocks.
+
+The `load_*` functions are the batch load functions of the request loaders (see `loaders`), which
+the journal blocks evaluated in one request share. The published version and display name of
+courses are cached until the course is published.
+"""
+from __future__ import unicode_literals
+from collections import OrderedDict
+from uuid import uuid4
+
+from django.conf import settings
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from . import cache
+from .compat import (
+    connect_course_published,
+    get_course_block_usage_keys,
+    get_course_version,
+    get_user_partition_groups,
+)
+from .singleflight import single_flight
+from .utils import normalize_id
+
+# Seconds the display name of a course is cached for the PDF report title. Names are also dropped
+# from the cache when the course is published.
+# Can be overridden with the EOC_JOURNAL_COURSE_NAME_CACHE_TIMEOUT Django setting.
+DEFAULT_COURSE_NAME_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Fields of the Course Blocks API response read by `iter_pb_answers` and `list_pb_answers`.
+COURSE_BLOCK_FIELDS = ('id', 'display_name', 'children', 'student_view_data.name', 'student_view_data.question')
+
+
+def clean_question(question):
+    """
+    Returns the text content of a pb-answer question, which may contain HTML.
+    """
+    # pylint: disable=import-outside-toplevel
+    from lxml import html
+    from lxml.etree import ParserError, XMLSyntaxError  # pylint: disable=no-name-in-module
+    from lxml.html.clean import clean_html
+
+    try:
+        return clean_html(html.fromstring(question)).text_content()
+    except (XMLSyntaxError, ParserError):
+        return question
+
+
+def load_users(user_ids):
+    """
+    Returns the users with the given ids, read in one query.
+    """
+    from django.contrib.auth.models import User  # pylint: disable=import-outside-toplevel
+    users = User.objects.in_bulk(user_ids)  # pylint: disable=no-member
+    missing = [user_id for user_id in user_ids if user_id not in users]
+    if missing:
+        raise User.DoesNotExist('Users {} do not exist.'.format(missing))  # pylint: disable=no-member
+    return [users[user_id] for user_id in user_ids]
+
+
+def load_answers(keys):
+    """
+    Returns the inputs of the learners' answers for (course id, anonymous student id, answer name)
+    `keys`, None for the answers not saved yet.
+
+    Only the named answers are read: one query per course, for the students and names in `keys`.
+    """
+    from problem_builder.models import Answer  # pylint: disable=import-outside-toplevel
+    inputs = dict.fromkeys(keys)
+    course_keys = OrderedDict()
+    for course_id, student_id, name in keys:
+        course_student_ids, names = course_keys.setdefault(course_id, (set(), set()))
+        course_student_ids.add(student_id)
+        names.add(name)
+    for course_id, (course_student_ids, names) in course_keys.items():
+        answers = Answer.objects.filter(  # pylint: disable=no-member
+            course_key=course_id,
+            student_id__in=sorted(course_student_ids),
+            name__in=sorted(names),
+        )
+        for answer in answers:
+            key = (course_id, answer.student_id, answer.name)
+            if key in inputs:
+                inputs[key] = answer.student_input
+    return [inputs[key] for key in keys]
+
+
+def load_course_blocks(keys):
+    """
+    Returns the Course Blocks API responses for (course id, user, all_blocks) `keys`.
+    """
+    return [fetch_pb_answer_blocks(course_id, user, all_blocks) for course_id, user, all_blocks in keys]
+
+
+def fetch_pb_answer_blocks(course_id, user, all_blocks=False):
+    """
+    Fetches the pb-answer blocks of the course visible to `user` from the Course Blocks API.
+
+    See `EOCJournalXBlock._fetch_pb_answer_blocks`.
+    """
+    def fetch():
+        """
+        Requests the blocks from the Course API.
+        """
+        from .course_blocks_api import CourseBlocksApiClient  # pylint: disable=import-outside-toplevel
+        client = CourseBlocksApiClient(user, course_id)
+        return client.get_blocks(
+            all_blocks=all_blocks,
+            depth='all',
+            requested_fields='student_view_data,children',
+            student_view_data='pb-answer',
+            block_types_filter='pb-answer,problem-builder,vertical,sequential,chapter,course',
+            username=user.username,
+            fields=COURSE_BLOCK_FIELDS,
+        )
+
+    visibility = 'all_blocks' if all_blocks else visibility_context(course_id, user)
+    return single_flight(('course_blocks', course_id, visibility), fetch)
+
+
+def iter_pb_answers(response):
+    """
+    Iterate over pb-answer blocks in course blocks API response and yield
+    section, subsection and unit display names along with pb-answer blocks.
+    """
+    blocks = response['blocks']
+    course_block = blocks[response['root']]
+    for section_id in course_block.get('children', []):
+        section_block = blocks[section_id]
+        for subsection_id in section_block.get('children', []):
+            subsection_block = blocks[subsection_id]
+            for unit_id in subsection_block.get('children', []):
+                unit_block = blocks[unit_id]
+                for pb_id in unit_block.get('children', []):
+                    pb_block = blocks[pb_id]
+                    for pb_answer_id in pb_block.get('children', []):
+                        pb_answer_block = blocks[pb_answer_id]
+                        yield (
+                            section_block['display_name'],
+                            subsection_block['display_name'],
+                            unit_block['display_name'],
+                            pb_answer_block,
+                        )
+
+
+def visibility_context(course_id, user):
+    """
+    Returns a key shared by the users who see the same blocks of the course as `user`.
+
+    Learners in the same groups of all partitions of the course (cohorts, enrollment tracks...)
+    see the same blocks, unless the course has randomized content, which is picked per learner.
+    Falls back to the username of course staff, and outside of edx-platform.
+    """
+    try:
+        course_key = CourseKey.from_string(course_id)
+    except InvalidKeyError:
+        return user.username
+    if course_has_randomized_content(course_key):
+        return user.username
+    groups = get_user_partition_groups(course_key, user)
+    if groups is None:
+        return user.username
+    return 'groups:' + ','.join('{}-{}'.format(partition_id, group_id) for partition_id, group_id in groups)
+
+
+def course_has_randomized_content(course_key):
+    """
+    Returns True if the published course contains library content, which is picked per learner.
+
+    Cached per published course version.
+    """
+    version = cached_course_version(course_key)
+    if version is None:
+        return False
+    timeout = getattr(settings, 'EOC_JOURNAL_COURSE_NAME_CACHE_TIMEOUT', DEFAULT_COURSE_NAME_CACHE_TIMEOUT)
+    return cache.get_or_set(
+        cache.make_key('randomized_content', normalize_id(course_key), version),
+        lambda: bool(get_course_block_usage_keys(course_key, 'library_content')),
+        timeout,
+        layer='course_version',
+    )
+
+
+def course_name_cache_key(course_key):
+    """
+    Returns the cache key of the display name of the course.
+    """
+    return cache.make_key('course_name', normalize_id(course_key))
+
+
+def course_version_cache_key(course_key):
+    """
+    Returns the cache key of the published version of the course.
+    """
+    return cache.make_key('course_version', normalize_id(course_key))
+
+
+def load_course_version(course_key):
+    """
+    Returns the published version of the course, or a random version for unversioned courses.
+    """
+    version = get_course_version(course_key)
+    if version == '':
+        # Old mongo courses are not versioned. Caches keyed by the version are still refreshed
+        # when the course is published, as the cached version is dropped then.
+        version = 'unversioned-{}'.format(uuid4().hex)
+    return version
+
+
+def cached_course_version(course_key):
+    """
+    Returns the published version of the course, cached until the course is published.
+
+    Returns None outside of edx-platform.
+    """
+    timeout = getattr(settings, 'EOC_JOURNAL_COURSE_NAME_CACHE_TIMEOUT', DEFAULT_COURSE_NAME_CACHE_TIMEOUT)
+    return cache.get_or_set(
+        course_version_cache_key(course_key),
+        lambda: load_course_version(course_key),
+        timeout,
+        layer='course_version',
+    )
+
+
+def invalidate_course_name(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Drops the cached display name and version of a course when it is published.
+    """
+    cache.delete(course_name_cache_key(course_key))
+    cache.delete(course_version_cache_key(course_key))
+
+
+connect_course_published(invalidate_course_name)
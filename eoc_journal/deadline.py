@@ -0,0 +1,82 @@
+"""
+Deadlines bounding the time spent waiting for the LMS APIs.
+
+Code running in `deadline(seconds)` gets a deadline which every upstream call made through the
+API clients honours: calls are given at most the time left as their timeout, and calls made once
+the deadline passed fail immediately. Upstream calls which time out raise `UpstreamTimeout`, so
+that callers can show their data as not available.
+
+Deadlines are kept per thread. Nested deadlines never extend the enclosing one.
+"""
+from __future__ import unicode_literals
+import threading
+import time
+from builtins import object
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+class UpstreamTimeout(Exception):
+    """
+    Raised when an upstream call times out, or cannot be made before the deadline.
+    """
+
+
+class Deadline(object):  # pylint: disable=useless-object-inheritance
+    """
+    A point in time by which the current work must be done.
+    """
+
+    def __init__(self, seconds):
+        self.expires_at = time.time() + seconds
+
+    def remaining(self):
+        """
+        Returns the number of seconds left, 0 once the deadline passed.
+        """
+        return max(self.expires_at - time.time(), 0)
+
+    def expired(self):
+        """
+        Returns True once the deadline passed.
+        """
+        return self.remaining() == 0
+
+
+def current():
+    """
+    Returns the deadline of the current thread, or None.
+    """
+    return getattr(_local, 'deadline', None)
+
+
+@contextmanager
+def deadline(seconds):
+    """
+    Runs the enclosed code with a deadline `seconds` from now. None runs it without a deadline.
+    """
+    enclosing = current()
+    if seconds is None or (enclosing is not None and enclosing.remaining() <= seconds):
+        yield enclosing
+        return
+    _local.deadline = Deadline(seconds)
+    try:
+        yield _local.deadline
+    finally:
+        _local.deadline = enclosing
+
+
+def timeout(default=None):
+    """
+    Returns the timeout of an upstream call: `default` seconds, but no more than the time left.
+
+    Raises `UpstreamTimeout` if the deadline passed.
+    """
+    current_deadline = current()
+    if current_deadline is None:
+        return default
+    remaining = current_deadline.remaining()
+    if remaining == 0:
+        raise UpstreamTimeout('The deadline passed.')
+    return remaining if default is None else min(remaining, default)
@@ -2,50 +2,93 @@
 An XBlock that allows learners to download their activity after they finish their course.
 """
 from __future__ import unicode_literals
-# pylint: disable=wrong-import-position,wrong-import-order,no-name-in-module
-from future import standard_library  # noqa
-standard_library.install_aliases()  # noqa
-
+import hashlib
 import json
-import six
-
+import logging
 from collections import OrderedDict
-from io import BytesIO
-from urllib.parse import urljoin
 
 import pkg_resources
+import six
 import webob
 from django import utils
 from django.conf import settings
-from lxml import html
-from lxml.etree import ParserError, XMLSyntaxError
-from lxml.html.clean import clean_html
+from django.db.models.signals import post_save
 from opaque_keys.edx.keys import CourseKey, UsageKey
-from problem_builder.models import Answer
-from reportlab.lib import pagesizes
-from reportlab.lib.colors import Color
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
-from reportlab.platypus.flowables import HRFlowable
+from six.moves.urllib.parse import urljoin  # pylint: disable=import-error
 from xblock.core import XBlock
 from xblock.fields import Boolean, List, Scope, String
 from xblock.fragment import Fragment
 from xblockutils.resources import ResourceLoader
 from xblockutils.studio_editable import StudioEditableXBlockMixin
 
-from .api_client import ApiClient
-from .completion_api import CompletionApiClient
-from .course_blocks_api import CourseBlocksApiClient
-from .pdf_generator import get_style_sheet
-from .utils import DummyTranslationService, _, normalize_id
+from . import cache, deadline, loaders, pdf_fragments, pdf_storage, profiling, stats
+from .compat import accumulate_custom_attribute, connect_user_retired, get_anonymous_user_ids
+from .course_data import (
+    DEFAULT_COURSE_NAME_CACHE_TIMEOUT,
+    cached_course_version,
+    course_name_cache_key,
+    iter_pb_answers,
+    load_answers,
+    load_course_blocks,
+    load_users,
+)
+from .export_handlers import ExportHandlersMixin
+from .exporters import EXPORT_FORMATS
+from .pb_answer_snapshot import DEFAULT_PB_ANSWER_LIST_CACHE_TIMEOUT, PBAnswerSnapshotMixin, make_pb_answer_snapshot
+from .pb_answers import PBAnswerList
+from .pdf_constants import OPTIMIZE_FOR_SIZE, PLAIN_TEXT_RENDERER, RICH_TEXT_RENDERER
+from .render_pool import RenderQueueFull, render_pdf, render_stats
+from .singleflight import in_flight, single_flight
+from .utils import DummyTranslationService, _, normalize_id, paginate, search_choices
 
 
-try:
-    from django.contrib.auth.models import User  # pylint: disable=import-outside-toplevel,ungrouped-imports
-except ImportError:
-    User = None  # pylint: disable=C0103
+loader = ResourceLoader(__name__)
+log = logging.getLogger(__name__)
 
+# Answers longer than this many characters are rendered paragraph by paragraph in the PDF report.
+# Can be overridden with the EOC_JOURNAL_PDF_LONG_ANSWER_THRESHOLD Django setting (None disables it).
+DEFAULT_PDF_LONG_ANSWER_THRESHOLD = 5000
 
-loader = ResourceLoader(__name__)
+# Set the EOC_JOURNAL_PDF_OPTIMIZE_FOR Django setting to 'speed' to skip compression of PDF reports.
+DEFAULT_PDF_OPTIMIZE_FOR = OPTIMIZE_FOR_SIZE
+
+# Seconds rendered PDF reports are cached for, keyed by their content. 0 disables the cache.
+# Can be overridden with the EOC_JOURNAL_PDF_CACHE_TIMEOUT Django setting.
+DEFAULT_PDF_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Seconds the average progress of the learners of a course is cached for.
+# Can be overridden with the EOC_JOURNAL_COHORT_AVERAGE_CACHE_TIMEOUT Django setting.
+DEFAULT_COHORT_AVERAGE_CACHE_TIMEOUT = 15 * 60
+
+# Seconds student_view_data and expanded static URLs are memoized for in each process.
+# Can be overridden with the EOC_JOURNAL_STUDENT_VIEW_DATA_CACHE_TIMEOUT Django setting.
+DEFAULT_STUDENT_VIEW_DATA_CACHE_TIMEOUT = 5 * 60
+
+# JSON handler responses smaller than this many bytes are not compressed, as gzip would save
+# little and cost CPU time. Can be overridden with the EOC_JOURNAL_GZIP_MIN_BYTES Django setting.
+DEFAULT_GZIP_MIN_BYTES = 1024
+
+# Seconds `student_view` and `student_view_user_state` wait for the LMS APIs in total. Sections whose
+# data is not loaded in time are shown as not available. None disables the deadline.
+# Can be overridden with the EOC_JOURNAL_STUDENT_VIEW_DEADLINE Django setting.
+DEFAULT_STUDENT_VIEW_DEADLINE = 10
+
+# Fields of the block student_view_data depends on.
+STUDENT_VIEW_DATA_FIELDS = (
+    'display_name',
+    'display_answers',
+    'display_metrics_section',
+    'display_key_takeaways_section',
+    'key_takeaways_pdf',
+    'pdf_report_link_heading',
+    'pdf_report_link_text',
+)
+
+student_view_data_cache = cache.LRUCache(maxsize=10000, name='student_view_data')
+static_url_cache = cache.LRUCache(maxsize=10000, name='static_url')
+
+# Number of pb-answers listed per page in the Studio editor.
+PB_ANSWER_PAGE_SIZE = 50
 
 
 def provide_pb_answer_list(xblock_instance):
@@ -53,24 +96,91 @@ def provide_pb_answer_list(xblock_instance):
     Returns a list of dicts containing information about pb-answer
     blocks present in current course.
 
-    Used as a list value provider for the `selected_pb_answer_blocks`
-    field in the Studio.
+    Used to list the choices of the `selected_pb_answer_blocks` field
+    in the Studio. The list is cached per published course version.
     """
-    blocks = xblock_instance.list_pb_answers(all_blocks=True)
-    result = []
-    for block in blocks:
-        block_name = block['display_name'] or block['name']
-        label = ' / '.join([block['section'], block['subsection'], block['unit'], block_name])
-        result.append({
-            'display_name': label,
-            'value': block['id'],
-        })
-    return result
+    # pylint: disable=protected-access
+    def build_pb_answer_list():
+        """
+        Fetches the pb-answers of the course and builds their labels.
+        """
+        blocks = xblock_instance.list_pb_answers(all_blocks=True)
+        result = []
+        for block in blocks:
+            block_name = block['display_name'] or block['name']
+            label = ' / '.join([block['section'], block['subsection'], block['unit'], block_name])
+            result.append({
+                'display_name': label,
+                'value': block['id'],
+            })
+        return result
+
+    course_version = xblock_instance._get_course_version()
+    if course_version is None:
+        return build_pb_answer_list()
+    timeout = getattr(
+        settings, 'EOC_JOURNAL_PB_ANSWER_LIST_CACHE_TIMEOUT', DEFAULT_PB_ANSWER_LIST_CACHE_TIMEOUT
+    )
+    key = cache.make_key('pb_answer_list', xblock_instance._get_course_id(), course_version)
+    return cache.get_or_set(key, build_pb_answer_list, timeout, layer='pb_answer_list')
+
+
+def schedule_pdf_report_regeneration(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Schedules the regeneration of the stored PDF reports including a problem_builder answer when it is saved.
+    """
+    if not pdf_storage.is_enabled():
+        return
+    for usage_id in pdf_storage.journals_with_answer(instance.course_key, instance.name):
+        pdf_storage.schedule_regeneration(usage_id, instance.student_id)
+
+
+post_save.connect(
+    schedule_pdf_report_regeneration,
+    sender='problem_builder.Answer',
+    dispatch_uid='eoc_journal.schedule_pdf_report_regeneration',
+)
+
+
+def delete_retired_learner_reports(sender, user, **kwargs):  # pylint: disable=unused-argument
+    """
+    Removes the stored PDF reports of a user when their account is retired.
+    """
+    if not pdf_storage.is_enabled():
+        return
+    for student_id in get_anonymous_user_ids(user):
+        pdf_storage.delete_learner_reports(student_id)
+
+
+connect_user_retired(delete_retired_learner_reports)
+
+
+def gzip_response(request, response):
+    """
+    Compresses the body of `response` with gzip if the client accepts it and the body is at least
+    EOC_JOURNAL_GZIP_MIN_BYTES long.
+
+    The body sizes before and after compression are recorded in the
+    `eoc_journal_handler_response_bytes` and `eoc_journal_handler_gzip_bytes` custom monitoring attributes.
+    """
+    response.vary = ('Accept-Encoding',)
+    size = len(response.body)
+    accumulate_custom_attribute('eoc_journal_handler_response_bytes', size)
+    min_bytes = getattr(settings, 'EOC_JOURNAL_GZIP_MIN_BYTES', DEFAULT_GZIP_MIN_BYTES)
+    if (
+            size >= min_bytes and
+            request is not None and
+            'Accept-Encoding' in request.headers and
+            request.accept_encoding.acceptable_offers(['gzip'])
+    ):
+        response.encode_content('gzip')
+        accumulate_custom_attribute('eoc_journal_handler_gzip_bytes', len(response.body))
+    return response
 
 
 @XBlock.needs("i18n")
 @XBlock.needs('user')
-class EOCJournalXBlock(StudioEditableXBlockMixin, XBlock):
+class EOCJournalXBlock(PBAnswerSnapshotMixin, ExportHandlersMixin, StudioEditableXBlockMixin, XBlock):
     """
     An XBlock that allows learners to download their activity after they finish their course.
     """
@@ -98,7 +208,13 @@ class EOCJournalXBlock(StudioEditableXBlockMixin, XBlock):
         default=[],
         scope=Scope.content,
         list_style='set',
-        list_values_provider=provide_pb_answer_list,
+    )
+
+    selected_pb_answer_snapshot = List(
+        help=_("Section, name and question of the selected Problem Builder Freeform Answer components, "
+               "stored when the block is saved."),
+        default=[],
+        scope=Scope.content,
     )
 
     pdf_report_title = String(
@@ -153,6 +269,18 @@ class EOCJournalXBlock(StudioEditableXBlockMixin, XBlock):
         scope=Scope.settings,
     )
 
+    pdf_renderer = String(
+        display_name=_("PDF rendering engine"),
+        help=_("The rich text engine supports formatting markup in answers. The plain text engine "
+               "prints answers as they were typed and is several times faster."),
+        default=RICH_TEXT_RENDERER,
+        scope=Scope.settings,
+        values=[
+            {"display_name": _("Rich text"), "value": RICH_TEXT_RENDERER},
+            {"display_name": _("Plain text"), "value": PLAIN_TEXT_RENDERER},
+        ],
+    )
+
     editable_fields = (
         'display_name',
         'key_takeaways_pdf',
@@ -164,6 +292,7 @@ class EOCJournalXBlock(StudioEditableXBlockMixin, XBlock):
         'display_key_takeaways_section',
         'display_answers',
         'custom_font',
+        'pdf_renderer',
     )
 
     @property
@@ -174,61 +303,119 @@ class EOCJournalXBlock(StudioEditableXBlockMixin, XBlock):
     def student_view_data(self, context=None):
         """
         JSON representation of data shown to students.
+
+        The data is memoized per block, content and handler URL, which may depend on the user in some runtimes.
         """
         context = context.copy() if context else {}
+        pdf_report_url = self.runtime.handler_url(self, "serve_pdf")
+        key = (six.text_type(self.scope_ids.usage_id), pdf_report_url) + tuple(
+            getattr(self, field_name) for field_name in STUDENT_VIEW_DATA_FIELDS
+        )
+        context.update(student_view_data_cache.get_or_set(
+            key,
+            lambda: self._build_student_view_data(pdf_report_url),
+            self._get_student_view_data_cache_timeout(),
+        ))
+        return context
+
+    def _build_student_view_data(self, pdf_report_url):
+        """
+        Returns the data shown to students.
+        """
+        data = {}
 
-        context["display_name"] = self.display_name
-        context["display_answers"] = self.display_answers
-        context["display_user_metrics"] = self.display_metrics_section
+        data["display_name"] = self.display_name
+        data["display_answers"] = self.display_answers
+        data["display_user_metrics"] = self.display_metrics_section
 
-        context["display_key_takeaways"] = self.display_key_takeaways_section
+        data["display_key_takeaways"] = self.display_key_takeaways_section
         if self.display_key_takeaways_section:
             key_takeaways_handle = self.key_takeaways_pdf.strip()
             if key_takeaways_handle:
-                context["key_takeaways_pdf_url"] = self._expand_static_url(
+                data["key_takeaways_pdf_url"] = self._expand_static_url(
                     url=self.key_takeaways_pdf,
                     absolute=True,
                 )
 
-        context["pdf_report_url"] = self._make_url_absolute(
-            self.runtime.handler_url(self, "serve_pdf")
-        )
-        context["pdf_report_link_heading"] = self.pdf_report_link_heading
-        context["pdf_report_link_text"] = self.pdf_report_link_text
+        data["pdf_report_url"] = self._make_url_absolute(pdf_report_url)
+        data["pdf_report_link_heading"] = self.pdf_report_link_heading
+        data["pdf_report_link_text"] = self.pdf_report_link_text
 
-        return context
+        return data
+
+    @staticmethod
+    def _get_student_view_data_cache_timeout():
+        """
+        Returns the number of seconds student_view_data and expanded static URLs are memoized for.
+        """
+        return getattr(
+            settings, 'EOC_JOURNAL_STUDENT_VIEW_DATA_CACHE_TIMEOUT', DEFAULT_STUDENT_VIEW_DATA_CACHE_TIMEOUT
+        )
 
     def _get_user_state(self):
         """
         Return student-specific data in dictionary.
-        """
-        state = {
-            "answer_sections": self.list_user_pb_answers_by_section(),
-        }
 
-        if self.display_metrics_section:
-            state["progress"] = self.get_progress_metrics()
-            state["proficiency"] = self.get_proficiency_metrics()
-            state["engagement"] = self.get_engagement_metrics()
+        The LMS APIs are given until the student view deadline to respond. Metrics sections whose
+        data misses it are None, which is shown as not available. Answers which miss it are an
+        empty list, with `answer_sections_available` False.
+        """
+        seconds = getattr(settings, 'EOC_JOURNAL_STUDENT_VIEW_DEADLINE', DEFAULT_STUDENT_VIEW_DEADLINE)
+        unavailable = object()
+        with deadline.deadline(seconds):
+            answer_sections = self._load_section(
+                "answer_sections", self.list_user_pb_answers_by_section, unavailable=unavailable
+            )
+            state = {
+                "answer_sections": [] if answer_sections is unavailable else answer_sections,
+                "answer_sections_available": answer_sections is not unavailable,
+            }
+
+            if self.display_metrics_section:
+                state["progress"] = self._load_section("progress", self.get_progress_metrics)
+                state["proficiency"] = self._load_section("proficiency", self.get_proficiency_metrics)
+                state["engagement"] = self._load_section("engagement", self.get_engagement_metrics)
         return state
 
+    def _load_section(self, name, load, unavailable=None):
+        """
+        Returns the data of the `name` section of the user state loaded by `load()`, or `unavailable` if it timed out.
+
+        Sections which timed out are counted in the `eoc_journal_sections_timed_out` custom monitoring attribute.
+        """
+        try:
+            return load()
+        except deadline.UpstreamTimeout as error:
+            log.warning('The %s section of %s is not available: %s', name, self.scope_ids.usage_id, error)
+            accumulate_custom_attribute('eoc_journal_sections_timed_out', 1)
+            return unavailable
+
     @XBlock.handler
     def student_view_user_state(self, request, suffix=''):  # pylint: disable=unused-argument
         """
         XBlock handler to return student-specific block data as JSON.
+
+        The JSON is compressed when the client accepts gzip (see `gzip_response`).
         """
-        return webob.Response(
+        return gzip_response(request, webob.Response(
             body=json.dumps(self._get_user_state()),
             charset='UTF-8',
             content_type='application/json',
-        )
+        ))
 
+    @profiling.profiled('student_view')
     def student_view(self, context=None):
         """
         View shown to students.
         """
         context = self.student_view_data(context=context)
         context.update(self._get_user_state())
+        context["export_links"] = [
+            {"format": export_format, "url": self.runtime.handler_url(self, "serve_{}".format(export_format))}
+            for export_format in EXPORT_FORMATS
+        ]
+        if self._user_is_staff():
+            context["course_export_url"] = self.runtime.handler_url(self, "export_course_answers")
 
         fragment = Fragment()
         fragment.add_content(
@@ -263,33 +450,83 @@ class EOCJournalXBlock(StudioEditableXBlockMixin, XBlock):
         except IOError:
             return self.resource_string('public/js/translations/en/textjs.js')
 
+    def _make_field_info(self, field_name, field):
+        """
+        Renders `selected_pb_answer_blocks` as a JSON value, which is edited through the
+        searchable pb-answer selector of eoc_journal_edit.js.
+        """
+        info = super(EOCJournalXBlock, self)._make_field_info(field_name, field)  # pylint: disable=super-with-arguments
+        if field_name == 'selected_pb_answer_blocks':
+            info['value'] = json.dumps(self.selected_pb_answer_blocks)
+        return info
+
+    def clean_studio_edits(self, data):
+        """
+        Stores a snapshot of the metadata of the selected pb-answers along with them.
+        """
+        if 'selected_pb_answer_blocks' in data:
+            data['selected_pb_answer_snapshot'] = make_pb_answer_snapshot(
+                self.list_pb_answers(all_blocks=True),
+                data['selected_pb_answer_blocks'],
+            )
+
+    def studio_view(self, context):
+        """
+        Editing view in Studio, listing the first page of pb-answers of the course.
+        """
+        fragment = super(EOCJournalXBlock, self).studio_view(context)  # pylint: disable=super-with-arguments
+        choices = provide_pb_answer_list(self)
+        labels = {choice['value']: choice['display_name'] for choice in choices}
+        gettext = self.i18n_service.gettext
+        fragment.add_css_url(
+            self.runtime.local_resource_url(self, "public/css/eoc_journal_edit.css")
+        )
+        fragment.add_javascript_url(
+            self.runtime.local_resource_url(self, "public/js/eoc_journal_edit.js")
+        )
+        fragment.initialize_js("EOCJournalStudioEdit", {
+            'selected': [
+                {'display_name': labels.get(block_id, block_id), 'value': block_id}
+                for block_id in self.selected_pb_answer_blocks
+            ],
+            'page': paginate(choices, 1, PB_ANSWER_PAGE_SIZE),
+            'strings': {
+                'search': gettext("Search Freeform Answers"),
+                'previous': gettext("Previous"),
+                'next': gettext("Next"),
+                'page_info': gettext("Page {page} of {num_pages} ({count} Freeform Answers)"),
+                'none_available': gettext("None Available"),
+            },
+        })
+        return fragment
+
+    @XBlock.json_handler
+    def search_pb_answers(self, data, suffix=''):  # pylint: disable=unused-argument
+        """
+        Returns a page of the pb-answers of the course whose label matches `query`.
+        """
+        try:
+            page = int(data.get('page', 1))
+        except (TypeError, ValueError):
+            page = 1
+        choices = search_choices(provide_pb_answer_list(self), data.get('query') or '')
+        return paginate(choices, page, PB_ANSWER_PAGE_SIZE)
+
     @XBlock.handler
+    @profiling.profiled('serve_pdf')
     def serve_pdf(self, request, _suffix):
         """
         Builds and serves a PDF document containing user's freeform answers.
-        """
-        font_path = self._expand_static_url(self.custom_font, absolute=True) if self.custom_font else None
-        styles = get_style_sheet(font_url=font_path)
-        pdf_buffer = BytesIO()
 
-        report_header_name = self.pdf_report_title or self._get_course_name()
-        document = SimpleDocTemplate(pdf_buffer, pagesize=pagesizes.letter, title=report_header_name)
-        story = [
-            Paragraph(report_header_name, styles["Title"]),
-        ]
-
-        answer_sections = self.list_user_pb_answers_by_section()
-        for section in answer_sections:
-            story.append(Spacer(0, 16))
-            story.append(Paragraph(section["name"], styles["h1"]))
-            for question in section["questions"]:
-                story.append(Paragraph(question["question"], styles["h2"]))
-                story.append(Paragraph(question["answer"], styles["Normal"]))
-                story.append(HRFlowable(color=Color(0, 0, 0, 0.1), width='100%', spaceBefore=5, spaceAfter=10))
-
-        document.build(story)
-        pdf_buffer.seek(0)
-        pdf = pdf_buffer.read()
+        Concurrent requests of the same user (e.g. double clicks) share a single render.
+        """
+        try:
+            pdf = single_flight(
+                ('serve_pdf', six.text_type(self.scope_ids.usage_id), self._get_current_anonymous_user_id()),
+                lambda: self._render_pdf_report(downloaded=True),
+            )
+        except RenderQueueFull as error:
+            return webob.Response(status=503, headers={'Retry-After': str(error.retry_after)})
 
         response = webob.Response(
             body=pdf,
@@ -298,27 +535,122 @@ class EOCJournalXBlock(StudioEditableXBlockMixin, XBlock):
 
         return response
 
+    def _get_pdf_options(self):
+        """
+        Returns the `build_pdf` options of the report, besides its title and answers.
+        """
+        profiling.annotate(font=self.custom_font, renderer=self.pdf_renderer)
+        font_path = self._expand_static_url(self.custom_font, absolute=True) if self.custom_font else None
+        return {
+            'font_url': font_path,
+            'long_answer_threshold': getattr(
+                settings, 'EOC_JOURNAL_PDF_LONG_ANSWER_THRESHOLD', DEFAULT_PDF_LONG_ANSWER_THRESHOLD
+            ),
+            'renderer': self.pdf_renderer,
+            'optimize_for': getattr(settings, 'EOC_JOURNAL_PDF_OPTIMIZE_FOR', DEFAULT_PDF_OPTIMIZE_FOR),
+        }
+
+    def _render_pdf_report(self, downloaded=False):
+        """
+        Renders the PDF report of the current user and returns its content.
+
+        Reports are cached, or stored if EOC_JOURNAL_PDF_STORAGE is enabled, under a digest of
+        their content. Set `downloaded` when the report is served to the user: stored reports
+        whose answers did not change since are then served without loading the answers.
+        """
+        options = self._get_pdf_options()
+        storage_enabled = pdf_storage.is_enabled()
+        usage_id = six.text_type(self.scope_ids.usage_id)
+        student_id = self._get_current_anonymous_user_id()
+        course_version = self._get_course_version()
+        # Answers are included in the digest; anything else the report depends on changes with the
+        # published course version or with the settings.
+        fingerprint = json.dumps([course_version, options], sort_keys=True)
+        if storage_enabled and downloaded and course_version is not None:
+            pdf = pdf_storage.get_current_report(usage_id, student_id, fingerprint)
+            if pdf is not None:
+                return pdf
+
+        report_header_name = self.pdf_report_title or self._get_course_name()
+        answer_sections = self.list_user_pb_answers_by_section()
+
+        def render():
+            """
+            Renders the report in the render pool, or assembles it from section fragments.
+            """
+            if pdf_fragments.is_enabled():
+                return pdf_fragments.build_report(report_header_name, answer_sections, options)
+            return render_pdf(report_header_name, answer_sections, **options)
+
+        content = json.dumps([report_header_name, answer_sections, options], sort_keys=True)
+        digest = hashlib.md5(content.encode('utf-8')).hexdigest()
+
+        if storage_enabled:
+            # The journal is registered before the digest is remembered, so that saving one of its
+            # answers forgets the digest.
+            pdf_storage.register_journal(
+                self._get_course_id(),
+                usage_id,
+                [block['name'] for block in self._get_selected_pb_answers()],
+            )
+            if downloaded:
+                pdf_storage.record_download(digest)
+            pdf = pdf_storage.get_or_store(student_id, digest, render)
+            pdf_storage.remember_report(usage_id, student_id, fingerprint, digest)
+            return pdf
+
+        timeout = getattr(settings, 'EOC_JOURNAL_PDF_CACHE_TIMEOUT', DEFAULT_PDF_CACHE_TIMEOUT)
+        if not timeout:
+            return render()
+        return cache.get_or_set(cache.make_key('pdf', digest), render, timeout, layer='pdf')
+
+    @XBlock.handler
+    def diagnostics(self, request, suffix=''):  # pylint: disable=unused-argument
+        """
+        Returns a JSON snapshot of the statistics of the current process: HTTP calls per API
+        client class, cache hits and misses per cache layer, PDF renders and queue depths.
+        Only available to course staff.
+        """
+        if not self._user_is_staff():
+            return webob.Response(status=403)
+
+        snapshot = stats.snapshot()
+        snapshot['pdf_renders'] = render_stats()
+        snapshot['queues'] = {
+            'pdf_render': snapshot['pdf_renders']['queue_length'],
+            'pdf_regeneration': pdf_storage.pending_regenerations(),
+            'single_flight': in_flight(),
+        }
+        return webob.Response(
+            body=json.dumps(snapshot, sort_keys=True),
+            charset='UTF-8',
+            content_type='application/json',
+        )
+
     def list_user_pb_answers_by_section(self):
         """
-        Returns a list of dicts with pb-answers grouped by section.
+        Returns a list of dicts with pb-answers grouped by section, which is empty when the learner
+        has not answered any of the selected pb-answers yet.
+
+        The selected answers of the learner are read once per request: answers already read for
+        other journal blocks of the request are not read again.
         """
         # Get the selected blocks and their answers
-        blocks = self.list_pb_answers()
-        blocks = [b for b in blocks if b['id'] in self.selected_pb_answer_blocks]
+        blocks = self._get_selected_pb_answers()
         course_id = self._get_course_id()
         user_id = self._get_current_anonymous_user_id()
-        answers_names = [block['name'] for block in blocks]
+        profiling.annotate(answer_count=len(blocks))
 
-        answers = Answer.objects.filter(  # pylint: disable=no-member
-            course_key=course_id,
-            student_id=user_id,
-            name__in=answers_names
+        # Map answer names to student inputs
+        names = [block['name'] for block in blocks]
+        answer_inputs = loaders.get_loader('answers', load_answers).load_many(
+            [(course_id, user_id, name) for name in names]
         )
+        students_inputs = {
+            name: answer_input for name, answer_input in zip(names, answer_inputs) if answer_input is not None
+        }
 
-        if answers.count() > 0:
-            # Map answer names to student inputs
-            students_inputs = {a.name: a.student_input for a in answers}
-
+        if students_inputs:
             # Group answers by section
             answers = OrderedDict()
 
@@ -329,15 +661,9 @@ class EOCJournalXBlock(StudioEditableXBlockMixin, XBlock):
                 if section not in answers:
                     answers[section] = []
 
-                try:
-                    parsed_question = html.fromstring(block['question'])
-                    question = clean_html(parsed_question).text_content()
-                except (XMLSyntaxError, ParserError):
-                    question = block['question']
-
                 answers[section].append({
                     'answer': students_inputs.get(name, _('Not answered yet.')),
-                    'question': question,
+                    'question': block['question'],
                 })
 
             # Make list of sections-answers
@@ -345,53 +671,19 @@ class EOCJournalXBlock(StudioEditableXBlockMixin, XBlock):
                 {'name': key, 'questions': value}
                 for key, value in answers.items()
             ]
-        return None
-
-    @staticmethod
-    def _iter_pb_answers(response):
-        """
-        Iterate over pb-answer blocks in course blocks API response and yield
-        section, subsection and unit display names along with pb-answer blocks.
-        """
-        blocks = response['blocks']
-        course_block = blocks[response['root']]
-        for section_id in course_block.get('children', []):
-            section_block = blocks[section_id]
-            for subsection_id in section_block.get('children', []):
-                subsection_block = blocks[subsection_id]
-                for unit_id in subsection_block.get('children', []):
-                    unit_block = blocks[unit_id]
-                    for pb_id in unit_block.get('children', []):
-                        pb_block = blocks[pb_id]
-                        for pb_answer_id in pb_block.get('children', []):
-                            pb_answer_block = blocks[pb_answer_id]
-                            yield (
-                                section_block['display_name'],
-                                subsection_block['display_name'],
-                                unit_block['display_name'],
-                                pb_answer_block,
-                            )
+        return []
 
     def list_pb_answers(self, all_blocks=False):
         """
-        Returns a list of dicts with info about all problem builder's pb-answer
+        Returns a `PBAnswerList` with info about all problem builder's pb-answer
         blocks present in the current coures.
 
-        The items are ordered in the order they appear in the course.
+        The items are ordered in the order they appear in the course, and can be
+        accessed like dicts with the `section`, `subsection`, `unit`, `id`, `name`,
+        `question` and `display_name` keys.
         """
         response = self._fetch_pb_answer_blocks(all_blocks)
-        return [
-            {
-                'section': section,
-                'subsection': subsection,
-                'unit': unit,
-                'id': block['id'],
-                'name': block['student_view_data']['name'],
-                'question': block['student_view_data']['question'],
-                'display_name': block['display_name'],
-            }
-            for section, subsection, unit, block in self._iter_pb_answers(response)
-        ]
+        return PBAnswerList.from_course_blocks(iter_pb_answers(response))
 
     def _get_course_id(self):
         """
@@ -401,14 +693,35 @@ class EOCJournalXBlock(StudioEditableXBlockMixin, XBlock):
         course_id = six.text_type(normalize_id(course_id))
         return course_id
 
+    def _get_course_version(self):
+        """
+        Returns the version of the published course content, or None outside of edx-platform.
+
+        The version is cached per course until the course is published. Courses whose modulestore
+        does not version them (old mongo) get a random version, renewed whenever they are published.
+        """
+        try:
+            course_key = self.scope_ids.usage_id.course_key
+        except AttributeError:
+            return None  # We are not in an edX runtime
+        return cached_course_version(course_key)
+
     def _get_current_user(self):
         """
         Returns django.contrib.auth.models.User instance corresponding to the current user.
+
+        The user is read once per request.
         """
         xblock_user = self.runtime.service(self, 'user').get_current_user()
         user_id = xblock_user.opt_attrs['edx-platform.user_id']
-        user = User.objects.get(pk=user_id)  # pylint: disable=no-member
-        return user
+        return loaders.get_loader('users', load_users).load(user_id)
+
+    def _user_is_staff(self):
+        """
+        Returns True if the current user is a member of the course staff.
+        """
+        xblock_user = self.runtime.service(self, 'user').get_current_user()
+        return bool(xblock_user.opt_attrs.get('edx-platform.user_is_staff', False))
 
     def _get_current_anonymous_user_id(self):
         """
@@ -419,12 +732,26 @@ class EOCJournalXBlock(StudioEditableXBlockMixin, XBlock):
     def _get_course_name(self):
         """
         Get the name of the current course, for the downloadable report.
+
+        The name is cached per course, including failed lookups, until the course is published.
         """
         try:
             course_key = self.scope_ids.usage_id.course_key
         except AttributeError:
             return ''  # We are not in an edX runtime
 
+        timeout = getattr(settings, 'EOC_JOURNAL_COURSE_NAME_CACHE_TIMEOUT', DEFAULT_COURSE_NAME_CACHE_TIMEOUT)
+        return cache.get_or_set(
+            course_name_cache_key(course_key),
+            lambda: self._load_course_name(course_key),
+            timeout,
+            layer='course_name',
+        )
+
+    def _load_course_name(self, course_key):
+        """
+        Loads the name of the course with the given key from the modulestore.
+        """
         try:
             course_root_key = course_key.make_usage_key('course', 'course')
             return self.runtime.get_block(course_root_key).display_name
@@ -454,13 +781,16 @@ class EOCJournalXBlock(StudioEditableXBlockMixin, XBlock):
         Fetches and returns dict with progress metrics for the current user
         in the course.
         """
+        from .api_client import ApiClient  # pylint: disable=import-outside-toplevel
+        from .completion_api import CompletionApiClient  # pylint: disable=import-outside-toplevel
+
         user = self._get_current_user()
         course_id = self._get_course_id()
         client = ApiClient(user, course_id)
         completion_client = CompletionApiClient(user, course_id)
 
         user_progress = completion_client.get_user_progress()
-        cohort_average = client.get_cohort_average_progress()
+        cohort_average = self._get_cohort_average_progress(client)
 
         if user_progress is None or cohort_average is None:
             return None
@@ -470,11 +800,40 @@ class EOCJournalXBlock(StudioEditableXBlockMixin, XBlock):
             'cohort_average': int(round(cohort_average)),
         }
 
+    def _get_cohort_average_progress(self, client):
+        """
+        Returns the average progress of the learners of the course, which is cached per course.
+        """
+        timeout = getattr(
+            settings, 'EOC_JOURNAL_COHORT_AVERAGE_CACHE_TIMEOUT', DEFAULT_COHORT_AVERAGE_CACHE_TIMEOUT
+        )
+        key = cache.make_key('cohort_average_progress', self._get_course_id())
+        return cache.get_or_set(key, client.get_cohort_average_progress, timeout, layer='cohort_average')
+
+    def warm_caches(self, pdf=False):
+        """
+        Fills the shared caches read when learners view this block or download its report.
+
+        The block must be bound to a member of the course staff, or, to also render the
+        PDF report of a learner with `pdf`, to that learner.
+        """
+        if pdf:
+            self._render_pdf_report()
+            return
+        provide_pb_answer_list(self)
+        self._get_pb_answer_snapshot()
+        self._get_course_name()
+        if self.display_metrics_section:
+            from .api_client import ApiClient  # pylint: disable=import-outside-toplevel
+            self._get_cohort_average_progress(ApiClient(self._get_current_user(), self._get_course_id()))
+
     def get_proficiency_metrics(self):
         """
         Fetches and returns dict with proficiency (grades) metrics for the current user
         in the course.
         """
+        from .api_client import ApiClient  # pylint: disable=import-outside-toplevel
+
         user = self._get_current_user()
         course_id = self._get_course_id()
         client = ApiClient(user, course_id)
@@ -494,6 +853,8 @@ class EOCJournalXBlock(StudioEditableXBlockMixin, XBlock):
         Fetches and returns dict with engagement metrics for the current user
         and course.
         """
+        from .api_client import ApiClient  # pylint: disable=import-outside-toplevel
+
         user = self._get_current_user()
         course_id = self._get_course_id()
         client = ApiClient(user, course_id)
@@ -526,20 +887,14 @@ class EOCJournalXBlock(StudioEditableXBlockMixin, XBlock):
         If `all_blocks` is True, returns all blocks, including those that are
         visible only to specific learners (cohort groups, randomized content...).
         Only staff users can request `all_blocks`.
-        """
-        user = self._get_current_user()
-        course_id = self._get_course_id()
 
-        client = CourseBlocksApiClient(user, course_id)
-        response = client.get_blocks(
-            all_blocks=all_blocks,
-            depth='all',
-            requested_fields='student_view_data,children',
-            student_view_data='pb-answer',
-            block_types_filter='pb-answer,problem-builder,vertical,sequential,chapter,course',
-            username=user.username,
-        )
-        return response
+        The blocks are fetched once per request, and concurrent fetches of the same blocks
+        share a single request: per course for `all_blocks`, and per course and visibility
+        context otherwise, as the blocks visible to learners depend on their cohorts and group
+        memberships (see `visibility_context`).
+        """
+        key = (self._get_course_id(), self._get_current_user(), all_blocks)
+        return loaders.get_loader('course_blocks', load_course_blocks).load(key)
 
     def _expand_static_url(self, url, absolute=False):
         """
@@ -547,6 +902,18 @@ class EOCJournalXBlock(StudioEditableXBlockMixin, XBlock):
         only portable URL format for static files that works across export/import and reruns).
         This method is unfortunately a bit hackish since XBlock does not provide a low-level API
         for this.
+
+        Expanded URLs are memoized per course.
+        """
+        return static_url_cache.get_or_set(
+            (self._get_course_id(), url, absolute),
+            lambda: self._rewrite_static_url(url, absolute),
+            self._get_student_view_data_cache_timeout(),
+        )
+
+    def _rewrite_static_url(self, url, absolute):
+        """
+        Rewrites a static URL with the runtime of the block.
         """
         if hasattr(self.runtime, 'replace_urls'):
             url = self.runtime.replace_urls('"{}"'.format(url))[1:-1]
@@ -590,14 +957,17 @@ class EOCJournalXBlock(StudioEditableXBlockMixin, XBlock):
         course_id = six.text_type(normalize_id(course_id))
         course_key = CourseKey.from_string(course_id)
 
-        transformed_block_ids = []
-        for selected in block.selected_pb_answer_blocks:
-            usage_key = UsageKey.from_string(selected)
+        def map_into_course(block_id):
+            """
+            Returns the id of the block in the imported course.
+            """
+            usage_key = UsageKey.from_string(block_id)
             if usage_key.course_key == course_key:
-                transformed_block_ids.append(selected)
-            else:
-                mapped = usage_key.map_into_course(course_key)
-                transformed_block_ids.append(str(mapped))
+                return block_id
+            return str(usage_key.map_into_course(course_key))
 
-        block.selected_pb_answer_blocks = transformed_block_ids
+        block.selected_pb_answer_blocks = [map_into_course(block_id) for block_id in block.selected_pb_answer_blocks]
+        block.selected_pb_answer_snapshot = [
+            dict(entry, id=map_into_course(entry['id'])) for entry in block.selected_pb_answer_snapshot
+        ]
         return block
@@ -0,0 +1,113 @@
+"""
+Handlers of the Course Journal blocks streaming the freeform answers in the `EXPORT_FORMATS`.
+
+Learners export their own answers; course staff export the answers of all learners in the course.
+"""
+from __future__ import unicode_literals
+
+import webob
+from django.conf import settings
+from django.db.models import Q
+from xblock.core import XBlock
+
+from .course_data import clean_question
+from .exporters import EXPORT_FORMATS, iter_course_answers_csv
+
+# Number of rows fetched per query when exporting the answers of all learners in a course.
+DEFAULT_EXPORT_CHUNK_SIZE = 2000
+
+
+def iter_course_answers(course_id, answer_names, chunk_size=None):
+    """
+    Yields (student_id, name, student_input) tuples of all learners' answers to the given
+    pb-answers in the course, ordered by student id.
+
+    Answers are read in chunks of `chunk_size` rows using keyset pagination, so the memory
+    used does not depend on the number of learners, even on database backends which do not
+    stream query results.
+    """
+    chunk_size = chunk_size or getattr(settings, 'EOC_JOURNAL_EXPORT_CHUNK_SIZE', DEFAULT_EXPORT_CHUNK_SIZE)
+    from problem_builder.models import Answer  # pylint: disable=import-outside-toplevel
+
+    answers = Answer.objects.filter(  # pylint: disable=no-member
+        course_key=course_id,
+        name__in=answer_names,
+    ).order_by('student_id', 'name').values_list('student_id', 'name', 'student_input')
+
+    last = None
+    while True:
+        chunk = answers
+        if last is not None:
+            chunk = chunk.filter(Q(student_id__gt=last[0]) | Q(student_id=last[0], name__gt=last[1]))
+        count = 0
+        for row in chunk[:chunk_size].iterator():
+            count += 1
+            last = row
+            yield row
+        if count < chunk_size:
+            return
+
+
+class ExportHandlersMixin(object):  # pylint: disable=useless-object-inheritance
+    """
+    Export handlers of `EOCJournalXBlock`.
+    """
+    # pylint: disable=no-member
+
+    def _serve_export(self, export_format):
+        """
+        Streams the user's freeform answers in one of the `EXPORT_FORMATS`.
+        """
+        exporter, content_type, extension = EXPORT_FORMATS[export_format]
+        report_header_name = self.pdf_report_title or self._get_course_name()
+        answer_sections = self.list_user_pb_answers_by_section()
+
+        return webob.Response(
+            app_iter=(chunk.encode('utf-8') for chunk in exporter(report_header_name, answer_sections)),
+            charset='UTF-8',
+            content_type=content_type,
+            content_disposition='attachment; filename="journal.{}"'.format(extension),
+        )
+
+    @XBlock.handler
+    def serve_html(self, request, _suffix):
+        """
+        Serves an HTML document containing user's freeform answers.
+        """
+        return self._serve_export('html')
+
+    @XBlock.handler
+    def serve_markdown(self, request, _suffix):
+        """
+        Serves a Markdown document containing user's freeform answers.
+        """
+        return self._serve_export('markdown')
+
+    @XBlock.handler
+    def serve_csv(self, request, _suffix):
+        """
+        Serves a CSV file containing user's freeform answers.
+        """
+        return self._serve_export('csv')
+
+    @XBlock.handler
+    def export_course_answers(self, request, _suffix):
+        """
+        Streams a CSV file with the answers of all learners in the course to the selected
+        pb-answers. Only available to course staff.
+        """
+        if not self._user_is_staff():
+            return webob.Response(status=403)
+
+        blocks = [
+            dict(block, question=clean_question(block['question']))
+            for block in self.list_pb_answers(all_blocks=True).select(self.selected_pb_answer_blocks)
+        ]
+        rows = iter_course_answers(self._get_course_id(), [block['name'] for block in blocks])
+
+        return webob.Response(
+            app_iter=(chunk.encode('utf-8') for chunk in iter_course_answers_csv(blocks, rows)),
+            charset='UTF-8',
+            content_type='text/csv',
+            content_disposition='attachment; filename="journal-course-answers.csv"',
+        )
@@ -0,0 +1,106 @@
+"""
+Lightweight export formats for the learner's freeform answers.
+
+Every exporter is a generator yielding text chunks, so the export can be streamed to the
+client while it is produced. They are much cheaper than rendering the PDF report.
+"""
+from __future__ import unicode_literals
+import csv
+from collections import OrderedDict, namedtuple
+from io import BytesIO
+from itertools import groupby
+from operator import itemgetter
+
+import six
+from django.utils.html import escape, linebreaks
+
+# First characters of CSV cells which spreadsheet applications treat as the start of a formula.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+ExportFormat = namedtuple('ExportFormat', ['exporter', 'content_type', 'extension'])
+
+
+def iter_html(title, answer_sections):
+    """
+    Yields a standalone HTML document with the answers.
+    """
+    yield '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>{}</title>\n</head>\n<body>\n'.format(
+        escape(title)
+    )
+    yield '<h1>{}</h1>\n'.format(escape(title))
+    for section in answer_sections or []:
+        yield '<h2>{}</h2>\n'.format(escape(section['name']))
+        for question in section['questions']:
+            yield '<h3>{}</h3>\n{}\n<hr>\n'.format(escape(question['question']), linebreaks(question['answer'], True))
+    yield '</body>\n</html>\n'
+
+
+def iter_markdown(title, answer_sections):
+    """
+    Yields a Markdown document with the answers.
+    """
+    yield '# {}\n\n'.format(title)
+    for section in answer_sections or []:
+        yield '## {}\n\n'.format(section['name'])
+        for question in section['questions']:
+            yield '### {}\n\n{}\n\n'.format(question['question'], question['answer'])
+
+
+def _csv_cell(value):
+    """
+    Returns `value` as the text of a CSV cell.
+
+    Cells which spreadsheet applications would evaluate as formulas are prefixed with a quote.
+    """
+    value = six.text_type(value)
+    if value.startswith(FORMULA_PREFIXES):
+        value = "'" + value
+    return value
+
+
+def _csv_line(values):
+    """
+    Returns `values` formatted as a single CSV line.
+    """
+    cells = [_csv_cell(value) for value in values]
+    if six.PY2:
+        # The Python 2 csv module only handles byte strings.
+        line = BytesIO()
+        csv.writer(line).writerow([cell.encode('utf-8') for cell in cells])
+        return line.getvalue().decode('utf-8')
+    line = six.StringIO()
+    csv.writer(line).writerow(cells)
+    return line.getvalue()
+
+
+def iter_csv(title, answer_sections):  # pylint: disable=unused-argument
+    """
+    Yields CSV lines with one row per question.
+    """
+    yield _csv_line(['section', 'question', 'answer'])
+    for section in answer_sections or []:
+        for question in section['questions']:
+            yield _csv_line([section['name'], question['question'], question['answer']])
+
+
+def iter_course_answers_csv(blocks, answer_rows):
+    """
+    Yields CSV lines with the answers of all learners in a course.
+
+    `blocks` is the list of selected pb-answers in course order (dicts with `name`, `section`
+    and `question`) and `answer_rows` an iterable of (student_id, name, student_input) tuples
+    ordered by student id. Only the answers of one learner are held in memory at a time.
+    """
+    yield _csv_line(['student_id', 'section', 'question', 'answer'])
+    for student_id, rows in groupby(answer_rows, key=itemgetter(0)):
+        student_inputs = {name: student_input for _, name, student_input in rows}
+        for block in blocks:
+            if block['name'] in student_inputs:
+                yield _csv_line([student_id, block['section'], block['question'], student_inputs[block['name']]])
+
+
+EXPORT_FORMATS = OrderedDict([
+    ('html', ExportFormat(iter_html, 'text/html', 'html')),
+    ('markdown', ExportFormat(iter_markdown, 'text/markdown', 'md')),
+    ('csv', ExportFormat(iter_csv, 'text/csv', 'csv')),
+])
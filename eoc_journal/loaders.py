@@ -0,0 +1,98 @@
+"""
+Request-scoped loaders batching and memoizing the data shared by the journal blocks of a request.
+
+A vertical can contain several journal blocks, and the mobile apps evaluate many blocks in one
+request. The loaders follow the DataLoader pattern: keys requested with `prime` are queued, and
+the next `load` or `load_many` loads all queued keys with a single call to the batch function.
+Loaded values are memoized until the end of the request.
+
+Loaders are kept in the request cache of edx-django-utils, which the LMS clears at the start of
+every request. Work done outside of requests, such as background PDF regenerations and management
+commands, runs in `request_scope()` so that loaded data is not kept from one learner to the next.
+Without edx-django-utils every lookup gets a new loader, so nothing is shared.
+"""
+from __future__ import unicode_literals
+from builtins import object
+from contextlib import contextmanager
+
+from .compat import get_request_cache
+
+REQUEST_CACHE_NAMESPACE = 'eoc_journal.loaders'
+
+
+class DataLoader(object):  # pylint: disable=useless-object-inheritance
+    """
+    Loads values by key in batches, memoizing them.
+
+    `batch_load(keys)` must return the values of `keys` in the same order.
+    """
+
+    def __init__(self, batch_load):
+        self._batch_load = batch_load
+        self._values = {}
+        self._queue = []
+
+    def prime(self, keys):
+        """
+        Queues `keys` to be loaded along with the next load.
+        """
+        for key in keys:
+            if key not in self._values and key not in self._queue:
+                self._queue.append(key)
+
+    def load_many(self, keys):
+        """
+        Returns the values of `keys`, loading them along with the queued keys.
+        """
+        keys = list(keys)
+        self.prime(keys)
+        if self._queue:
+            queue, self._queue = self._queue, []
+            self._values.update(zip(queue, self._batch_load(queue)))
+        return [self._values[key] for key in keys]
+
+    def load(self, key):
+        """
+        Returns the value of `key`.
+        """
+        return self.load_many([key])[0]
+
+    def clear(self, key):
+        """
+        Forgets the value of `key`, so that it is loaded again.
+        """
+        self._values.pop(key, None)
+
+
+def get_loader(name, batch_load):
+    """
+    Returns the loader `name` of the current request, creating it with `batch_load` if needed.
+    """
+    loaders = get_request_cache(REQUEST_CACHE_NAMESPACE)
+    if loaders is None:
+        return DataLoader(batch_load)
+    loader = loaders.get(name)
+    if loader is None:
+        loader = loaders[name] = DataLoader(batch_load)
+    return loader
+
+
+def clear_loaders():
+    """
+    Forgets all loaders of the current request.
+    """
+    loaders = get_request_cache(REQUEST_CACHE_NAMESPACE)
+    if loaders is not None:
+        loaders.clear()
+
+
+@contextmanager
+def request_scope():
+    """
+    Runs the enclosed code with loaders of its own, as if it was a request of its own.
+    """
+    clear_loaders()
+    try:
+        yield
+    finally:
+        clear_loaders()
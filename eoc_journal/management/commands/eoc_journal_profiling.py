@@ -0,0 +1,59 @@
+"""
+Shows or changes the profiling configuration of the Course Journal blocks of all LMS processes.
+
+Profiling must be enabled with the EOC_JOURNAL_PROFILE_DIR Django setting. The options set here
+override the EOC_JOURNAL_PROFILE_* settings until they are reset.
+
+Examples:
+
+    ./manage.py lms eoc_journal_profiling --sample-rate 10 --slow-seconds 5
+    ./manage.py lms eoc_journal_profiling --reset
+"""
+from __future__ import unicode_literals
+
+from django.core.management.base import BaseCommand
+
+from eoc_journal import profiling
+
+
+class Command(BaseCommand):
+    """
+    Shows or changes the profiling configuration.
+    """
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sample-rate',
+            type=int,
+            help='Profile one in this many calls (0 disables sampling).',
+        )
+        parser.add_argument(
+            '--slow-seconds',
+            type=float,
+            help='Keep the profiles of calls slower than this, profiling every call (0 keeps all of them).',
+        )
+        parser.add_argument(
+            '--max-files',
+            type=int,
+            help='Number of profiles kept.',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Restore the configuration of the Django settings.',
+        )
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            profiling.set_config(**{name: None for name in profiling.CONFIG_KEYS})
+
+        overrides = {
+            name: options[name] for name in profiling.CONFIG_KEYS if options[name] is not None
+        }
+        if overrides:
+            profiling.set_config(**overrides)
+
+        config = profiling.get_config()
+        for name in profiling.CONFIG_KEYS:
+            self.stdout.write('{}: {}'.format(name, config[name]))
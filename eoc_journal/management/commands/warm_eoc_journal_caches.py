@@ -0,0 +1,151 @@
+"""
+Warms the caches of the Course Journal blocks of a course before a traffic spike, such as the
+last day of a course run.
+
+For every journal in the course it caches the pb-answer structure with cleaned questions, the
+course name and, if the journal displays metrics, the average progress of the learners. With
+--pdfs it also renders the PDF report of every active learner for every journal. Reports are
+rendered by at most EOC_JOURNAL_PDF_RENDER_QUEUE_LIMIT workers, and renders rejected because the
+render queue is full are retried.
+
+Example:
+
+    ./manage.py lms warm_eoc_journal_caches course-v1:Org+Course+Run --username staff --pdfs --workers 8
+"""
+from __future__ import unicode_literals
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from eoc_journal.compat import get_course_block_usage_keys, iter_active_learners, load_block_for_user
+from eoc_journal.loaders import request_scope
+from eoc_journal.render_pool import DEFAULT_PDF_RENDER_QUEUE_LIMIT, RenderQueueFull
+
+log = logging.getLogger(__name__)
+
+# Number of times a render rejected because the render queue is full is attempted again.
+RENDER_RETRIES = 5
+
+# Number of tasks submitted ahead of the workers.
+TASKS_PER_WORKER = 2
+
+
+def warm_block(user, usage_key, pdf):
+    """
+    Warms the caches of a journal block bound to `user`.
+    """
+    try:
+        for attempt in range(RENDER_RETRIES + 1):
+            try:
+                with request_scope():
+                    load_block_for_user(user, usage_key).warm_caches(pdf=pdf)
+                return
+            except RenderQueueFull as error:
+                if attempt == RENDER_RETRIES:
+                    raise
+                time.sleep(error.retry_after)
+    finally:
+        # Worker threads open their own database connections.
+        connection.close()
+
+
+def task_succeeded(name, future, task):
+    """
+    Returns True if the `warm_block` task run by `future` succeeded, and logs its error otherwise.
+    """
+    try:
+        future.result()
+    except Exception:  # pylint: disable=broad-except
+        user, usage_key, _pdf = task
+        log.exception('Failed to warm the %s of %s for %s.', name, usage_key, user.username)
+        return False
+    return True
+
+
+class Command(BaseCommand):
+    """
+    Warms the caches of the Course Journal blocks of a course.
+    """
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_id', help='Id of the course.')
+        parser.add_argument(
+            '--username',
+            required=True,
+            help='Course staff user to fetch the course structure as.',
+        )
+        parser.add_argument(
+            '--pdfs',
+            action='store_true',
+            help='Also render the PDF reports of all active learners.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of journals or reports warmed at once (default 4).',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            course_key = CourseKey.from_string(options['course_id'])
+        except InvalidKeyError:
+            # pylint: disable=raise-missing-from
+            raise CommandError('Invalid course id: {}'.format(options['course_id']))
+        try:
+            staff = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            # pylint: disable=raise-missing-from
+            raise CommandError('No user named {}.'.format(options['username']))
+
+        journal_keys = get_course_block_usage_keys(course_key, 'eoc-journal')
+        self.stdout.write('Found {} Course Journal blocks in {}.'.format(len(journal_keys), course_key))
+        if not journal_keys:
+            return
+
+        tasks = [(staff, key, False) for key in journal_keys]
+        self.warm('course structure', tasks, len(tasks), options['workers'])
+        if options['pdfs']:
+            queue_limit = getattr(settings, 'EOC_JOURNAL_PDF_RENDER_QUEUE_LIMIT', DEFAULT_PDF_RENDER_QUEUE_LIMIT)
+            tasks = ((learner, key, True) for learner in iter_active_learners(course_key) for key in journal_keys)
+            self.warm('PDF reports', tasks, None, min(options['workers'], queue_limit))
+
+    def warm(self, name, tasks, total, workers):
+        """
+        Runs `warm_block` for the `tasks` iterable in `workers` threads, reporting progress as they complete.
+
+        Tasks are submitted as workers become free, so they are not all kept in memory. `total` is
+        the number of tasks if known.
+        """
+        done = failed = 0
+        step = max(total // 10, 1) if total else 100
+        workers = max(workers, 1)
+        tasks = iter(tasks)
+        pending = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                for task in tasks:
+                    pending[executor.submit(warm_block, *task)] = task
+                    if len(pending) >= workers * TASKS_PER_WORKER:
+                        break
+                if not pending:
+                    break
+                completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    done += 1
+                    if not task_succeeded(name, future, pending.pop(future)):
+                        failed += 1
+                    if done % step == 0 or done == total:
+                        self.stdout.write('Warmed {}: {}{} ({} failed)'.format(
+                            name, done, '/{}'.format(total) if total else '', failed,
+                        ))
+        if not total:
+            self.stdout.write('Warmed {}: {} ({} failed)'.format(name, done, failed))
@@ -0,0 +1,178 @@
+"""
+Metadata of the pb-answers selected in a Course Journal block.
+
+The section, name and question of the selected pb-answers are stored in the block when it is
+saved in Studio, so that learners' requests do not need to list every pb-answer of the course.
+The snapshot is checked against the Course Blocks API once per published course version.
+"""
+from __future__ import unicode_literals
+import logging
+
+from django.conf import settings
+
+from . import cache
+from .course_data import clean_question
+
+log = logging.getLogger(__name__)
+
+# Seconds the list of pb-answers of a course version is cached for the Studio editor.
+# Can be overridden with the EOC_JOURNAL_PB_ANSWER_LIST_CACHE_TIMEOUT Django setting.
+DEFAULT_PB_ANSWER_LIST_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Seconds the pb-answers visible to a learner (depending on cohorts, content groups, randomized
+# content...) are cached for, per published course version. 0 disables the cache.
+# Can be overridden with the EOC_JOURNAL_VISIBLE_PB_ANSWERS_CACHE_TIMEOUT Django setting.
+DEFAULT_VISIBLE_PB_ANSWERS_CACHE_TIMEOUT = 5 * 60
+
+# Metadata of the selected pb-answers stored in `selected_pb_answer_snapshot`.
+PB_ANSWER_SNAPSHOT_KEYS = ('id', 'section', 'name', 'question')
+
+
+def make_pb_answer_snapshot(blocks, selected_ids):
+    """
+    Returns the metadata of the pb-answers among `blocks` (as returned by `list_pb_answers`)
+    whose id is in `selected_ids`, in course order.
+    """
+    selected_ids = set(selected_ids)
+    return [
+        {key: block[key] for key in PB_ANSWER_SNAPSHOT_KEYS}
+        for block in blocks
+        if block['id'] in selected_ids
+    ]
+
+
+def clean_questions(blocks):
+    """
+    Returns `blocks` with the HTML of their questions converted to text.
+    """
+    return [dict(block, question=clean_question(block['question'])) for block in blocks]
+
+
+class PBAnswerSnapshotMixin(object):  # pylint: disable=useless-object-inheritance,too-few-public-methods
+    """
+    Reads the selected pb-answers of a Course Journal block from its snapshot.
+
+    Mixed into `EOCJournalXBlock`, which provides the `selected_pb_answer_blocks` and
+    `selected_pb_answer_snapshot` fields and `list_pb_answers`.
+    """
+    # pylint: disable=no-member
+
+    def _get_selected_pb_answers(self):
+        """
+        Returns the section, name and cleaned question of the selected pb-answers visible to the
+        current user, in course order.
+
+        The metadata is read from the snapshot stored when the block was saved (see
+        `_get_pb_answer_snapshot`), and the pb-answers the user cannot see (cohorts, content
+        groups, randomized content...) are left out.
+        """
+        visible_ids = self._get_visible_pb_answer_ids()
+        snapshot = self._get_pb_answer_snapshot()
+        snapshot_ids = {entry['id'] for entry in snapshot}
+        if any(block_id in visible_ids and block_id not in snapshot_ids for block_id in self.selected_pb_answer_blocks):
+            snapshot = self._complete_pb_answer_snapshot(snapshot)
+        return [entry for entry in snapshot if entry['id'] in visible_ids]
+
+    def _pb_answer_snapshot_cache_key(self):
+        """
+        Returns the cache key of the verified snapshot, or None if the course version is not known.
+        """
+        course_version = self._get_course_version()
+        if course_version is None:
+            return None
+        return cache.make_key('pb_answer_snapshot', self.scope_ids.usage_id, course_version)
+
+    def _get_pb_answer_snapshot(self):
+        """
+        Returns the cleaned metadata of the selected pb-answers, in course order, for all users.
+
+        The snapshot stored when the block was saved is checked against the Course Blocks API
+        once per published course version. When the selection changed since the block was saved,
+        the snapshot is rebuilt from the pb-answers visible to the current user, and completed
+        by the requests of users who can see other selected pb-answers.
+        """
+        snapshot = self.selected_pb_answer_snapshot
+        if {block['id'] for block in snapshot} != set(self.selected_pb_answer_blocks):
+            # The block was saved before snapshots were stored, or its selection was reset.
+            def build():
+                """
+                Builds the snapshot from the Course Blocks API.
+                """
+                return clean_questions(
+                    make_pb_answer_snapshot(self.list_pb_answers(), self.selected_pb_answer_blocks)
+                )
+        else:
+            def build():
+                """
+                Verifies the stored snapshot against the Course Blocks API.
+                """
+                return clean_questions(self._verify_pb_answer_snapshot(snapshot))
+
+        key = self._pb_answer_snapshot_cache_key()
+        if key is None:
+            return build()
+        timeout = getattr(
+            settings, 'EOC_JOURNAL_PB_ANSWER_LIST_CACHE_TIMEOUT', DEFAULT_PB_ANSWER_LIST_CACHE_TIMEOUT
+        )
+        return cache.get_or_set(key, build, timeout, layer='pb_answer_snapshot')
+
+    def _complete_pb_answer_snapshot(self, snapshot):
+        """
+        Returns `snapshot` with the selected pb-answers visible to the current user it is missing,
+        and caches it for the other users.
+
+        The entries of the current user's pb-answers are in their course order, followed by the
+        entries only other users can see.
+        """
+        current = clean_questions(
+            make_pb_answer_snapshot(self.list_pb_answers(), self.selected_pb_answer_blocks)
+        )
+        current_ids = {entry['id'] for entry in current}
+        completed = current + [entry for entry in snapshot if entry['id'] not in current_ids]
+        key = self._pb_answer_snapshot_cache_key()
+        if key is not None:
+            timeout = getattr(
+                settings, 'EOC_JOURNAL_PB_ANSWER_LIST_CACHE_TIMEOUT', DEFAULT_PB_ANSWER_LIST_CACHE_TIMEOUT
+            )
+            cache.store(key, completed, timeout)
+        return completed
+
+    def _get_visible_pb_answer_ids(self):
+        """
+        Returns the set of ids of the pb-answers of the course visible to the current user.
+
+        They are cached per user and published course version for
+        EOC_JOURNAL_VISIBLE_PB_ANSWERS_CACHE_TIMEOUT seconds, so changes of cohorts and group
+        memberships are picked up after that time.
+        """
+        def load():
+            """
+            Lists the pb-answers visible to the user with the Course Blocks API.
+            """
+            return [block['id'] for block in self.list_pb_answers()]
+
+        course_version = self._get_course_version()
+        timeout = getattr(
+            settings, 'EOC_JOURNAL_VISIBLE_PB_ANSWERS_CACHE_TIMEOUT', DEFAULT_VISIBLE_PB_ANSWERS_CACHE_TIMEOUT
+        )
+        if course_version is None or not timeout:
+            return set(load())
+        key = cache.make_key(
+            'visible_pb_answers', self._get_course_id(), course_version, self._get_current_anonymous_user_id()
+        )
+        return set(cache.get_or_set(key, load, timeout, layer='visible_pb_answers'))
+
+    def _verify_pb_answer_snapshot(self, snapshot):
+        """
+        Returns `snapshot` with the metadata of every pb-answer refreshed from the Course Blocks API.
+
+        Entries of pb-answers which are not visible to the current user are kept as they are.
+        """
+        current = {
+            block['id']: block
+            for block in make_pb_answer_snapshot(self.list_pb_answers(), self.selected_pb_answer_blocks)
+        }
+        verified = [current.get(entry['id'], entry) for entry in snapshot]
+        if verified != snapshot:
+            log.info('The selected pb-answers of %s changed since the block was saved.', self.scope_ids.usage_id)
+        return verified
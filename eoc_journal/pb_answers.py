@@ -0,0 +1,153 @@
+"""
+Compact records of the pb-answer blocks of a course.
+
+Courses can have thousands of pb-answers, and their lists are kept in caches for many courses
+at once, so every pb-answer is a `__slots__` record instead of a dict. Section, subsection and
+unit names are interned and shared by all pb-answers of a unit through a single tuple.
+
+Records still support dict-shaped access (`block['name']`, `dict(block)`), so code written for
+the former dicts keeps working.
+"""
+from __future__ import unicode_literals
+from builtins import object
+
+from six.moves import intern
+
+
+def _intern(name):
+    """
+    Returns the interned copy of `name`.
+    """
+    try:
+        return intern(name)
+    except TypeError:
+        return name  # Python 2 only interns byte strings.
+
+
+class PBAnswer(object):  # pylint: disable=useless-object-inheritance
+    """
+    A pb-answer block with the names of the section, subsection and unit it belongs to.
+    """
+
+    __slots__ = ('_ancestors', 'id', 'name', 'question', 'display_name')
+
+    KEYS = ('section', 'subsection', 'unit', 'id', 'name', 'question', 'display_name')
+
+    def __init__(self, ancestors, id, name, question, display_name):  # pylint: disable=redefined-builtin
+        self._ancestors = ancestors
+        self.id = id  # pylint: disable=invalid-name
+        self.name = name
+        self.question = question
+        self.display_name = display_name
+
+    @property
+    def section(self):
+        """
+        The display name of the section.
+        """
+        return self._ancestors[0]
+
+    @property
+    def subsection(self):
+        """
+        The display name of the subsection.
+        """
+        return self._ancestors[1]
+
+    @property
+    def unit(self):
+        """
+        The display name of the unit.
+        """
+        return self._ancestors[2]
+
+    def keys(self):
+        """
+        Returns the keys of the dict representation of the record.
+        """
+        return self.KEYS
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        """
+        Returns the value of `key`, or `default` if the record has no such key.
+        """
+        return getattr(self, key) if key in self.KEYS else default
+
+    def __eq__(self, other):
+        if isinstance(other, (PBAnswer, dict)):
+            return dict(self) == dict(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            setattr(self, slot, value)
+
+    def __repr__(self):
+        return 'PBAnswer({!r})'.format(dict(self))
+
+
+class PBAnswerList(list):
+    """
+    The pb-answers of a course in course order, indexed by usage id.
+
+    The index is built when the list is created, so the list must not be modified afterwards.
+    """
+
+    def __init__(self, blocks=()):
+        super(PBAnswerList, self).__init__(blocks)  # pylint: disable=super-with-arguments
+        self._positions = {block.id: position for position, block in enumerate(self)}
+
+    @classmethod
+    def from_course_blocks(cls, pb_answers):
+        """
+        Builds the list from the (section, subsection, unit, block) tuples of `iter_pb_answers`.
+        """
+        ancestors_by_names = {}
+        records = []
+        for section, subsection, unit, block in pb_answers:
+            names = (section, subsection, unit)
+            ancestors = ancestors_by_names.get(names)
+            if ancestors is None:
+                ancestors = ancestors_by_names[names] = tuple(_intern(name) for name in names)
+            student_view_data = block['student_view_data']
+            records.append(PBAnswer(
+                ancestors,
+                block['id'],
+                student_view_data['name'],
+                student_view_data['question'],
+                block['display_name'],
+            ))
+        return cls(records)
+
+    def position(self, usage_id):
+        """
+        Returns the position of the pb-answer with the given usage id, or None if it is not in the list.
+        """
+        return self._positions.get(usage_id)
+
+    def select(self, usage_ids):
+        """
+        Returns the pb-answers with the given usage ids in course order.
+        """
+        positions = sorted(
+            position for position in (self._positions.get(usage_id) for usage_id in set(usage_ids))
+            if position is not None
+        )
+        return [self[position] for position in positions]
+
+    def __reduce__(self):
+        return (self.__class__, (list(self),))
@@ -0,0 +1,173 @@
+"""
+Plain text PDF renderer drawing straight onto a reportlab canvas.
+
+It reproduces the layout of the platypus based report (title, h1 section, h2 question, body
+text and a rule after every answer) without parsing paragraph markup or running the platypus
+layout engine. Line wrapping is computed up front from the font metrics, measuring every
+distinct word only once per font.
+"""
+from __future__ import unicode_literals
+from builtins import object
+from io import BytesIO
+
+from reportlab.lib import pagesizes
+from reportlab.lib.colors import Color
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.units import inch
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+# Same geometry as a SimpleDocTemplate frame with default margins and padding.
+PAGE_SIZE = pagesizes.letter
+MARGIN = inch
+FRAME_PADDING = 6
+LEFT = MARGIN + FRAME_PADDING
+RIGHT = PAGE_SIZE[0] - MARGIN - FRAME_PADDING
+TOP = PAGE_SIZE[1] - MARGIN - FRAME_PADDING
+BOTTOM = MARGIN + FRAME_PADDING
+WIDTH = RIGHT - LEFT
+
+SECTION_SPACING = 16
+RULE_COLOR = Color(0, 0, 0, 0.1)
+RULE_SPACE_BEFORE = 5
+RULE_SPACE_AFTER = 10
+
+
+class PlainTextPage(object):  # pylint: disable=useless-object-inheritance
+    """
+    Keeps track of the vertical position on the current page and starts new pages as needed.
+    """
+
+    def __init__(self, canv):
+        self.canv = canv
+        self.y = TOP
+        self.at_top = True
+
+    def ensure_space(self, height):
+        """
+        Starts a new page if less than `height` points are left on the current one.
+        """
+        if self.y - height < BOTTOM and not self.at_top:
+            self.canv.showPage()
+            self.y = TOP
+            self.at_top = True
+
+    def space(self, height):
+        """
+        Adds vertical space, which is dropped at the top of a page like in platypus frames.
+        """
+        if not self.at_top:
+            self.y -= height
+
+    def draw_lines(self, lines, style):
+        """
+        Draws already wrapped `lines` with the font, leading and alignment of `style`.
+        """
+        self.space(style.spaceBefore)
+        index = 0
+        while index < len(lines):
+            self.ensure_space(style.leading)
+            count = max(int((self.y - BOTTOM) // style.leading), 1)
+            page_lines = lines[index:index + count]
+            baseline = self.y - style.fontSize
+            if style.alignment == TA_CENTER:
+                self.canv.setFont(style.fontName, style.fontSize)
+                for offset, line in enumerate(page_lines):
+                    self.canv.drawCentredString(LEFT + WIDTH / 2.0, baseline - offset * style.leading, line)
+            else:
+                text = self.canv.beginText(LEFT, baseline)
+                text.setFont(style.fontName, style.fontSize, style.leading)
+                text.textLines(page_lines, trim=0)
+                self.canv.drawText(text)
+            self.y -= len(page_lines) * style.leading
+            self.at_top = False
+            index += len(page_lines)
+        self.space(style.spaceAfter)
+
+    def draw_rule(self):
+        """
+        Draws the horizontal rule separating answers.
+        """
+        self.ensure_space(RULE_SPACE_BEFORE + 1)
+        self.space(RULE_SPACE_BEFORE)
+        self.canv.setStrokeColor(RULE_COLOR)
+        self.canv.setLineWidth(1)
+        self.canv.line(LEFT, self.y, RIGHT, self.y)
+        self.y -= 1 + RULE_SPACE_AFTER
+        self.at_top = False
+
+
+class LineWrapper(object):  # pylint: disable=useless-object-inheritance,too-few-public-methods
+    """
+    Wraps text to the frame width, caching the width of every word for each font and size.
+    """
+
+    def __init__(self):
+        self._widths = {}
+
+    def _word_widths(self, style):
+        """
+        Returns the word width cache for the font and size of `style`.
+        """
+        key = (style.fontName, style.fontSize)
+        if key not in self._widths:
+            self._widths[key] = {}
+        return self._widths[key]
+
+    def wrap(self, text, style):
+        """
+        Splits `text` into lines fitting the frame width. Line breaks in `text` are preserved.
+        """
+        widths = self._word_widths(style)
+        space_width = stringWidth(' ', style.fontName, style.fontSize)
+        lines = []
+        for text_line in (text or '').split('\n'):
+            words = []
+            line_width = 0
+            for word in text_line.split():
+                word_width = widths.get(word)
+                if word_width is None:
+                    word_width = widths[word] = stringWidth(word, style.fontName, style.fontSize)
+                if words and line_width + space_width + word_width > WIDTH:
+                    lines.append(' '.join(words))
+                    words = []
+                    line_width = 0
+                line_width += word_width + (space_width if words else 0)
+                words.append(word)
+            lines.append(' '.join(words))
+        return lines
+
+
+def build_plain_pdf(title, answer_sections, styles, page_compression=1):
+    """
+    Renders the PDF report as plain text using the fonts and sizes of `styles` and returns its content.
+
+    The title is left out if it is None.
+    """
+    pdf_buffer = BytesIO()
+    canv = canvas.Canvas(pdf_buffer, pagesize=PAGE_SIZE, pageCompression=page_compression)
+    page = PlainTextPage(canv)
+    wrap = LineWrapper().wrap
+
+    if title is not None:
+        canv.setTitle(title)
+        page.draw_lines(wrap(title, styles["Title"]), styles["Title"])
+
+    for section in answer_sections or []:
+        heading = wrap(section["name"], styles["h1"])
+        page.space(SECTION_SPACING)
+        # Keep headings together with the first line of what follows them.
+        page.ensure_space(len(heading) * styles["h1"].leading + styles["h2"].leading)
+        page.draw_lines(heading, styles["h1"])
+        for question in section["questions"]:
+            question_lines = wrap(question["question"], styles["h2"])
+            page.ensure_space(
+                styles["h2"].spaceBefore + len(question_lines) * styles["h2"].leading + styles["Normal"].leading
+            )
+            page.draw_lines(question_lines, styles["h2"])
+            page.draw_lines(wrap(question["answer"], styles["Normal"]), styles["Normal"])
+            page.draw_rule()
+
+    canv.showPage()
+    canv.save()
+    return pdf_buffer.getvalue()
@@ -0,0 +1,15 @@
+"""
+Options of the PDF report renderer.
+
+They are kept apart from `pdf_generator` so that the XBlock can refer to them without importing
+reportlab, which is only loaded when a report is rendered.
+"""
+from __future__ import unicode_literals
+
+RICH_TEXT_RENDERER = 'rich'
+PLAIN_TEXT_RENDERER = 'plain'
+
+# Compress page and font streams for the smallest output...
+OPTIMIZE_FOR_SIZE = 'size'
+# ...or skip compression for the fastest render.
+OPTIMIZE_FOR_SPEED = 'speed'
@@ -0,0 +1,109 @@
+"""
+PDF reports assembled from separately rendered section fragments.
+
+When the EOC_JOURNAL_PDF_FRAGMENTS Django setting is enabled, every section of a report is
+rendered as its own PDF document and cached under a digest of the section's questions, answers
+and the rendering options. Building a report only renders the sections which are not cached,
+in parallel in the render pool, and merges all fragments into the final document. A learner
+changing one answer therefore only costs the render of that answer's section.
+
+Every section starts on a new page, and fonts are embedded once per fragment, so the reports
+are somewhat larger than reports rendered in one piece. Merging needs the optional `pypdf`
+package; without it reports are rendered in one piece.
+"""
+from __future__ import unicode_literals
+import hashlib
+import json
+import logging
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import make_key
+from .render_pool import render_pdfs
+from .stats import record_cache_lookup
+
+log = logging.getLogger(__name__)
+
+# Seconds section fragments are cached for. Can be overridden with the
+# EOC_JOURNAL_PDF_FRAGMENT_CACHE_TIMEOUT Django setting.
+DEFAULT_PDF_FRAGMENT_CACHE_TIMEOUT = 7 * 24 * 60 * 60
+
+
+def is_enabled():
+    """
+    Returns True if reports are built from section fragments.
+
+    Fragments are enabled with the EOC_JOURNAL_PDF_FRAGMENTS Django setting and need `pypdf`.
+    """
+    if not getattr(settings, 'EOC_JOURNAL_PDF_FRAGMENTS', False):
+        return False
+    try:
+        import pypdf  # pylint: disable=import-error,unused-import,import-outside-toplevel
+    except ImportError:
+        log.warning('EOC_JOURNAL_PDF_FRAGMENTS is enabled but pypdf is not installed.')
+        return False
+    return True
+
+
+def split_report(title, answer_sections):
+    """
+    Returns the (title, answer_sections) arguments rendering each fragment of a report.
+
+    The first fragment holds the title along with the first section, so short reports do not
+    get a page of their own for the title.
+    """
+    answer_sections = answer_sections or []
+    return [(title, answer_sections[:1])] + [(None, [section]) for section in answer_sections[1:]]
+
+
+def fragment_key(title, answer_sections, options):
+    """
+    Returns the cache key of the fragment rendered from `title` and `answer_sections` with the `build_pdf` `options`.
+    """
+    content = json.dumps([title, answer_sections, options], sort_keys=True)
+    return make_key('pdf_fragment', hashlib.md5(content.encode('utf-8')).hexdigest())
+
+
+def merge_pdfs(fragments, title):
+    """
+    Returns a PDF document with the pages of all `fragments` in order, titled `title`.
+    """
+    from pypdf import PdfReader, PdfWriter  # pylint: disable=import-error,import-outside-toplevel
+
+    writer = PdfWriter()
+    for fragment in fragments:
+        writer.append(PdfReader(BytesIO(fragment)))
+    writer.add_metadata({'/Title': title})
+    pdf_buffer = BytesIO()
+    writer.write(pdf_buffer)
+    return pdf_buffer.getvalue()
+
+
+def build_report(title, answer_sections, options):
+    """
+    Returns the PDF report with `title` and `answer_sections`, rendering the fragments which are not cached.
+
+    `options` are keyword arguments for `build_pdf`. Raises `RenderQueueFull` if fragments have
+    to be rendered while the render queue is full.
+    """
+    fragments = split_report(title, answer_sections)
+    keys = [fragment_key(fragment_title, sections, options) for fragment_title, sections in fragments]
+    timeout = getattr(settings, 'EOC_JOURNAL_PDF_FRAGMENT_CACHE_TIMEOUT', DEFAULT_PDF_FRAGMENT_CACHE_TIMEOUT)
+    cached = cache.get_many(keys) if timeout else {}
+
+    missing = [(key, fragment) for key, fragment in zip(keys, fragments) if key not in cached]
+    record_cache_lookup('pdf_fragment', True, len(fragments) - len(missing))
+    record_cache_lookup('pdf_fragment', False, len(missing))
+    if missing:
+        rendered = dict(zip(
+            [key for key, _ in missing],
+            render_pdfs([(fragment, options) for _, fragment in missing]),
+        ))
+        if timeout:
+            cache.set_many(rendered, timeout)
+        cached.update(rendered)
+    log.info('Built PDF report from %d fragments, %d rendered.', len(fragments), len(missing))
+
+    return merge_pdfs([cached[key] for key in keys], title)
@@ -3,7 +3,12 @@ Utils around Reportlab customizations
 """
 from __future__ import unicode_literals
 import logging
+import re
+import time
+from io import BytesIO
 
+from reportlab.lib import pagesizes
+from reportlab.lib.colors import Color
 from reportlab.lib.enums import TA_CENTER
 from reportlab.lib.fonts import tt2ps
 from reportlab.lib.styles import (
@@ -16,6 +21,16 @@ import reportlab
 import reportlab.rl_config
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont, TTFError
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+from reportlab.platypus.flowables import HRFlowable
+
+from .pdf_canvas import build_plain_pdf
+from .pdf_constants import (  # pylint: disable=unused-import
+    OPTIMIZE_FOR_SIZE,
+    OPTIMIZE_FOR_SPEED,
+    PLAIN_TEXT_RENDERER,
+    RICH_TEXT_RENDERER,
+)
 
 log = logging.getLogger(__name__)
 
@@ -184,3 +199,194 @@ def get_style_sheet(font_url=None):
         ))
 
     return stylesheet
+
+
+PARAGRAPH_SEPARATOR = re.compile(r'\n\s*\n')
+
+# Opening, closing and self-closing tags of reportlab paragraph markup.
+MARKUP_TAG = re.compile(r'<(/?)([a-zA-Z][\w:-]*)\b[^<>]*?(/?)>')
+
+# Tags which are never closed.
+VOID_TAGS = ('br', 'img')
+
+
+class FlowableStream(list):
+    """
+    A list of flowables which is refilled from an iterable as the document consumes it.
+
+    `SimpleDocTemplate.build` pops flowables from the front of the list it is given and checks
+    `len()` before handling the next one, so only `buffer_size` pending flowables are held in
+    memory at any time instead of the whole story.
+    """
+
+    def __init__(self, flowables, buffer_size=32):
+        super(FlowableStream, self).__init__()  # pylint: disable=super-with-arguments
+        self._flowables = iter(flowables)
+        self._buffer_size = buffer_size
+        self._fill()
+
+    def _fill(self):
+        """
+        Tops the buffer up from the underlying iterable.
+        """
+        while list.__len__(self) < self._buffer_size:
+            try:
+                self.append(next(self._flowables))
+            except StopIteration:
+                break
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+
+def split_text(text, max_length):  # pylint: disable=too-many-locals
+    """
+    Yields (starts_paragraph, piece) tuples splitting `text` into paragraphs on blank lines, and
+    paragraphs into pieces which are about `max_length` characters long.
+
+    Text is only split outside of markup tags. Tags open at a split, including tags spanning
+    a blank line, are closed at the end of the piece and opened again at the start of the next
+    one, so that every piece is valid paragraph markup on its own.
+    """
+    open_tags = []  # (name, opening tag) of the tags enclosing the current position.
+    tags_at_space = []
+    prefix = ''
+    start = 0
+    starts_paragraph = True
+    last_space = None
+    index = 0
+
+    def piece(end, tags):
+        """
+        Returns the text from `start` to `end`, with `tags` closed at its end.
+        """
+        closing_tags = ''.join('</{}>'.format(name) for name, _ in reversed(tags))
+        return prefix + text[start:end].strip() + closing_tags
+
+    while index < len(text):
+        match = MARKUP_TAG.match(text, index) if text[index] == '<' else None
+        if match:
+            closing, name, self_closing = match.groups()
+            if closing:
+                names = [open_name for open_name, _ in open_tags]
+                if name in names:
+                    del open_tags[len(names) - 1 - names[::-1].index(name):]
+            elif not self_closing and name.lower() not in VOID_TAGS:
+                open_tags.append((name, match.group(0)))
+            index = match.end()
+            continue
+        separator = PARAGRAPH_SEPARATOR.match(text, index) if text[index] == '\n' else None
+        if separator:
+            if text[start:index].strip():
+                yield starts_paragraph, piece(index, open_tags)
+                starts_paragraph = True
+            prefix = ''.join(tag for _, tag in open_tags)
+            start = index = separator.end()
+            last_space = None
+            continue
+        if text[index].isspace():
+            last_space = index
+            tags_at_space = list(open_tags)
+        if index - start >= max_length and last_space is not None:
+            yield starts_paragraph, piece(last_space, tags_at_space)
+            starts_paragraph = False
+            prefix = ''.join(tag for _, tag in tags_at_space)
+            start = last_space + 1
+            last_space = None
+        index += 1
+    if text[start:].strip():
+        yield starts_paragraph, prefix + text[start:].strip()
+
+
+def iter_answer_flowables(answer, styles, max_length):
+    """
+    Yields paragraph level flowables for a long answer.
+
+    The answer is split on blank lines, and paragraphs longer than `max_length` are further
+    split into several flowables, so reportlab never has to lay out one gigantic paragraph.
+    """
+    first = True
+    for starts_paragraph, chunk in split_text(answer, max_length):
+        style = styles["BodyText"] if starts_paragraph and not first else styles["Normal"]
+        yield Paragraph(chunk, style)
+        first = False
+
+
+def iter_story(title, answer_sections, styles, long_answer_threshold=None):
+    """
+    Yields the flowables making up the PDF report.
+
+    Answers longer than `long_answer_threshold` characters are broken into paragraph level
+    flowables (see `iter_answer_flowables`). The title is left out if it is None.
+    """
+    if title is not None:
+        yield Paragraph(title, styles["Title"])
+
+    for section in answer_sections or []:
+        yield Spacer(0, 16)
+        yield Paragraph(section["name"], styles["h1"])
+        for question in section["questions"]:
+            yield Paragraph(question["question"], styles["h2"])
+            answer = question["answer"]
+            if long_answer_threshold is not None and len(answer) > long_answer_threshold:
+                # pylint: disable=use-yield-from
+                for flowable in iter_answer_flowables(answer, styles, long_answer_threshold):
+                    yield flowable
+            else:
+                yield Paragraph(answer, styles["Normal"])
+            yield HRFlowable(color=Color(0, 0, 0, 0.1), width='100%', spaceBefore=5, spaceAfter=10)
+
+
+def build_pdf(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        title, answer_sections, font_url=None, long_answer_threshold=None, renderer=RICH_TEXT_RENDERER,
+        optimize_for=OPTIMIZE_FOR_SIZE,
+):
+    """
+    Renders a PDF report with the given title and answer sections and returns its content.
+
+    `answer_sections` is a list of dicts as returned by
+    `EOCJournalXBlock.list_user_pb_answers_by_section`.
+
+    If `long_answer_threshold` is set, long answers are rendered paragraph by paragraph and the
+    story is fed to the document incrementally, so peak memory use depends on the page size
+    rather than on the total length of the answers.
+
+    With the `PLAIN_TEXT_RENDERER`, paragraph markup is not interpreted and the report is drawn
+    straight onto a canvas (see `pdf_canvas.build_plain_pdf`), which is several times faster.
+
+    `optimize_for` chooses between the smallest file (`OPTIMIZE_FOR_SIZE`, compressed page and
+    font streams) and the fastest render (`OPTIMIZE_FOR_SPEED`, no compression). Custom TTF fonts
+    are always embedded as subsets containing only the glyphs used in the report.
+
+    A `title` of None renders the sections alone, e.g. for fragments of a report which are merged
+    afterwards (see `pdf_fragments`).
+    """
+    start = time.time()
+    page_compression = 1 if optimize_for == OPTIMIZE_FOR_SIZE else 0
+    styles = get_style_sheet(font_url=font_url)
+
+    if renderer == PLAIN_TEXT_RENDERER:
+        pdf = build_plain_pdf(title, answer_sections, styles, page_compression=page_compression)
+    else:
+        story = iter_story(title, answer_sections, styles, long_answer_threshold)
+        if long_answer_threshold is None:
+            flowables = list(story)
+        else:
+            flowables = FlowableStream(story)
+
+        pdf_buffer = BytesIO()
+        document = SimpleDocTemplate(
+            pdf_buffer,
+            pagesize=pagesizes.letter,
+            title=title,
+            pageCompression=page_compression,
+        )
+        document.build(flowables)
+        pdf = pdf_buffer.getvalue()
+
+    log.debug(
+        'Rendered %s PDF report optimized for %s: %d bytes in %.3fs',
+        renderer, optimize_for, len(pdf), time.time() - start,
+    )
+    return pdf
@@ -0,0 +1,354 @@
+"""
+PDF reports stored in the Django default storage, or the storage EOC_JOURNAL_PDF_STORAGE_BACKEND.
+
+Reports hold the answers of learners, so the storage must not be publicly readable.
+
+Reports are stored per learner under a digest of their content (title, answers and rendering
+options), so a stored report is never stale: once a learner changes an answer their report gets a
+new digest. The digest of the current report of a learner is remembered until one of its answers
+is saved, so downloads of an unchanged report only read the stored file.
+
+When problem_builder saves an answer included in journals whose reports were stored before, the
+learner's reports are regenerated in the background after EOC_JOURNAL_PDF_REGENERATION_DELAY
+seconds, so that they are ready by the time they are downloaded. Saving more answers meanwhile
+postpones the regeneration. Regenerations are Celery tasks when Celery is installed, and timers
+of the web process otherwise.
+
+Reports which have not been downloaded for EOC_JOURNAL_PDF_STORAGE_MAX_AGE seconds are removed,
+as are the least recently downloaded ones while the reports take more than
+EOC_JOURNAL_PDF_STORAGE_MAX_BYTES. `delete_learner_reports` removes the reports of a learner,
+which is done when their account is retired.
+"""
+from __future__ import unicode_literals
+import calendar
+import logging
+import threading
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from opaque_keys.edx.keys import UsageKey
+
+from . import loaders
+from .cache import make_key
+from .compat import get_user_by_anonymous_id, load_block_for_user
+from .stats import record_cache_lookup
+
+log = logging.getLogger(__name__)
+
+STORAGE_PREFIX = 'eoc_journal/reports/'
+
+DEFAULT_PDF_STORAGE_MAX_BYTES = 1024 * 1024 * 1024
+DEFAULT_PDF_STORAGE_MAX_AGE = 30 * 24 * 60 * 60
+DEFAULT_PDF_STORAGE_SWEEP_INTERVAL = 60 * 60
+DEFAULT_PDF_REGENERATION_DELAY = 60
+
+_timers = {}
+_timers_lock = threading.Lock()
+_storage = []
+
+
+def is_enabled():
+    """
+    Returns True if PDF reports are stored, which is enabled with the EOC_JOURNAL_PDF_STORAGE Django setting.
+    """
+    return getattr(settings, 'EOC_JOURNAL_PDF_STORAGE', False)
+
+
+def get_storage():
+    """
+    Returns the storage of the reports: an instance of the storage class EOC_JOURNAL_PDF_STORAGE_BACKEND
+    (dotted path), or the default storage.
+    """
+    backend = getattr(settings, 'EOC_JOURNAL_PDF_STORAGE_BACKEND', None)
+    if backend is None:
+        return default_storage
+    if not _storage or _storage[0][0] != backend:
+        _storage[:] = [(backend, import_string(backend)())]
+    return _storage[0][1]
+
+
+def _max_age():
+    """
+    Returns the number of seconds reports are kept for after they were last downloaded.
+    """
+    return getattr(settings, 'EOC_JOURNAL_PDF_STORAGE_MAX_AGE', DEFAULT_PDF_STORAGE_MAX_AGE)
+
+
+def report_path(student_id, digest):
+    """
+    Returns the storage path of the report of the learner `student_id` with the given content digest.
+    """
+    return '{}{}/{}.pdf'.format(STORAGE_PREFIX, student_id, digest)
+
+
+def record_download(digest):
+    """
+    Records that the report with the given content digest was downloaded.
+    """
+    cache.set(make_key('pdf_downloaded', digest), time.time(), _max_age())
+
+
+def get_or_store(student_id, digest, render):
+    """
+    Returns the stored report of the learner `student_id` with the given content digest, rendering
+    it with `render` and storing it if missing.
+    """
+    storage = get_storage()
+    path = report_path(student_id, digest)
+    stored = storage.exists(path)
+    record_cache_lookup('pdf_storage', stored)
+    if stored:
+        with storage.open(path, 'rb') as report:
+            return report.read()
+
+    content = render()
+    if not storage.exists(path):
+        storage.save(path, ContentFile(content))
+        start_sweep()
+    return content
+
+
+def _current_report_key(usage_id, student_id):
+    """
+    Returns the cache key of the digest of the current report of a learner.
+    """
+    return make_key('pdf_current_report', usage_id, student_id)
+
+
+def remember_report(usage_id, student_id, fingerprint, digest):
+    """
+    Remembers `digest` as the digest of the current report of the learner `student_id` in the
+    journal `usage_id`, as long as the report settings match `fingerprint`.
+    """
+    cache.set(_current_report_key(usage_id, student_id), (fingerprint, digest), _max_age())
+
+
+def get_current_report(usage_id, student_id, fingerprint):
+    """
+    Returns the content of the current report of a learner, or None if it is not known or was removed.
+    """
+    current = cache.get(_current_report_key(usage_id, student_id))
+    if current is None or current[0] != fingerprint:
+        record_cache_lookup('pdf_current_report', False)
+        return None
+    try:
+        with get_storage().open(report_path(student_id, current[1]), 'rb') as report:
+            content = report.read()
+    except (IOError, OSError):
+        record_cache_lookup('pdf_current_report', False)
+        return None
+    record_cache_lookup('pdf_current_report', True)
+    record_download(current[1])
+    return content
+
+
+def register_journal(course_id, usage_id, answer_names):
+    """
+    Records that reports of the journal `usage_id` including the answers `answer_names` are stored,
+    so they are regenerated when one of these answers changes.
+
+    The journals of an answer are kept under keys of their own, numbered with an atomic counter,
+    so concurrent registrations are not lost.
+    """
+    timeout = _max_age()
+    for name in answer_names:
+        registered = make_key('pdf_journal_registered', course_id, name, usage_id)
+        index = cache.get(registered)
+        if index is None:
+            if not cache.add(registered, 0, timeout):
+                continue  # Registered concurrently.
+            counter = make_key('pdf_journals_count', course_id, name)
+            cache.add(counter, 0, None)
+            try:
+                index = cache.incr(counter)
+            except ValueError:  # The counter was evicted meanwhile.
+                cache.add(counter, 0, None)
+                index = cache.incr(counter)
+        elif not index:
+            continue  # Being registered concurrently.
+        cache.set(registered, index, timeout)
+        cache.set(make_key('pdf_journals', course_id, name, index), usage_id, timeout)
+
+
+def journals_with_answer(course_id, answer_name):
+    """
+    Returns the usage ids of the journals with stored reports which include the answer `answer_name`.
+    """
+    count = cache.get(make_key('pdf_journals_count', course_id, answer_name)) or 0
+    keys = [make_key('pdf_journals', course_id, answer_name, index) for index in range(1, count + 1)]
+    return sorted(set(cache.get_many(keys).values()))
+
+
+def _pending_key(usage_id, student_id):
+    """
+    Returns the cache key of the token of the latest regeneration scheduled for a report.
+    """
+    return make_key('pdf_regeneration', usage_id, student_id)
+
+
+def regenerate_pdf_report(usage_id, student_id):
+    """
+    Renders and stores the PDF report of the journal `usage_id` for the learner `student_id`.
+    """
+    user = get_user_by_anonymous_id(student_id)
+    if user is None:
+        return
+    with loaders.request_scope():
+        block = load_block_for_user(user, UsageKey.from_string(usage_id))
+        block._render_pdf_report()  # pylint: disable=protected-access
+
+
+def run_regeneration(usage_id, student_id, token):
+    """
+    Regenerates the report of a learner, unless a later regeneration was scheduled meanwhile.
+    """
+    if cache.get(_pending_key(usage_id, student_id)) != token:
+        return
+    try:
+        regenerate_pdf_report(usage_id, student_id)
+    except Exception:  # pylint: disable=broad-except
+        log.exception('Failed to regenerate the PDF report of %s for %s.', usage_id, student_id)
+    finally:
+        # Timer threads and task workers open their own database connections.
+        connection.close()
+
+
+def _run_timer(key, token):
+    """
+    Regenerates the report of a learner when its debounce timer fires.
+    """
+    with _timers_lock:
+        if _timers.get(key, (None,))[0] == token:
+            del _timers[key]
+    run_regeneration(key[0], key[1], token)
+
+
+def _get_regeneration_task():
+    """
+    Returns the Celery task regenerating reports, or None if Celery is not installed.
+    """
+    # The task is imported by name, as its module imports this one.
+    try:
+        return import_string('eoc_journal.tasks.regenerate_pdf_report_task')
+    except ImportError:
+        return None
+
+
+def schedule_regeneration(usage_id, student_id):
+    """
+    Regenerates the report of the learner `student_id` in the journal `usage_id` in the background
+    after the regeneration delay, superseding the regenerations already scheduled for the report.
+    """
+    delay = getattr(settings, 'EOC_JOURNAL_PDF_REGENERATION_DELAY', DEFAULT_PDF_REGENERATION_DELAY)
+    token = uuid4().hex
+    cache.set(_pending_key(usage_id, student_id), token, delay + _max_age())
+    cache.delete(_current_report_key(usage_id, student_id))
+
+    task = _get_regeneration_task()
+    if task is not None:
+        task.apply_async((usage_id, student_id, token), countdown=delay)
+        return
+
+    key = (usage_id, student_id)
+    with _timers_lock:
+        previous = _timers.pop(key, None)
+        if previous is not None:
+            previous[1].cancel()
+        timer = threading.Timer(delay, _run_timer, [key, token])
+        timer.daemon = True
+        _timers[key] = (token, timer)
+        timer.start()
+
+
+def pending_regenerations():
+    """
+    Returns the number of report regenerations scheduled in timers of the current process.
+    """
+    with _timers_lock:
+        return len(_timers)
+
+
+def _list_reports():
+    """
+    Returns (last used timestamp, path, size) tuples of all stored reports.
+
+    Reports are last used when they were downloaded or, if that was not recorded, stored.
+    """
+    storage = get_storage()
+    reports = []
+    for directory in storage.listdir(STORAGE_PREFIX)[0]:
+        for name in storage.listdir(STORAGE_PREFIX + directory)[1]:
+            path = '{}{}/{}'.format(STORAGE_PREFIX, directory, name)
+            downloaded = cache.get(make_key('pdf_downloaded', name[:-len('.pdf')]))
+            if downloaded is None:
+                modified = storage.get_modified_time(path)
+                if timezone.is_naive(modified):
+                    modified = timezone.make_aware(modified)
+                downloaded = calendar.timegm(modified.utctimetuple())
+            reports.append((downloaded, path, storage.size(path)))
+    return reports
+
+
+def delete_learner_reports(student_id):
+    """
+    Removes all stored reports of the learner `student_id`.
+    """
+    storage = get_storage()
+    directory = STORAGE_PREFIX + student_id
+    try:
+        names = storage.listdir(directory)[1]
+    except (IOError, OSError):
+        return  # No reports stored.
+    for name in names:
+        storage.delete('{}/{}'.format(directory, name))
+    log.info('Removed %d stored PDF reports of a retired learner.', len(names))
+
+
+def sweep():
+    """
+    Removes reports which were not used recently, and the least recently used ones while the
+    stored reports exceed the storage size cap.
+    """
+    max_bytes = getattr(settings, 'EOC_JOURNAL_PDF_STORAGE_MAX_BYTES', DEFAULT_PDF_STORAGE_MAX_BYTES)
+    oldest = time.time() - _max_age()
+    reports = sorted(_list_reports())
+    total = sum(size for _, _, size in reports)
+    removed = 0
+    for last_used, path, size in reports:
+        if last_used >= oldest and total <= max_bytes:
+            break
+        get_storage().delete(path)
+        total -= size
+        removed += 1
+    if removed:
+        log.info('Removed %d stored PDF reports, %d bytes left.', removed, total)
+
+
+def start_sweep():
+    """
+    Runs `sweep` in a background thread, at most once per EOC_JOURNAL_PDF_STORAGE_SWEEP_INTERVAL
+    seconds across all processes sharing the cache.
+    """
+    interval = getattr(settings, 'EOC_JOURNAL_PDF_STORAGE_SWEEP_INTERVAL', DEFAULT_PDF_STORAGE_SWEEP_INTERVAL)
+    if not cache.add(make_key('pdf_storage_sweep'), True, interval):
+        return
+
+    def run():
+        """
+        Sweeps the stored reports, logging failures.
+        """
+        try:
+            sweep()
+        except Exception:  # pylint: disable=broad-except
+            log.exception('Failed to sweep the stored PDF reports.')
+
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
@@ -0,0 +1,161 @@
+"""
+Sampled cProfile capture of slow or randomly chosen calls to `serve_pdf` and `student_view`.
+
+Profiling is enabled by setting EOC_JOURNAL_PROFILE_DIR to a writable directory. One in
+`sample_rate` calls is then profiled, and with `slow_seconds` set every call is profiled and
+kept if it took longer than that. Every kept profile is written as a `.prof` file (readable with
+`pstats` or snakeviz) along with a `.json` file holding the request metadata (course, block,
+number of answers, font...). Only the `max_files` most recent profiles are kept.
+
+The defaults come from the EOC_JOURNAL_PROFILE_SAMPLE_RATE, EOC_JOURNAL_PROFILE_SLOW_SECONDS and
+EOC_JOURNAL_PROFILE_MAX_FILES Django settings, and can be changed at runtime for all processes
+with the `eoc_journal_profiling` management command, which stores them in the Django cache.
+
+Note that with EOC_JOURNAL_PDF_RENDER_WORKERS set, PDF reports are rendered in other processes,
+so profiles of `serve_pdf` only show the time spent waiting for the render.
+"""
+from __future__ import unicode_literals
+import cProfile
+import functools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from uuid import uuid4
+
+import six
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import make_key
+
+log = logging.getLogger(__name__)
+
+# Profile one in this many calls. 0 disables sampling.
+DEFAULT_PROFILE_SAMPLE_RATE = 100
+
+# Keep the profiles of all calls taking longer than this many seconds. None disables it, as it
+# requires profiling every call.
+DEFAULT_PROFILE_SLOW_SECONDS = None
+
+# Number of profiles kept in the profile directory.
+DEFAULT_PROFILE_MAX_FILES = 100
+
+CONFIG_KEYS = ('sample_rate', 'slow_seconds', 'max_files')
+
+_local = threading.local()
+
+
+def config_key():
+    """
+    Returns the cache key of the profiling configuration set at runtime.
+    """
+    return make_key('profiling_config')
+
+
+def get_config():
+    """
+    Returns the profiling configuration: the Django settings overridden by the values set at runtime.
+    """
+    config = {
+        'sample_rate': getattr(settings, 'EOC_JOURNAL_PROFILE_SAMPLE_RATE', DEFAULT_PROFILE_SAMPLE_RATE),
+        'slow_seconds': getattr(settings, 'EOC_JOURNAL_PROFILE_SLOW_SECONDS', DEFAULT_PROFILE_SLOW_SECONDS),
+        'max_files': getattr(settings, 'EOC_JOURNAL_PROFILE_MAX_FILES', DEFAULT_PROFILE_MAX_FILES),
+    }
+    config.update(cache.get(config_key()) or {})
+    return config
+
+
+def set_config(**overrides):
+    """
+    Stores configuration overrides shared by all processes. Values of None restore the settings.
+    """
+    config = cache.get(config_key()) or {}
+    for name, value in overrides.items():
+        if name not in CONFIG_KEYS:
+            raise ValueError('Unknown profiling option: {}'.format(name))
+        if value is None:
+            config.pop(name, None)
+        else:
+            config[name] = value
+    cache.set(config_key(), config, None)
+
+
+def annotate(**metadata):
+    """
+    Adds `metadata` to the profile of the current call, if it is profiled.
+    """
+    current = getattr(_local, 'metadata', None)
+    if current is not None:
+        current.update(metadata)
+
+
+def _write_profile(directory, profiler, metadata, max_files):
+    """
+    Writes a profile and its metadata to `directory`, then removes the oldest profiles beyond `max_files`.
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    name = '{:.6f}-{}-{}'.format(metadata['timestamp'], metadata['handler'], uuid4().hex[:8])
+    profiler.dump_stats(os.path.join(directory, name + '.prof'))
+    with open(os.path.join(directory, name + '.json'), 'w') as metadata_file:  # pylint: disable=unspecified-encoding
+        json.dump(metadata, metadata_file, sort_keys=True, default=six.text_type)
+
+    profiles = sorted(entry for entry in os.listdir(directory) if entry.endswith('.prof'))
+    for entry in profiles[:max(len(profiles) - max_files, 0)]:
+        for path in (entry, entry[:-len('.prof')] + '.json'):
+            try:
+                os.remove(os.path.join(directory, path))
+            except OSError:
+                pass  # Removed by another process.
+
+
+def profiled(handler):
+    """
+    Decorates an XBlock method so that calls to it are profiled as configured (see the module docstring).
+
+    `handler` names the method in the profiles.
+    """
+    def decorator(method):
+        """
+        Wraps `method`.
+        """
+        @functools.wraps(method)
+        def wrapper(block, *args, **kwargs):
+            """
+            Calls `method`, profiling the call if it is sampled or profiling slow calls is enabled.
+            """
+            directory = getattr(settings, 'EOC_JOURNAL_PROFILE_DIR', None)
+            if not directory or getattr(_local, 'metadata', None) is not None:
+                return method(block, *args, **kwargs)
+
+            config = get_config()
+            sampled = bool(config['sample_rate']) and random.random() * config['sample_rate'] < 1
+            if not sampled and config['slow_seconds'] is None:
+                return method(block, *args, **kwargs)
+
+            metadata = _local.metadata = {
+                'handler': handler,
+                'usage_id': block.scope_ids.usage_id,
+                'course_id': getattr(block.runtime, 'course_id', None),
+                'timestamp': time.time(),
+                'pid': os.getpid(),
+            }
+            profiler = cProfile.Profile()
+            start = time.time()
+            try:
+                return profiler.runcall(method, block, *args, **kwargs)
+            finally:
+                _local.metadata = None
+                metadata['duration_seconds'] = time.time() - start
+                metadata['sampled'] = sampled
+                slow = config['slow_seconds'] is not None and metadata['duration_seconds'] > config['slow_seconds']
+                if sampled or slow:
+                    try:
+                        _write_profile(directory, profiler, metadata, config['max_files'])
+                    except (IOError, OSError):
+                        log.exception('Failed to write the profile of %s.', handler)
+        return wrapper
+    return decorator
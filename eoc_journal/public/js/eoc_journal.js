@@ -7,6 +7,9 @@ function EOCJournalXBlock(runtime, element) {
         $('a.pdf-report-link', element).click(function() {
             ga('send', 'event', 'Course Journal', 'click', 'PDF Report Download');
         });
+        $('a.export-report-link', element).click(function() {
+            ga('send', 'event', 'Course Journal', 'click', 'Answers Export Download (' + $(this).data('export-format') + ')');
+        });
         $('a.key-takeaways-link', element).click(function() {
             ga('send', 'event', 'Course Journal', 'click', 'Key Takeaways PDF Download');
         });
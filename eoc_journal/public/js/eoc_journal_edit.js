@@ -0,0 +1,124 @@
+/* Javascript loaded in the Studio editor of the Course Journal */
+
+function EOCJournalStudioEdit(runtime, element, data) {
+    StudioEditableXBlockMixin(runtime, element);
+
+    // The selected pb-answers are saved by the mixin from the (hidden) JSON control of the field;
+    // the selector below keeps it up to date while pages of pb-answers are loaded from the server.
+    var $field = $('li.field[data-field-name=selected_pb_answer_blocks]', element);
+    var $control = $field.find('.field-data-control').hide();
+    var $selector = $('<div class="eoc-pb-answer-selector"></div>').insertAfter($control);
+    var $search = $('<input type="search" class="eoc-pb-answer-search">')
+        .attr('placeholder', data.strings.search)
+        .appendTo($selector);
+    var $selectedList = $('<ul class="list-settings eoc-pb-answer-selected"></ul>').appendTo($selector);
+    var $resultList = $('<ul class="list-settings eoc-pb-answer-results"></ul>').appendTo($selector);
+    var $pages = $('<div class="eoc-pb-answer-pages"></div>').appendTo($selector);
+    var $previous = $('<button type="button" class="eoc-pb-answer-previous"></button>')
+        .text(data.strings.previous)
+        .appendTo($pages);
+    var $pageInfo = $('<span class="eoc-pb-answer-page-info"></span>').appendTo($pages);
+    var $next = $('<button type="button" class="eoc-pb-answer-next"></button>')
+        .text(data.strings.next)
+        .appendTo($pages);
+
+    var searchUrl = runtime.handlerUrl(element, 'search_pb_answers');
+    var selected = JSON.parse($control.val() || '[]');
+    var labels = {};
+    var currentPage = data.page;
+    var itemCount = 0;
+    var requestCount = 0;
+    var searchTimeout = null;
+
+    $.each(data.selected, function(index, choice) {
+        labels[choice.value] = choice.display_name;
+    });
+
+    function renderItem(choice) {
+        var id = 'xb-field-edit-selected_pb_answer_blocks-' + (++itemCount);
+        var $item = $('<li class="list-settings-item"></li>');
+        $('<input type="checkbox">')
+            .attr({id: id, value: JSON.stringify(choice.value)})
+            .prop('checked', selected.indexOf(choice.value) !== -1)
+            .appendTo($item);
+        $('<label></label>').attr('for', id).text(choice.display_name).appendTo($item);
+        return $item;
+    }
+
+    function render() {
+        var onPage = {};
+        $resultList.empty();
+        $.each(currentPage.results, function(index, choice) {
+            labels[choice.value] = choice.display_name;
+            onPage[choice.value] = true;
+            $resultList.append(renderItem(choice));
+        });
+        if (!currentPage.results.length) {
+            $resultList.append($('<li></li>').text(data.strings.none_available));
+        }
+        // Selections which are not on the current page are listed above it, so they can be removed.
+        $selectedList.empty();
+        $.each(selected, function(index, value) {
+            if (!onPage[value]) {
+                $selectedList.append(renderItem({value: value, display_name: labels[value] || value}));
+            }
+        });
+        $pageInfo.text(data.strings.page_info
+            .replace('{page}', currentPage.page)
+            .replace('{num_pages}', currentPage.num_pages)
+            .replace('{count}', currentPage.count));
+        $previous.prop('disabled', currentPage.page <= 1);
+        $next.prop('disabled', currentPage.page >= currentPage.num_pages);
+        $pages.toggle(currentPage.num_pages > 1);
+    }
+
+    function load(page) {
+        var request = ++requestCount;
+        $.ajax({
+            type: 'POST',
+            url: searchUrl,
+            data: JSON.stringify({query: $search.val(), page: page}),
+            dataType: 'json'
+        }).done(function(response) {
+            // Ignore responses to searches which have been superseded while in flight.
+            if (request === requestCount) {
+                currentPage = response;
+                render();
+            }
+        });
+    }
+
+    $selector.on('change', 'input[type=checkbox]', function() {
+        var value = JSON.parse($(this).val());
+        var index = selected.indexOf(value);
+        if (this.checked && index === -1) {
+            selected.push(value);
+        } else if (!this.checked && index !== -1) {
+            selected.splice(index, 1);
+        }
+        $selector.find('input[type=checkbox]').filter(function() {
+            return $(this).val() === JSON.stringify(value);
+        }).prop('checked', this.checked);
+        $control.val(JSON.stringify(selected)).trigger('change');
+    });
+
+    $search.on('input', function() {
+        clearTimeout(searchTimeout);
+        searchTimeout = setTimeout(function() { load(1); }, 300);
+    });
+    $search.on('keydown', function(event) {
+        if (event.which === 13) {
+            event.preventDefault();
+        }
+    });
+    $previous.click(function() { load(currentPage.page - 1); });
+    $next.click(function() { load(currentPage.page + 1); });
+
+    // The mixin resets the JSON control to the default value; show that in the selector as well.
+    $field.find('button.setting-clear').click(function() {
+        selected = JSON.parse($control.val() || '[]');
+        render();
+    });
+
+    render();
+}
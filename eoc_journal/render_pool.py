@@ -0,0 +1,257 @@
+"""
+Bounded pool of worker processes rendering PDF reports.
+
+Rendering a report is pure CPU work. At most `EOC_JOURNAL_PDF_RENDER_QUEUE_LIMIT` renders may be
+queued or running at once across all web processes sharing the Django cache; further requests are
+rejected straight away with `RenderQueueFull`, so that web workers are not tied up waiting for
+reportlab when many learners download at once. Renders taking more than
+`EOC_JOURNAL_PDF_RENDER_TIMEOUT` seconds are abandoned with `RenderTimeout`.
+
+Renders run in the web worker itself unless EOC_JOURNAL_PDF_RENDER_WORKERS is set, in which case
+every web process starts a pool of that many worker processes. Mind that this multiplies the
+number of processes, and their memory, by the number of web processes. A render which timed out
+keeps running in its worker process until it is done: only renders which did not start yet are
+cancelled.
+"""
+from __future__ import unicode_literals
+import logging
+import os
+import threading
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import make_key
+from .compat import set_custom_attribute
+
+log = logging.getLogger(__name__)
+
+# Number of worker processes rendering PDF reports in each web process. 0 renders in the web
+# worker itself.
+DEFAULT_PDF_RENDER_WORKERS = 0
+
+# Number of renders which may be queued or running at once across all web processes.
+DEFAULT_PDF_RENDER_QUEUE_LIMIT = 8
+
+# Seconds web workers wait for a render in the worker pool. Render slots are released after this
+# time (plus a margin) even if the process holding them died.
+DEFAULT_PDF_RENDER_TIMEOUT = 30
+
+# Seconds clients are asked to wait before retrying when the queue is full.
+DEFAULT_PDF_RENDER_RETRY_AFTER = 10
+
+
+class RenderQueueFull(Exception):
+    """
+    Raised when a render is requested while the render queue is full.
+    """
+
+    def __init__(self, retry_after):
+        super(RenderQueueFull, self).__init__(self.message)  # pylint: disable=super-with-arguments
+        self.retry_after = retry_after
+
+    message = 'The PDF render queue is full.'
+
+
+class RenderTimeout(RenderQueueFull):
+    """
+    Raised when a render in the worker pool does not finish in time.
+    """
+    message = 'The PDF render timed out.'
+
+
+class RenderStats(object):  # pylint: disable=useless-object-inheritance,too-few-public-methods
+    """
+    Counters of the renders requested in the current process.
+    """
+
+    def __init__(self):
+        self.queue_length = 0
+        self.rendered = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.total_bytes = 0
+        self.max_bytes = 0
+
+    def as_dict(self):
+        """
+        Returns the counters along with the average time renders waited for a worker and the average PDF size.
+        """
+        return {
+            'queue_length': self.queue_length,
+            'rendered': self.rendered,
+            'rejected': self.rejected,
+            'average_wait_seconds': self.total_wait_seconds / self.rendered if self.rendered else 0.0,
+            'max_wait_seconds': self.max_wait_seconds,
+            'average_bytes': self.total_bytes // self.rendered if self.rendered else 0,
+            'max_bytes': self.max_bytes,
+        }
+
+
+_lock = threading.Lock()
+_executor = None  # pylint: disable=invalid-name
+_executor_pid = None  # pylint: disable=invalid-name
+_executor_workers = None  # pylint: disable=invalid-name
+_stats = RenderStats()
+
+
+def _timed_build_pdf(submitted_at, args, kwargs):
+    """
+    Renders a report in a worker process and returns how long it waited for the worker along with the PDF.
+    """
+    from .pdf_generator import build_pdf  # pylint: disable=import-outside-toplevel
+    wait = time.time() - submitted_at
+    return wait, build_pdf(*args, **kwargs)
+
+
+def _get_executor(workers):
+    """
+    Returns the process pool of the current process, starting it on first use.
+
+    Forked web workers do not share the pool of their parent. The pool is started again when the
+    number of `workers` changed.
+    """
+    global _executor, _executor_pid, _executor_workers  # pylint: disable=global-statement
+    from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+    previous = None
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid() or _executor_workers != workers:
+            if _executor_pid == os.getpid():
+                previous = _executor
+            _executor = ProcessPoolExecutor(max_workers=workers)
+            _executor_pid = os.getpid()
+            _executor_workers = workers
+        executor = _executor
+    if previous is not None:
+        previous.shutdown(wait=False)
+    return executor
+
+
+def _reset_executor(executor):
+    """
+    Drops `executor` after one of its worker processes died, so that the next render starts a new pool.
+    """
+    global _executor  # pylint: disable=global-statement
+    with _lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def _acquire_slot(queue_limit, timeout):
+    """
+    Takes one of the `queue_limit` render slots shared by all processes through the Django cache,
+    for at most `timeout` seconds, and returns its key along with the token identifying its holder,
+    or None if all slots are taken.
+    """
+    token = uuid4().hex
+    for slot in range(queue_limit):
+        key = make_key('pdf_render_slot', slot)
+        if cache.add(key, token, timeout):
+            return key, token
+    return None
+
+
+def _release_slot(slot):
+    """
+    Releases a render slot taken with `_acquire_slot`, unless it expired and was taken by another
+    render meanwhile.
+    """
+    key, token = slot
+    if cache.get(key) == token:
+        cache.delete(key)
+
+
+def render_stats():
+    """
+    Returns the render queue metrics of the current process.
+    """
+    with _lock:
+        return _stats.as_dict()
+
+
+def render_pdf(*args, **kwargs):
+    """
+    Renders a PDF report with `build_pdf(*args, **kwargs)` in the render pool and returns its content.
+
+    Raises `RenderQueueFull` if the render queue is full, and `RenderTimeout` if the render timed out.
+    """
+    return render_pdfs([(args, kwargs)])[0]
+
+
+def _render_in_pool(workers, calls, timeout, retry_after):
+    """
+    Renders the documents of `calls` in the worker pool and returns the results of `_timed_build_pdf`.
+
+    Renders which did not finish after `timeout` seconds are abandoned with `RenderTimeout`. Mind
+    that `future.cancel()` only cancels renders which did not start yet: running renders keep their
+    worker process busy until they are done.
+    """
+    # pylint: disable=import-outside-toplevel
+    from concurrent.futures import TimeoutError as FutureTimeoutError
+    from concurrent.futures.process import BrokenProcessPool
+    executor = _get_executor(workers)
+    futures = [executor.submit(_timed_build_pdf, time.time(), args, kwargs) for args, kwargs in calls]
+    deadline = time.time() + timeout
+    try:
+        return [future.result(max(deadline - time.time(), 0)) for future in futures]
+    except FutureTimeoutError:
+        for future in futures:
+            future.cancel()
+        log.warning('PDF render timed out after %d seconds.', timeout)
+        raise RenderTimeout(retry_after)  # pylint: disable=raise-missing-from
+    except BrokenProcessPool:
+        _reset_executor(executor)
+        raise
+
+
+def render_pdfs(calls):
+    """
+    Renders several PDF documents in parallel in the render pool and returns their contents.
+
+    `calls` is a list of (args, kwargs) tuples for `build_pdf`. The documents are parts of one
+    report, so they take a single place in the render queue.
+
+    Raises `RenderQueueFull` if the render queue is full, and `RenderTimeout` if the renders
+    in the worker pool did not finish in time.
+    """
+    workers = getattr(settings, 'EOC_JOURNAL_PDF_RENDER_WORKERS', DEFAULT_PDF_RENDER_WORKERS)
+    queue_limit = getattr(settings, 'EOC_JOURNAL_PDF_RENDER_QUEUE_LIMIT', DEFAULT_PDF_RENDER_QUEUE_LIMIT)
+    timeout = getattr(settings, 'EOC_JOURNAL_PDF_RENDER_TIMEOUT', DEFAULT_PDF_RENDER_TIMEOUT)
+    retry_after = getattr(settings, 'EOC_JOURNAL_PDF_RENDER_RETRY_AFTER', DEFAULT_PDF_RENDER_RETRY_AFTER)
+
+    slot = _acquire_slot(queue_limit, timeout + retry_after)
+    with _lock:
+        if slot is None:
+            _stats.rejected += 1
+            set_custom_attribute('eoc_journal_pdf_render_queue_length', queue_limit)
+            log.warning('Rejected PDF render: all %d render slots are taken.', queue_limit)
+            raise RenderQueueFull(retry_after)
+        _stats.queue_length += 1
+        queue_length = _stats.queue_length
+
+    try:
+        if workers:
+            results = _render_in_pool(workers, calls, timeout, retry_after)
+        else:
+            results = [_timed_build_pdf(time.time(), args, kwargs) for args, kwargs in calls]
+    finally:
+        _release_slot(slot)
+        with _lock:
+            _stats.queue_length -= 1
+
+    waits = [wait for wait, _ in results]
+    sizes = [len(pdf) for _, pdf in results]
+    wait = max(waits) if waits else 0.0
+    with _lock:
+        _stats.rendered += len(waits)
+        _stats.total_wait_seconds += sum(waits)
+        _stats.max_wait_seconds = max(_stats.max_wait_seconds, wait)
+        _stats.total_bytes += sum(sizes)
+        _stats.max_bytes = max([_stats.max_bytes] + sizes)
+    set_custom_attribute('eoc_journal_pdf_render_queue_length', queue_length)
+    set_custom_attribute('eoc_journal_pdf_render_wait_seconds', wait)
+    return [pdf for _, pdf in results]
@@ -0,0 +1,145 @@
+"""
+Single-flight coalescing of duplicate concurrent computations.
+
+Concurrent calls with the same key wait for the first one and share its result instead of all
+doing the same work. Calls are coalesced across the threads of a process and, when the
+EOC_JOURNAL_SINGLE_FLIGHT_CACHE_LOCK Django setting is enabled, across processes through a
+lock in the Django cache.
+"""
+from __future__ import unicode_literals
+import threading
+import time
+from builtins import object
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import deadline
+from .cache import make_key
+from .stats import record_cache_lookup
+
+# Seconds the cache lock is held for at most, and the longest time calls wait for the lock holder.
+# Can be overridden with the EOC_JOURNAL_SINGLE_FLIGHT_TIMEOUT Django setting.
+DEFAULT_SINGLE_FLIGHT_TIMEOUT = 30
+
+# Seconds between checks for the result of the cache lock holder.
+POLL_INTERVAL = 0.05
+
+
+class _Call(object):  # pylint: disable=useless-object-inheritance,too-few-public-methods
+    """
+    A computation in flight.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):  # pylint: disable=useless-object-inheritance
+    """
+    Coalesces concurrent calls with the same key made by the threads of the current process.
+
+    Calls sharing the result of another one are counted as hits of the `single_flight` statistics.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, compute):
+        """
+        Returns the result of `compute()`, sharing it with concurrent calls with the same `key`.
+
+        Exceptions raised by `compute` are raised in all waiting calls. Waiting calls raise
+        `UpstreamTimeout` if the current deadline passes first.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        record_cache_lookup('single_flight', not leader)
+
+        if not leader:
+            current_deadline = deadline.current()
+            if not call.done.wait(current_deadline.remaining() if current_deadline else None):
+                raise deadline.UpstreamTimeout('The deadline passed while waiting for {}.'.format(key))
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = compute()
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self):
+        """
+        Returns the number of computations in flight.
+        """
+        with self._lock:
+            return len(self._calls)
+
+
+def cache_single_flight(key, compute, timeout):
+    """
+    Returns the result of `compute()`, sharing it with concurrent calls with the same `key` in other
+    processes through the Django cache.
+
+    The first call takes a lock in the cache and stores its result under a key unique to that lock,
+    so later calls never see results of computations which finished before they started. Results
+    the cache refuses to store (e.g. larger than the memcached item size limit) are computed again
+    by waiting calls once the lock is released. Calls stop waiting at the current deadline.
+    """
+    lock_key = make_key('single_flight_lock', *key)
+    token = uuid4().hex
+    if cache.add(lock_key, token, timeout):
+        try:
+            value = compute()
+            cache.set(make_key('single_flight_result', token), (value,), timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    token = cache.get(lock_key)
+    wait_until = time.time() + deadline.timeout(timeout)
+    while token is not None and time.time() < wait_until:
+        cached = cache.get(make_key('single_flight_result', token))
+        if cached is not None:
+            return cached[0]
+        if cache.get(lock_key) != token:
+            break
+        time.sleep(POLL_INTERVAL)
+    cached = cache.get(make_key('single_flight_result', token)) if token is not None else None
+    if cached is not None:
+        return cached[0]
+    return compute()
+
+
+_group = SingleFlight()
+
+
+def in_flight():
+    """
+    Returns the number of coalesced computations in flight in the current process.
+    """
+    return _group.in_flight()
+
+
+def single_flight(key, compute):
+    """
+    Returns the result of `compute()`, coalescing concurrent calls with the same `key` (a tuple).
+    """
+    if getattr(settings, 'EOC_JOURNAL_SINGLE_FLIGHT_CACHE_LOCK', False):
+        timeout = getattr(settings, 'EOC_JOURNAL_SINGLE_FLIGHT_TIMEOUT', DEFAULT_SINGLE_FLIGHT_TIMEOUT)
+        return _group.do(key, lambda: cache_single_flight(key, compute, timeout))
+    return _group.do(key, compute)
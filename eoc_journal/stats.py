@@ -0,0 +1,93 @@
+"""
+Process level statistics returned by the staff `diagnostics` handler.
+
+The statistics are a few counters per HTTP client class and per cache layer, updated under a
+lock. They are cheap enough to be always on, and are reset when the process restarts.
+"""
+from __future__ import unicode_literals
+import os
+import threading
+import time
+from collections import defaultdict
+
+_lock = threading.Lock()
+_started_at = time.time()
+
+
+def _new_http_stats():
+    """
+    Returns the initial counters of an HTTP client class.
+    """
+    return {'calls': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0}
+
+
+def _new_cache_stats():
+    """
+    Returns the initial counters of a cache layer.
+    """
+    return {'hits': 0, 'misses': 0}
+
+
+_http = defaultdict(_new_http_stats)
+_caches = defaultdict(_new_cache_stats)
+
+
+def record_http_call(client, seconds, error=False):
+    """
+    Records an HTTP call made by the client class named `client` which took `seconds`.
+
+    `error` is set for calls which raised or got an error status.
+    """
+    with _lock:
+        counters = _http[client]
+        counters['calls'] += 1
+        counters['errors'] += int(error)
+        counters['total_seconds'] += seconds
+        counters['max_seconds'] = max(counters['max_seconds'], seconds)
+
+
+def record_cache_lookup(layer, hit, count=1):
+    """
+    Records `count` lookups in the cache `layer`, which were hits if `hit` is True and misses otherwise.
+    """
+    with _lock:
+        _caches[layer]['hits' if hit else 'misses'] += count
+
+
+def snapshot():
+    """
+    Returns the statistics of the current process.
+    """
+    with _lock:
+        http = {
+            client: {
+                'calls': counters['calls'],
+                'errors': counters['errors'],
+                'average_seconds': counters['total_seconds'] / counters['calls'] if counters['calls'] else 0.0,
+                'max_seconds': counters['max_seconds'],
+            }
+            for client, counters in _http.items()
+        }
+        caches = {
+            layer: dict(
+                counters,
+                hit_rate=float(counters['hits']) / (counters['hits'] + counters['misses'])
+                if counters['hits'] + counters['misses'] else 0.0,
+            )
+            for layer, counters in _caches.items()
+        }
+    return {
+        'pid': os.getpid(),
+        'uptime_seconds': time.time() - _started_at,
+        'http': http,
+        'caches': caches,
+    }
+
+
+def reset():
+    """
+    Resets all statistics.
+    """
+    with _lock:
+        _http.clear()
+        _caches.clear()
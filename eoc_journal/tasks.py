@@ -0,0 +1,18 @@
+"""
+Celery tasks of the Course Journal blocks.
+
+Celery workers must import this module, e.g. by adding 'eoc_journal.tasks' to the CELERY_IMPORTS
+setting of the LMS, to run them.
+"""
+from __future__ import unicode_literals
+
+from celery import shared_task  # pylint: disable=import-error
+
+
+@shared_task(name='eoc_journal.regenerate_pdf_report', ignore_result=True)
+def regenerate_pdf_report_task(usage_id, student_id, token):
+    """
+    Regenerates the stored PDF report of a learner, unless a later regeneration was scheduled.
+    """
+    from .pdf_storage import run_regeneration  # pylint: disable=import-outside-toplevel
+    run_regeneration(usage_id, student_id, token)
@@ -2,8 +2,6 @@
 from __future__ import unicode_literals
 
 from builtins import object
-from edx_rest_api_client.auth import SuppliedJwtAuth
-from requests import Session
 
 from .compat import create_jwt_for_user
 
@@ -31,6 +29,9 @@ def build_jwt_edx_client(user):
     """
     Returns an edx API client authorized using JWT.
     """
+    # pylint: disable=import-outside-toplevel
+    from edx_rest_api_client.auth import SuppliedJwtAuth
+    from requests import Session
 
     jwt = create_jwt_for_user(user)
     session = Session()
@@ -58,3 +59,31 @@ class DummyTranslationService(object):  # pylint: disable=too-few-public-methods
     _catalog = {}
     gettext = _
     ngettext = ngettext_fallback
+
+
+def search_choices(choices, query):
+    """
+    Returns the choices whose label contains all words of `query`, ignoring case.
+    """
+    words = query.lower().split()
+    return [
+        choice for choice in choices
+        if all(word in choice['display_name'].lower() for word in words)
+    ]
+
+
+def paginate(items, page, page_size):
+    """
+    Returns the given page of `items` along with the page number and the number of pages and items.
+
+    Out of range page numbers are clamped to the first or last page.
+    """
+    num_pages = max((len(items) + page_size - 1) // page_size, 1)
+    page = min(max(page, 1), num_pages)
+    start = (page - 1) * page_size
+    return {
+        'results': items[start:start + page_size],
+        'page': page,
+        'num_pages': num_pages,
+        'count': len(items),
+    }
@@ -26,6 +26,8 @@ setup(
     description='End of Course Journal XBlock',
     packages=[
         'eoc_journal',
+        'eoc_journal.management',
+        'eoc_journal.management.commands',
     ],
     install_requires=[
         'XBlock',
@@ -37,10 +39,17 @@ setup(
     ],
     extras_require={
         ":python_version<'3'": [
-            "xblock-problem-builder<4"
+            "xblock-problem-builder<4",
+            "futures"
         ],
         ":python_version>='3'": [
             "xblock-problem-builder>=4.1.5"
+        ],
+        "pdf-fragments": [
+            "pypdf"
+        ],
+        "streaming": [
+            "ijson"
         ]
     },
     entry_points={
@@ -0,0 +1,138 @@
+"""
+Helpers for driving EOC Journal XBlock handlers concurrently from many simulated learners.
+
+Each handler is exercised in its own phase so that latency, throughput and memory figures
+are attributable to a single handler.
+"""
+
+from builtins import object
+import math
+import resource
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(sorted_values, pct):
+    """
+    Returns the `pct` percentile (nearest-rank method) of an already sorted list.
+    """
+    if not sorted_values:
+        return None
+    rank = int(math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[max(rank, 1) - 1]
+
+
+def current_rss():
+    """
+    Returns the resident set size of the current process in bytes.
+
+    Falls back to the peak RSS reported by `getrusage` where /proc is not available.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except (IOError, OSError, IndexError, ValueError):
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS; assume kilobytes.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class RssSampler(object):
+    """
+    Samples the process RSS in a background thread and keeps the peak value.
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, current_rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+
+def _timed_call(handler, learner):
+    """
+    Calls `handler` for `learner` and returns (latency in seconds, succeeded, response size).
+    """
+    start = time.time()
+    try:
+        response = handler(learner)
+    except Exception:  # pylint: disable=broad-except
+        return time.time() - start, False, 0
+    latency = time.time() - start
+    status_code = getattr(response, 'status_code', 200)
+    content = getattr(response, 'content', b'') or b''
+    return latency, status_code < 400, len(content)
+
+
+def run_handler(handler, learners, concurrency, iterations=1):
+    """
+    Runs `handler` once per learner (and per iteration) using `concurrency` threads.
+
+    Returns a dict with latency percentiles (in milliseconds), throughput, error rate,
+    average response size and peak RSS.
+    """
+    calls = [learner for _ in range(iterations) for learner in learners]
+    with RssSampler() as sampler:
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(lambda learner: _timed_call(handler, learner), calls))
+        elapsed = time.time() - start
+
+    latencies = sorted(latency * 1000 for latency, _, _ in results)
+    errors = len([ok for _, ok, _ in results if not ok])
+    sizes = [size for _, ok, size in results if ok]
+    return OrderedDict([
+        ('requests', len(results)),
+        ('p50_ms', percentile(latencies, 50)),
+        ('p95_ms', percentile(latencies, 95)),
+        ('p99_ms', percentile(latencies, 99)),
+        ('throughput_rps', len(results) / elapsed if elapsed else None),
+        ('error_rate', float(errors) / len(results) if results else 0.0),
+        ('avg_response_bytes', sum(sizes) // len(sizes) if sizes else 0),
+        ('peak_rss_mb', sampler.peak / (1024.0 * 1024.0)),
+    ])
+
+
+def run_load(handlers, learners, concurrency, iterations=1):
+    """
+    Runs every handler in `handlers` (an ordered mapping of name to a callable
+    taking a learner id) and returns an ordered mapping of name to statistics.
+    """
+    return OrderedDict(
+        (name, run_handler(handler, learners, concurrency, iterations))
+        for name, handler in handlers.items()
+    )
+
+
+def format_report(concurrency, results):
+    """
+    Formats the results of `run_load` as a plain text table.
+    """
+    columns = [
+        'requests', 'p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'error_rate', 'avg_response_bytes', 'peak_rss_mb',
+    ]
+    lines = ['Concurrency: {}'.format(concurrency)]
+    lines.append('{:<26}'.format('handler') + ''.join('{:>20}'.format(column) for column in columns))
+    for name, stats in results.items():
+        cells = []
+        for column in columns:
+            value = stats[column]
+            cells.append('{:>20}'.format(value if isinstance(value, int) else '{:.2f}'.format(value or 0)))
+        lines.append('{:<26}'.format(name) + ''.join(cells))
+    return '\n'.join(lines)
@@ -0,0 +1,75 @@
+"""
+Query and LMS API call budgets of the EOC Journal XBlock handlers.
+
+Every handler gets a declared budget of SQL queries on the problem_builder answers and of calls
+to the LMS APIs per invocation, with cold caches. A change making a handler exceed its budget
+fails the suite; lower the budget when a change makes a handler cheaper.
+
+The budgets are the counts observed with the request-scoped loaders, which need the request
+cache of edx-django-utils: without it every lookup fetches the course blocks again.
+"""
+import unittest
+
+from problem_builder.models import Answer
+
+from eoc_journal.compat import get_request_cache
+from eoc_journal.eoc_journal import provide_pb_answer_list
+from .test_eoc_journal import EOCJournalTestBase, default_pb_answer_block_ids
+from .utils import Budget, assert_within_budget, count_calls
+
+HANDLER_BUDGETS = {
+    # The selected answers of the learner, and the pb-answer blocks, progress, cohort average,
+    # proficiency and engagement from the LMS.
+    'student_view': Budget(queries=1, http_calls=5),
+    'student_view_user_state': Budget(queries=1, http_calls=5),
+    # The selected answers of the learner and the pb-answer blocks.
+    'serve_pdf': Budget(queries=1, http_calls=1),
+    # All pb-answer blocks of the course.
+    'provide_pb_answer_list': Budget(queries=0, http_calls=1),
+}
+
+ANSWER_TABLES = [Answer._meta.db_table]  # pylint: disable=protected-access
+
+
+@unittest.skipIf(get_request_cache('eoc_journal.tests') is None, 'edx-django-utils is not installed')
+class TestHandlerBudgets(EOCJournalTestBase):
+    """
+    Checks the handlers against their budgets.
+    """
+
+    def setUp(self):
+        super(TestHandlerBudgets, self).setUp()
+        self.configure_block(
+            selected_pb_answer_blocks=default_pb_answer_block_ids[1:],
+            display_answers=True,
+            display_metrics_section=True,
+        )
+        # Count queries against the real answers table rather than the fake answers of the other tests.
+        self.patch('problem_builder.models.Answer', Answer)
+        self.block = self.load_root_xblock()
+        Answer.objects.create(
+            student_id='anonymous_user_id',
+            course_key=self.block._get_course_id(),  # pylint: disable=protected-access
+            name='efac891',
+            student_input='student input',
+        )
+
+    def assert_budget(self, handler, call):
+        """
+        Calls `call` with counting enabled and checks the counts against the budget of `handler`.
+        """
+        with count_calls(tables=ANSWER_TABLES) as count:
+            call()
+        assert_within_budget(self, handler, HANDLER_BUDGETS[handler], count)
+
+    def test_student_view(self):
+        self.assert_budget('student_view', lambda: self.block.render('student_view', {}))
+
+    def test_student_view_user_state(self):
+        self.assert_budget('student_view_user_state', lambda: self.block.handle('student_view_user_state', None))
+
+    def test_serve_pdf(self):
+        self.assert_budget('serve_pdf', lambda: self.block.handle('serve_pdf', None))
+
+    def test_provide_pb_answer_list(self):
+        self.assert_budget('provide_pb_answer_list', lambda: provide_pb_answer_list(self.block))
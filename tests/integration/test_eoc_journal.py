@@ -7,6 +7,7 @@ from builtins import object
 import json
 import unittest
 
+from django.core.cache import cache
 from django.test import override_settings
 from django.test.client import Client
 from mock import MagicMock, Mock, patch
@@ -17,6 +18,8 @@ from selenium.webdriver.support.ui import Select
 from xblockutils.resources import ResourceLoader
 from xblockutils.studio_editable_test import StudioEditableBaseTest
 
+from eoc_journal import loaders
+from eoc_journal.eoc_journal import static_url_cache, student_view_data_cache
 from eoc_journal.pdf_generator import get_style_sheet
 from .utils import extract_text_from_pdf
 
@@ -46,8 +49,9 @@ class FakeQuerySet(object):
 
 
 class FakeAnswer(object):
-    def __init__(self, name, student_input, question):
+    def __init__(self, name, student_input, question, student_id='anonymous_user_id'):
         self.name = name
+        self.student_id = student_id
         self.student_input = student_input
         self.question = question
 
@@ -96,19 +100,28 @@ default_user_proficiency = 83
 default_cohort_average_proficiency = 44
 
 @override_settings(ENV_TOKENS={'LMS_BASE': 'lms.base'}, HTTPS='on')
-class TestEOCJournal(StudioEditableBaseTest):
+class EOCJournalTestBase(StudioEditableBaseTest):
+    """
+    Base class for tests running the EOC Journal XBlock against mocked LMS APIs.
+    """
     default_css_selector = 'div.oec-journal-block'
     module_name = __name__
 
     def setUp(self):
-        super(TestEOCJournal, self).setUp()
+        super(EOCJournalTestBase, self).setUp()
+        cache.clear()
+        student_view_data_cache.clear()
+        static_url_cache.clear()
+        # The workbench does not clear the request cache between requests.
+        loaders.clear_loaders()
+        self.addCleanup(loaders.clear_loaders)
 
         def mock_answers_filter(**kwargs):
             return FakeQuerySet(default_answers_data)
 
         answer_mock = MagicMock()
         answer_mock.objects.filter = mock_answers_filter
-        self.patch('eoc_journal.eoc_journal.Answer', answer_mock)
+        self.patch('problem_builder.models.Answer', answer_mock)
 
         # Patch _get_current_user method.
         mock_user = Mock()
@@ -125,20 +138,20 @@ class TestEOCJournal(StudioEditableBaseTest):
         self.patch('eoc_journal.eoc_journal.EOCJournalXBlock._get_course_name', mock_course)
 
         # Patch CourseBlocksApiClient.
-        self.patch('eoc_journal.eoc_journal.CourseBlocksApiClient._connect', Mock())
+        self.patch('eoc_journal.course_blocks_api.CourseBlocksApiClient._connect', Mock())
 
         def mock_get_blocks(self, **kwargs):
             return json.loads(loader.load_unicode('data/course_api_response.json'))
 
-        self.patch('eoc_journal.eoc_journal.CourseBlocksApiClient.get_blocks', mock_get_blocks)
+        self.patch('eoc_journal.course_blocks_api.CourseBlocksApiClient.get_blocks', mock_get_blocks)
 
         # Patch CompletionApiClient.
-        self.patch('eoc_journal.eoc_journal.CompletionApiClient._connect', Mock())
+        self.patch('eoc_journal.completion_api.CompletionApiClient._connect', Mock())
 
         def mock_get_user_progress(self, **kwargs):
             return json.loads(loader.load_unicode('data/user_progress_response.json'))
 
-        self.patch('eoc_journal.eoc_journal.CompletionApiClient.get_user_progress', mock_get_user_progress)
+        self.patch('eoc_journal.completion_api.CompletionApiClient.get_user_progress', mock_get_user_progress)
 
         # Patch UserMetricsClient.
         self.patch('eoc_journal.api_client.ApiClient._connect', Mock())
@@ -294,6 +307,36 @@ class TestEOCJournal(StudioEditableBaseTest):
 
         self.element = self.go_to_view('student_view')
 
+    def assert_in_student_view_data(self, key, value=None):
+        block = self.load_root_xblock()
+        data = block.student_view_data()
+        if value:
+            self.assertEqual(data[key], value)
+        else:
+            self.assertIn(key, data)
+
+    def assert_in_student_view_user_state(self, key, value=None):
+        block = self.load_root_xblock()
+        response = block.handle('student_view_user_state', None)
+        data = json.loads(response.body.decode('UTF-8'))
+        if value:
+            self.assertEqual(data[key], value)
+        else:
+            self.assertIn(key, data)
+
+    def assert_not_in_student_view_user_state(self, key):
+        block = self.load_root_xblock()
+        response = block.handle('student_view_user_state', None)
+        data = json.loads(response.body.decode('UTF-8'))
+        self.assertNotIn(key, data)
+
+    def assert_not_in_student_view_data(self, key):
+        block = self.load_root_xblock()
+        data = block.student_view_data()
+        self.assertNotIn(key, data)
+
+
+class TestEOCJournal(EOCJournalTestBase):
     def test_block_loads_when_apis_not_available(self):
         # Patch all engagement/progress/completion API related methods to return None.
         # These API related methods return None if the APIs are not available for some reason.
@@ -413,6 +456,35 @@ class TestEOCJournal(StudioEditableBaseTest):
             self.assertIn(data['question'], pdf_text)
             self.assertIn(data['answer'], pdf_text)
 
+    def test_pb_answers_listed_in_exports(self):
+        selected_block_ids = default_pb_answer_block_ids[1:]
+        self.configure_block(selected_pb_answer_blocks=selected_block_ids)
+
+        block = self.load_root_xblock()
+        client = Client()
+        for export_format, content_type in [('html', 'text/html'), ('markdown', 'text/markdown'), ('csv', 'text/csv')]:
+            response = client.get(block.runtime.handler_url(block, 'serve_{}'.format(export_format)))
+            self.assertTrue(response['Content-Type'].startswith(content_type))
+            self.assertIn('attachment', response['Content-Disposition'])
+
+            content = b''.join(response.streaming_content if response.streaming else [response.content])
+            text = content.decode('utf-8')
+            self.assertNotIn('First Section', text)  # first section contains no pb-answers
+            self.assertIn('Second Section', text)
+            for data in expected_answers_data:
+                self.assertIn(data['answer'], text)
+
+    def test_export_links_displayed_in_student_view(self):
+        selected_block_ids = default_pb_answer_block_ids[1:]
+        self.configure_block(selected_pb_answer_blocks=selected_block_ids)
+
+        report_link_container = self.get_element_for_pb_answers_pdf_report()
+        links = report_link_container.find_elements_by_css_selector('a.export-report-link')
+        self.assertEqual(
+            [link.get_attribute('data-export-format') for link in links],
+            ['html', 'markdown', 'csv'],
+        )
+
     def test_pb_answers_not_listed_when_none_available_in_student_view(self):
         self.set_standard_scenario()
         self.go_to_view('student_view')
@@ -636,6 +708,7 @@ class TestEOCJournal(StudioEditableBaseTest):
         response = block.handle('student_view_user_state', None)
         data = json.loads(response.body.decode('UTF-8'))
         self.assertEqual(data, {
+            'answer_sections_available': True,
             'answer_sections': [{
                 'name': u'Second Section',
                 'questions': expected_answers_data,
@@ -651,35 +724,6 @@ class TestEOCJournal(StudioEditableBaseTest):
             'engagement': default_engagement_metrics,
         })
 
-    def assert_in_student_view_data(self, key, value=None):
-        block = self.load_root_xblock()
-        data = block.student_view_data()
-        if value:
-            self.assertEqual(data[key], value)
-        else:
-            self.assertIn(key, data)
-
-    def assert_in_student_view_user_state(self, key, value=None):
-        block = self.load_root_xblock()
-        response = block.handle('student_view_user_state', None)
-        data = json.loads(response.body.decode('UTF-8'))
-        if value:
-            self.assertEqual(data[key], value)
-        else:
-            self.assertIn(key, data)
-
-    def assert_not_in_student_view_user_state(self, key):
-        block = self.load_root_xblock()
-        response = block.handle('student_view_user_state', None)
-        data = json.loads(response.body.decode('UTF-8'))
-        self.assertNotIn(key, data)
-
-    def assert_not_in_student_view_data(self, key):
-        block = self.load_root_xblock()
-        data = block.student_view_data()
-        self.assertNotIn(key, data)
-
-
 class TestPdfGenerator(unittest.TestCase):
     def test_get_style_sheet_default_font(self):
         stylesheet = get_style_sheet()
@@ -0,0 +1,69 @@
+"""
+Concurrent load test for the EOC Journal XBlock handlers.
+
+The test is skipped unless the EOC_JOURNAL_LOAD_TEST environment variable is set. Example:
+
+    EOC_JOURNAL_LOAD_TEST=1 EOC_JOURNAL_LOAD_CONCURRENCY=1,4,16 python run_tests.py tests/integration/test_load.py
+
+EOC_JOURNAL_LOAD_CONCURRENCY is a comma separated list of concurrency levels to sweep, which
+makes it easy to find the point where PDF rendering saturates the worker pool.
+EOC_JOURNAL_LOAD_LEARNERS sets the number of simulated learners and
+EOC_JOURNAL_LOAD_ITERATIONS the number of requests per learner and handler.
+"""
+
+from __future__ import print_function
+import os
+import unittest
+from collections import OrderedDict
+
+from django.test.client import Client
+
+from .load import format_report, run_load
+from .test_eoc_journal import EOCJournalTestBase, default_pb_answer_block_ids
+
+
+def _int_list(value):
+    return [int(item) for item in value.split(',') if item.strip()]
+
+
+@unittest.skipUnless(os.environ.get('EOC_JOURNAL_LOAD_TEST'), 'Set EOC_JOURNAL_LOAD_TEST=1 to run the load test.')
+class TestHandlerLoad(EOCJournalTestBase):
+    """
+    Drives student_view, student_view_user_state and serve_pdf concurrently and reports
+    latency percentiles, throughput, peak RSS and error rate for each handler.
+    """
+    concurrency_levels = _int_list(os.environ.get('EOC_JOURNAL_LOAD_CONCURRENCY', '1,4,16'))
+    learner_count = int(os.environ.get('EOC_JOURNAL_LOAD_LEARNERS', '50'))
+    iterations = int(os.environ.get('EOC_JOURNAL_LOAD_ITERATIONS', '1'))
+
+    def handler_url_for(self, handler_name):
+        """
+        Returns a function building the workbench handler URL of `handler_name` for a learner.
+        """
+        block = self.load_root_xblock()
+        url = block.runtime.handler_url(block, handler_name).split('?')[0]
+        return lambda learner: '{}?student={}'.format(url, learner)
+
+    def test_handler_latency(self):
+        self.configure_block(
+            selected_pb_answer_blocks=default_pb_answer_block_ids[1:],
+            display_answers=True,
+            display_metrics_section=True,
+        )
+        learners = ['learner_{}'.format(index) for index in range(self.learner_count)]
+        user_state_url = self.handler_url_for('student_view_user_state')
+        pdf_url = self.handler_url_for('serve_pdf')
+
+        handlers = OrderedDict([
+            ('student_view', lambda learner: Client().get(
+                '/scenario/test-scenario/student_view/', {'student': learner}
+            )),
+            ('student_view_user_state', lambda learner: Client().get(user_state_url(learner))),
+            ('serve_pdf', lambda learner: Client().get(pdf_url(learner))),
+        ])
+
+        for concurrency in self.concurrency_levels:
+            results = run_load(handlers, learners, concurrency, self.iterations)
+            print('\n' + format_report(concurrency, results))
+            for name, stats in results.items():
+                self.assertEqual(stats['error_rate'], 0.0, '{} failed under load'.format(name))
@@ -1,5 +1,12 @@
 import io
+from collections import namedtuple
+from contextlib import contextmanager
+from importlib import import_module
+from types import FunctionType
 
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from mock import patch
 from pdfminer.converter import TextConverter
 from pdfminer.layout import LAParams
 from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
@@ -27,3 +34,96 @@ def extract_text_from_pdf(pdf_content):
     output_buffer.close()
 
     return text
+
+
+# Methods of the API clients which each make one HTTP request to the LMS.
+API_CALL_METHODS = [
+    ('eoc_journal.course_blocks_api', 'CourseBlocksApiClient', 'get_blocks'),
+    ('eoc_journal.completion_api', 'CompletionApiClient', 'get_user_progress'),
+    ('eoc_journal.api_client', 'ApiClient', 'get_user_engagement_metrics'),
+    ('eoc_journal.api_client', 'ApiClient', '_get_course'),
+    ('eoc_journal.api_client', 'ApiClient', '_get_completion_leader_metrics'),
+    ('eoc_journal.api_client', 'ApiClient', '_get_grades_leader_metrics'),
+]
+
+# Maximum number of SQL queries and LMS API calls of a handler invocation.
+Budget = namedtuple('Budget', ['queries', 'http_calls'])
+
+
+class CallCount(object):
+    """
+    SQL queries and LMS API calls made while counting.
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.http_calls = []
+        self._captured = []
+
+    @property
+    def queries(self):
+        """
+        Returns the SQL of the queries made, restricted to the counted tables if any.
+        """
+        sql = [query['sql'] for captured in self._captured for query in captured.captured_queries]
+        if self.tables is None:
+            return sql
+        return [query for query in sql if any(table in query for table in self.tables)]
+
+
+def _counted(count, name, original):
+    """
+    Returns a method recording a call to `name` in `count` before calling `original`.
+
+    `original` may be a plain function or, when the tests patched it, a mock which is not bound to the instance.
+    """
+    def method(self, *args, **kwargs):
+        count.http_calls.append(name)
+        if isinstance(original, FunctionType):
+            return original(self, *args, **kwargs)
+        return original(*args, **kwargs)
+    return method
+
+
+@contextmanager
+def count_calls(tables=None):
+    """
+    Counts the SQL queries made on all databases and the calls to the LMS APIs (see `API_CALL_METHODS`),
+    whether the API client methods are patched or not.
+
+    If `tables` is given, only the queries mentioning one of these tables are counted.
+    """
+    count = CallCount(tables)
+    patchers = []
+    for module, class_name, method_name in API_CALL_METHODS:
+        client_class = getattr(import_module(module), class_name)
+        original = client_class.__dict__[method_name]
+        name = '{}.{}'.format(class_name, method_name)
+        patchers.append(patch.object(client_class, method_name, _counted(count, name, original)))
+    captured = [CaptureQueriesContext(connections[alias]) for alias in connections]
+    count._captured = captured  # pylint: disable=protected-access
+    for manager in patchers + captured:
+        manager.__enter__()
+    try:
+        yield count
+    finally:
+        for manager in reversed(patchers + captured):
+            manager.__exit__(None, None, None)
+
+
+def assert_within_budget(test, handler, budget, count):
+    """
+    Fails `test` if the calls made by `handler`, as counted by `count_calls`, exceed its `budget`.
+    """
+    test.assertLessEqual(
+        len(count.queries), budget.queries,
+        '{} made {} SQL queries, over its budget of {}:\n{}'.format(
+            handler, len(count.queries), budget.queries, '\n'.join(count.queries),
+        ),
+    )
+    test.assertLessEqual(
+        len(count.http_calls), budget.http_calls,
+        '{} made {} LMS API calls, over its budget of {}: {}'.format(
+            handler, len(count.http_calls), budget.http_calls, ', '.join(count.http_calls),
+        ),
+    )
@@ -0,0 +1,44 @@
+"""
+Test the caching helpers.
+"""
+
+import unittest
+
+from mock import Mock, patch
+
+from eoc_journal.cache import LRUCache, make_key
+
+
+class TestCache(unittest.TestCase):
+    """
+    Test `make_key` and `LRUCache`.
+    """
+
+    def test_make_key(self):
+        self.assertEqual(
+            make_key('course_name', 'course-v1:Org+Course+Run'),
+            'eoc_journal:course_name:course-v1:Org+Course+Run',
+        )
+        hashed = make_key('pb_answer_list', 'a b')
+        self.assertNotIn(' ', hashed)
+        self.assertLessEqual(len(make_key('x' * 1000)), 250)
+
+    def test_lru_evicts_least_recently_used(self):
+        lru = LRUCache(maxsize=2)
+        lru.get_or_set('a', lambda: 1)
+        lru.get_or_set('b', lambda: 2)
+        lru.get_or_set('a', lambda: None)
+        lru.get_or_set('c', lambda: 3)
+        self.assertEqual(lru.get_or_set('a', lambda: 'missed'), 1)
+        self.assertEqual(lru.get_or_set('b', lambda: 'missed'), 'missed')
+
+    @patch('eoc_journal.cache.time.time')
+    def test_lru_timeout(self, mock_time):
+        lru = LRUCache(maxsize=2)
+        compute = Mock(side_effect=[1, 2])
+        mock_time.return_value = 100
+        self.assertEqual(lru.get_or_set('a', compute, timeout=10), 1)
+        mock_time.return_value = 109
+        self.assertEqual(lru.get_or_set('a', compute, timeout=10), 1)
+        mock_time.return_value = 110
+        self.assertEqual(lru.get_or_set('a', compute, timeout=10), 2)
@@ -0,0 +1,101 @@
+"""
+Test parsing Course Blocks API responses.
+"""
+
+import io
+import json
+import os
+import unittest
+
+from django.test import SimpleTestCase, override_settings
+from mock import Mock, patch
+
+from eoc_journal import course_blocks_api
+from eoc_journal.course_blocks_api import CourseBlocksApiClient, parse_blocks, trim_block
+from eoc_journal.course_data import COURSE_BLOCK_FIELDS
+
+RESPONSE_PATH = os.path.join(os.path.dirname(__file__), '..', 'integration', 'data', 'course_api_response.json')
+
+
+def load_response():
+    """
+    Returns the raw Course Blocks API response used by the integration tests.
+    """
+    with open(RESPONSE_PATH, 'rb') as response:
+        return response.read()
+
+
+def trimmed_response(raw):
+    """
+    Returns `raw` parsed in one go and trimmed to the fields of `COURSE_BLOCK_FIELDS`.
+    """
+    response = json.loads(raw.decode('utf-8'))
+    return {
+        'root': response['root'],
+        'blocks': {
+            block_id: trim_block(block, COURSE_BLOCK_FIELDS) for block_id, block in response['blocks'].items()
+        },
+    }
+
+
+@override_settings(LMS_ROOT_URL='http://lms.example.com')
+class TestCourseBlocksApi(SimpleTestCase):
+    """
+    Test `CourseBlocksApiClient.get_blocks` and its streaming parser.
+    """
+
+    def make_client(self, raw):
+        """
+        Returns a client whose requests return the response `raw`.
+        """
+        with patch.object(CourseBlocksApiClient, '_connect'):
+            client = CourseBlocksApiClient(Mock(), 'course-v1:Org+Course+Run')
+        response = Mock(raw=io.BytesIO(raw), content=raw, status_code=200)
+        response.json.side_effect = lambda: json.loads(raw.decode('utf-8'))
+        client.client = Mock(get=Mock(return_value=response))
+        return client
+
+    def test_trim_block(self):
+        block = {
+            'id': 'block',
+            'type': 'pb-answer',
+            'student_view_data': {'name': 'answer', 'question': 'Question?', 'default_value': 'x'},
+        }
+        self.assertEqual(trim_block(block, COURSE_BLOCK_FIELDS), {
+            'id': 'block',
+            'student_view_data': {'name': 'answer', 'question': 'Question?'},
+        })
+
+    @unittest.skipIf(course_blocks_api.ijson is None, 'ijson is not installed.')
+    def test_parse_blocks(self):
+        raw = load_response()
+        self.assertEqual(parse_blocks(io.BytesIO(raw), COURSE_BLOCK_FIELDS), trimmed_response(raw))
+
+    @unittest.skipIf(course_blocks_api.ijson is None, 'ijson is not installed.')
+    def test_get_blocks_streaming(self):
+        raw = load_response()
+        client = self.make_client(raw)
+        self.assertEqual(client.get_blocks(fields=COURSE_BLOCK_FIELDS, depth='all'), trimmed_response(raw))
+        self.assertTrue(client.client.get.call_args[1]['stream'])
+        client.client.get.return_value.json.assert_not_called()
+
+    def test_get_blocks_without_ijson(self):
+        raw = load_response()
+        client = self.make_client(raw)
+        with patch.object(course_blocks_api, 'ijson', None):
+            self.assertEqual(client.get_blocks(fields=COURSE_BLOCK_FIELDS), trimmed_response(raw))
+
+    @patch('eoc_journal.base_api_client.accumulate_custom_attribute')
+    def test_response_size_recorded(self, accumulate):
+        raw = load_response()
+        client = self.make_client(raw)
+        client.client.get.return_value.raw.read()
+        client.get_blocks()
+        accumulate.assert_any_call('eoc_journal_course_blocks_api_response_bytes', len(raw))
+        accumulate.assert_any_call('eoc_journal_course_blocks_api_decoded_bytes', len(raw))
+
+    def test_get_blocks_all_fields(self):
+        raw = load_response()
+        client = self.make_client(raw)
+        self.assertEqual(client.get_blocks(depth='all'), json.loads(raw.decode('utf-8')))
+        self.assertEqual(client.client.get.call_args[1]['params']['depth'], 'all')
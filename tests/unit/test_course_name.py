@@ -0,0 +1,69 @@
+"""
+Test caching the course name used as the default PDF report title.
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from mock import Mock, patch
+from opaque_keys.edx.keys import CourseKey
+from xblock.field_data import DictFieldData
+
+from eoc_journal.course_data import invalidate_course_name
+from eoc_journal.eoc_journal import EOCJournalXBlock
+
+COURSE_KEY = CourseKey.from_string('course-v1:Org+Course+Run')
+
+
+class TestCourseName(TestCase):
+    """
+    Test `EOCJournalXBlock._get_course_name` and `EOCJournalXBlock._get_course_version`.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.runtime = Mock()
+        self.runtime.get_block.return_value.display_name = 'Course Name'
+        scope_ids = Mock()
+        scope_ids.usage_id.course_key = COURSE_KEY
+        self.block = EOCJournalXBlock(self.runtime, DictFieldData({}), scope_ids)
+
+    def test_name_cached_until_published(self):
+        # pylint: disable=protected-access
+        self.assertEqual(self.block._get_course_name(), 'Course Name')
+        self.assertEqual(self.block._get_course_name(), 'Course Name')
+        self.assertEqual(self.runtime.get_block.call_count, 1)
+
+        self.runtime.get_block.return_value.display_name = 'Renamed'
+        invalidate_course_name(None, course_key=COURSE_KEY)
+        self.assertEqual(self.block._get_course_name(), 'Renamed')
+        self.assertEqual(self.runtime.get_block.call_count, 2)
+
+    def test_missing_course_cached(self):
+        self.runtime.get_block.side_effect = Exception('not found')
+        # pylint: disable=protected-access
+        self.assertEqual(self.block._get_course_name(), '')
+        self.assertEqual(self.block._get_course_name(), '')
+        # The course root is looked up with the split and the old mongo key once.
+        self.assertEqual(self.runtime.get_block.call_count, 2)
+
+    def test_version_cached_until_published(self):
+        # pylint: disable=protected-access
+        with patch('eoc_journal.course_data.get_course_version', return_value='v1') as get_course_version:
+            self.assertEqual(self.block._get_course_version(), 'v1')
+            self.assertEqual(self.block._get_course_version(), 'v1')
+            self.assertEqual(get_course_version.call_count, 1)
+
+            get_course_version.return_value = 'v2'
+            invalidate_course_name(None, course_key=COURSE_KEY)
+            self.assertEqual(self.block._get_course_version(), 'v2')
+
+    def test_unversioned_course(self):
+        # pylint: disable=protected-access
+        with patch('eoc_journal.course_data.get_course_version', return_value=''):
+            version = self.block._get_course_version()
+            self.assertTrue(version)
+            self.assertEqual(self.block._get_course_version(), version)
+
+            invalidate_course_name(None, course_key=COURSE_KEY)
+            self.assertNotEqual(self.block._get_course_version(), version)
@@ -0,0 +1,126 @@
+"""
+Test the deadline of the student view and its propagation to the LMS API calls.
+"""
+
+import threading
+import time
+
+from django.test import TestCase, override_settings
+from mock import Mock, patch
+from requests.exceptions import ReadTimeout
+from xblock.field_data import DictFieldData
+
+from eoc_journal import deadline
+from eoc_journal.base_api_client import BaseApiClient
+from eoc_journal.eoc_journal import EOCJournalXBlock, loader
+from eoc_journal.singleflight import SingleFlight
+from eoc_journal.utils import DummyTranslationService
+
+
+def make_client(get):
+    """
+    Returns an API client sending requests with `get`.
+    """
+    with patch.object(BaseApiClient, '_connect'):
+        client = BaseApiClient(Mock(), 'course')
+    client.client = Mock(get=get)
+    return client
+
+
+class TestDeadline(TestCase):
+    """
+    Test `eoc_journal.deadline`.
+    """
+
+    def test_timeout(self):
+        self.assertIsNone(deadline.timeout())
+        self.assertEqual(deadline.timeout(30), 30)
+        with deadline.deadline(10):
+            self.assertLessEqual(deadline.timeout(30), 10)
+            self.assertEqual(deadline.timeout(1), 1)
+            with deadline.deadline(60):
+                self.assertLessEqual(deadline.timeout(), 10)
+            with deadline.deadline(0):
+                self.assertTrue(deadline.current().expired())
+                with self.assertRaises(deadline.UpstreamTimeout):
+                    deadline.timeout(30)
+        self.assertIsNone(deadline.current())
+
+    def test_api_calls(self):
+        get = Mock(return_value=Mock(status_code=200))
+        client = make_client(get)
+        with override_settings(EOC_JOURNAL_API_TIMEOUT=30), deadline.deadline(5):
+            client._request('/a')  # pylint: disable=protected-access
+        self.assertLessEqual(get.call_args[1]['timeout'], 5)
+
+        with deadline.deadline(0), self.assertRaises(deadline.UpstreamTimeout):
+            client._request('/b')  # pylint: disable=protected-access
+        self.assertEqual(get.call_count, 1)
+
+        get.side_effect = ReadTimeout
+        with self.assertRaises(deadline.UpstreamTimeout):
+            client._request('/c')  # pylint: disable=protected-access
+
+    def test_single_flight_waiters(self):
+        group = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def compute():
+            started.set()
+            release.wait()
+            return 'value'
+
+        leader = threading.Thread(target=group.do, args=(('key',), compute))
+        leader.start()
+        self.addCleanup(leader.join)
+        self.addCleanup(release.set)
+        started.wait()
+        with deadline.deadline(0.05), self.assertRaises(deadline.UpstreamTimeout):
+            group.do(('key',), compute)
+
+
+class TestStudentViewDeadline(TestCase):
+    """
+    Test that the sections of the user state missing the deadline are not available.
+    """
+
+    def test_sections(self):
+        block = EOCJournalXBlock(Mock(), DictFieldData({'display_metrics_section': True}), Mock())
+
+        def slow_proficiency():
+            time.sleep(0.2)
+            return {'user': 1, 'cohort_average': 2}
+
+        def engagement():
+            deadline.timeout()
+            return {'user_score': 1}
+
+        with override_settings(EOC_JOURNAL_STUDENT_VIEW_DEADLINE=0.1), \
+                patch.object(block, 'list_user_pb_answers_by_section', return_value=[]), \
+                patch.object(block, 'get_progress_metrics', side_effect=deadline.UpstreamTimeout), \
+                patch.object(block, 'get_proficiency_metrics', side_effect=slow_proficiency), \
+                patch.object(block, 'get_engagement_metrics', side_effect=engagement):
+            state = block._get_user_state()  # pylint: disable=protected-access
+
+        self.assertEqual(state['answer_sections'], [])
+        self.assertTrue(state['answer_sections_available'])
+        self.assertIsNone(state['progress'])
+        self.assertEqual(state['proficiency'], {'user': 1, 'cohort_average': 2})
+        # The deadline passed while the proficiency was loaded.
+        self.assertIsNone(state['engagement'])
+
+    def test_answers_not_available(self):
+        block = EOCJournalXBlock(Mock(), DictFieldData({'display_answers': True}), Mock())
+        with patch.object(block, 'list_user_pb_answers_by_section', side_effect=deadline.UpstreamTimeout):
+            state = block._get_user_state()  # pylint: disable=protected-access
+        # The answers stay a list for the mobile apps.
+        self.assertEqual(state['answer_sections'], [])
+        self.assertFalse(state['answer_sections_available'])
+
+        context = dict(state, display_answers=True, pdf_report_url='/report.pdf', export_links=[])
+        html = loader.render_django_template(
+            'templates/eoc_journal.html', context=context, i18n_service=DummyTranslationService()
+        )
+        self.assertIn('Your answers are not available at this time.', html)
+        self.assertIn('href="/report.pdf"', html)
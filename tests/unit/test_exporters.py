@@ -0,0 +1,113 @@
+"""
+Test exporting freeform answers.
+"""
+
+from django.test import TestCase
+from mock import Mock, patch
+from problem_builder.models import Answer
+from webob import Request
+from xblock.field_data import DictFieldData
+
+from eoc_journal.eoc_journal import EOCJournalXBlock
+from eoc_journal.export_handlers import iter_course_answers
+from eoc_journal.exporters import iter_course_answers_csv, iter_csv, iter_markdown
+
+ANSWER_SECTIONS = [{
+    'name': 'Section',
+    'questions': [{'question': 'Who are you?', 'answer': 'A learner, "mostly"'}],
+}]
+
+
+class TestExporters(TestCase):
+    """
+    Test the answer exporters.
+    """
+
+    def test_markdown(self):
+        markdown = ''.join(iter_markdown('Journal', ANSWER_SECTIONS))
+        self.assertEqual(markdown, '# Journal\n\n## Section\n\n### Who are you?\n\nA learner, "mostly"\n\n')
+
+    def test_csv(self):
+        lines = list(iter_csv('Journal', ANSWER_SECTIONS))
+        self.assertEqual(lines, ['section,question,answer\r\n', 'Section,Who are you?,"A learner, ""mostly"""\r\n'])
+
+    def test_csv_escapes_formulas(self):
+        sections = [{
+            'name': '=Section',
+            'questions': [{'question': 'Caf\xe9?', 'answer': '=HYPERLINK("http://example.com")'}],
+        }]
+        lines = list(iter_csv('Journal', sections))
+        self.assertEqual(lines[1], '\'=Section,Caf\xe9?,"\'=HYPERLINK(""http://example.com"")"\r\n')
+
+    def test_course_answers_csv(self):
+        blocks = [
+            {'name': 'first', 'section': 'One', 'question': 'First?'},
+            {'name': 'second', 'section': 'Two', 'question': 'Second?'},
+        ]
+        rows = [('alice', 'second', 'a2'), ('alice', 'first', 'a1'), ('bob', 'second', 'b2')]
+        lines = list(iter_course_answers_csv(blocks, iter(rows)))
+        self.assertEqual(lines, [
+            'student_id,section,question,answer\r\n',
+            'alice,One,First?,a1\r\n',
+            'alice,Two,Second?,a2\r\n',
+            'bob,Two,Second?,b2\r\n',
+        ])
+
+    def test_iter_course_answers_in_chunks(self):
+        for student in range(5):
+            for name in ('first', 'second', 'other'):
+                Answer.objects.create(
+                    student_id='student{}'.format(student),
+                    course_key='course',
+                    name=name,
+                    student_input='{}-{}'.format(student, name),
+                )
+        Answer.objects.create(student_id='student0', course_key='other-course', name='first', student_input='x')
+
+        rows = list(iter_course_answers('course', ['first', 'second'], chunk_size=3))
+
+        self.assertEqual(rows, [
+            ('student{}'.format(student), name, '{}-{}'.format(student, name))
+            for student in range(5)
+            for name in ('first', 'second')
+        ])
+
+
+class TestExportCourseAnswers(TestCase):
+    """
+    Test the `export_course_answers` handler.
+    """
+
+    def setUp(self):
+        self.user = Mock(opt_attrs={})
+        runtime = Mock(course_id='course')
+        runtime.service.return_value.get_current_user.return_value = self.user
+        self.block = EOCJournalXBlock(
+            runtime, DictFieldData({'selected_pb_answer_blocks': ['first-id', 'second-id']}), Mock(),
+        )
+        blocks = [
+            {'name': 'first', 'section': 'One', 'question': '<p>First?</p>'},
+            {'name': 'second', 'section': 'Two', 'question': 'Second?'},
+        ]
+        pb_answers = Mock()
+        pb_answers.select.return_value = blocks
+        patcher = patch.object(EOCJournalXBlock, 'list_pb_answers', return_value=pb_answers)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        Answer.objects.create(student_id='alice', course_key='course', name='first', student_input='a1')
+        Answer.objects.create(student_id='bob', course_key='course', name='second', student_input='b2')
+
+    def test_forbidden_for_learners(self):
+        response = self.block.export_course_answers(Request.blank('/'), '')
+        self.assertEqual(response.status_code, 403)
+
+    def test_csv_for_staff(self):
+        self.user.opt_attrs['edx-platform.user_is_staff'] = True
+        response = self.block.export_course_answers(Request.blank('/'), '')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, 'text/csv')
+        self.assertEqual(response.body.decode('utf-8'), (
+            'student_id,section,question,answer\r\n'
+            'alice,One,First?,a1\r\n'
+            'bob,Two,Second?,b2\r\n'
+        ))
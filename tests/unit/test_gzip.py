@@ -0,0 +1,45 @@
+"""
+Test compressing the JSON responses of handlers.
+"""
+
+import gzip
+import io
+import json
+
+import webob
+from django.test import SimpleTestCase, override_settings
+
+from eoc_journal.eoc_journal import gzip_response
+
+STATE = {'answers': ['answer {}'.format(index) for index in range(200)]}
+
+
+def make_response():
+    """
+    Returns a JSON response with `STATE`.
+    """
+    return webob.Response(body=json.dumps(STATE).encode('utf-8'), charset='UTF-8', content_type='application/json')
+
+
+class TestGzipResponse(SimpleTestCase):
+    """
+    Test `gzip_response`.
+    """
+
+    def test_compressed_when_accepted(self):
+        request = webob.Request.blank('/', headers={'Accept-Encoding': 'br, gzip;q=0.8'})
+        response = gzip_response(request, make_response())
+        self.assertEqual(response.content_encoding, 'gzip')
+        self.assertIn('Accept-Encoding', response.vary)
+        self.assertEqual(json.loads(gzip.GzipFile(fileobj=io.BytesIO(response.body)).read().decode('utf-8')), STATE)
+
+    def test_not_compressed_when_not_accepted(self):
+        for headers in ({}, {'Accept-Encoding': 'identity'}, {'Accept-Encoding': 'gzip;q=0'}):
+            response = gzip_response(webob.Request.blank('/', headers=headers), make_response())
+            self.assertIsNone(response.content_encoding)
+            self.assertEqual(json.loads(response.body.decode('utf-8')), STATE)
+
+    @override_settings(EOC_JOURNAL_GZIP_MIN_BYTES=100000)
+    def test_not_compressed_below_threshold(self):
+        request = webob.Request.blank('/', headers={'Accept-Encoding': 'gzip'})
+        self.assertIsNone(gzip_response(request, make_response()).content_encoding)
@@ -23,6 +23,12 @@ class TestEOCJournalImport(TestCase):
             'i4x://Org/Course/pb-answer/a0b04a13d3074229b6be33fbc31de233',
             'i4x://Org/Course/pb-answer/927c5b8cd051475e937b8c1091a9feaf',
         ]
+        mock_xblock_parse_xml().selected_pb_answer_snapshot = [{
+            'id': 'i4x://Org/Course/pb-answer/6f070c350e39429cbccfd3185a33621c',
+            'section': 'Section',
+            'name': 'answer',
+            'question': 'Question?',
+        }]
         mock_node = Mock()
         mock_runtime = Mock()
         mock_keys = Mock()
@@ -30,3 +36,9 @@ class TestEOCJournalImport(TestCase):
         block = EOCJournalXBlock.parse_xml(mock_node, mock_runtime, mock_keys, mock_id_generator)
         for block_id in block.selected_pb_answer_blocks:
             self.assertTrue(block_id.startswith('i4x://Org/CourseToImport'))
+        self.assertEqual(block.selected_pb_answer_snapshot, [{
+            'id': 'i4x://Org/CourseToImport/pb-answer/6f070c350e39429cbccfd3185a33621c',
+            'section': 'Section',
+            'name': 'answer',
+            'question': 'Question?',
+        }])
@@ -0,0 +1,89 @@
+"""
+Import time of the XBlock entry point.
+
+The LMS imports `eoc_journal` whenever it enumerates XBlocks, so the heavy dependencies of the
+block are only imported on the code paths using them. Every measurement runs in a fresh
+interpreter with the Django settings of the test run.
+
+The benchmark comparing the import time of the entry point with the import time of the deferred
+dependencies is skipped unless EOC_JOURNAL_IMPORT_BENCHMARK is set. Example:
+
+    EOC_JOURNAL_IMPORT_BENCHMARK=1 python run_tests.py tests/unit/test_import_time.py
+"""
+
+from __future__ import print_function
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+# Modules which must not be imported by importing the entry point.
+DEFERRED_MODULES = [
+    'reportlab',
+    'lxml.html',
+    'lxml.html.clean',
+    'requests',
+    'edx_rest_api_client',
+    'future.standard_library',
+    'ijson',
+    'pypdf',
+    'concurrent.futures.process',
+    'eoc_journal.pdf_generator',
+    'eoc_journal.api_client',
+    'eoc_journal.completion_api',
+    'eoc_journal.course_blocks_api',
+]
+
+# Imports all deferred dependencies, as the code paths rendering a report and calling the LMS APIs do.
+LOAD_DEFERRED = (
+    'import eoc_journal.pdf_generator, eoc_journal.api_client, eoc_journal.completion_api, '
+    'eoc_journal.course_blocks_api, lxml.html.clean, concurrent.futures.process'
+)
+
+MEASURE = '''
+import json, sys, time
+import django
+django.setup()
+before = set(sys.modules)
+start = time.time()
+exec({statement!r})
+print(json.dumps({{'seconds': time.time() - start, 'modules': sorted(set(sys.modules) - before)}}))
+'''
+
+
+def measure_import(statement):
+    """
+    Runs `statement` in a fresh interpreter and returns its duration and the modules it imported.
+    """
+    output = subprocess.check_output(
+        [sys.executable, '-c', MEASURE.format(statement=statement)],
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+    )
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+class TestImportTime(unittest.TestCase):
+    """
+    Test that importing the entry point defers the heavy dependencies.
+    """
+
+    def test_deferred_modules(self):
+        imported = set(measure_import('import eoc_journal')['modules'])
+        self.assertIn('eoc_journal.eoc_journal', imported)
+        self.assertEqual(
+            [module for module in DEFERRED_MODULES if module in imported],
+            [],
+        )
+
+    @unittest.skipUnless(os.environ.get('EOC_JOURNAL_IMPORT_BENCHMARK'), 'EOC_JOURNAL_IMPORT_BENCHMARK is not set')
+    def test_benchmark(self):
+        repeat = 5
+        entry_point = min(measure_import('import eoc_journal')['seconds'] for _ in range(repeat))
+        eager = min(
+            measure_import('import eoc_journal; ' + LOAD_DEFERRED)['seconds'] for _ in range(repeat)
+        )
+        print('\nImport of the entry point: {:.3f}s, with the deferred dependencies: {:.3f}s'.format(
+            entry_point, eager,
+        ))
+        self.assertLess(entry_point, eager)
@@ -0,0 +1,126 @@
+"""
+Test the request-scoped loaders.
+"""
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from mock import Mock, patch
+from problem_builder.models import Answer
+from xblock.field_data import DictFieldData
+
+from eoc_journal import loaders
+from eoc_journal.course_data import load_answers
+from eoc_journal.eoc_journal import EOCJournalXBlock
+
+
+def selected_pb_answers(*names):
+    """
+    Returns the selected pb-answers of a block with pb-answers named `names`.
+    """
+    return [{'name': name, 'section': 'Section', 'question': 'Question?'} for name in names]
+
+
+class TestDataLoader(TestCase):
+    """
+    Test `DataLoader`, and the loaders of the current request.
+    """
+
+    def setUp(self):
+        loaders.clear_loaders()
+        self.addCleanup(loaders.clear_loaders)
+        self.batch_load = Mock(side_effect=lambda keys: [key * 2 for key in keys])
+
+    def test_batches_primed_keys(self):
+        loader = loaders.DataLoader(self.batch_load)
+        loader.prime([1, 2])
+        self.assertEqual(loader.load(3), 6)
+        self.assertEqual(loader.load_many([2, 1]), [4, 2])
+        self.batch_load.assert_called_once_with([1, 2, 3])
+
+        loader.clear(1)
+        self.assertEqual(loader.load(1), 2)
+        self.batch_load.assert_called_with([1])
+
+    def test_request_scope(self):
+        loader = loaders.get_loader('numbers', self.batch_load)
+        self.assertIs(loaders.get_loader('numbers', self.batch_load), loader)
+        with loaders.request_scope():
+            self.assertIsNot(loaders.get_loader('numbers', self.batch_load), loader)
+
+    def test_without_request_cache(self):
+        with patch('eoc_journal.loaders.get_request_cache', return_value=None):
+            self.assertIsNot(
+                loaders.get_loader('numbers', self.batch_load),
+                loaders.get_loader('numbers', self.batch_load),
+            )
+
+
+class TestJournalLoaders(TestCase):
+    """
+    Test sharing the data of journal blocks rendered in the same request.
+    """
+
+    def setUp(self):
+        loaders.clear_loaders()
+        self.addCleanup(loaders.clear_loaders)
+        self.user = User.objects.create(username='learner')
+        for name in ('first', 'second', 'third'):
+            Answer.objects.create(student_id='student', course_key='course', name=name, student_input=name.upper())
+        Answer.objects.create(student_id='other', course_key='course', name='first', student_input='other')
+
+    def make_block(self, *names):
+        """
+        Returns a journal block bound to the learner, selecting the pb-answers named `names`.
+        """
+        xblock_user = Mock(opt_attrs={'edx-platform.user_id': self.user.id})
+        runtime = Mock(course_id='course', anonymous_student_id='student')
+        runtime.service.return_value.get_current_user.return_value = xblock_user
+        block = EOCJournalXBlock(runtime, DictFieldData({}), Mock())
+        block._get_selected_pb_answers = Mock(return_value=selected_pb_answers(*names))
+        return block
+
+    def test_answers_read_once_per_request(self):
+        blocks = [self.make_block('first'), self.make_block('second', 'missing'), self.make_block('missing', 'first')]
+        with CaptureQueriesContext(connection) as queries:
+            sections = [block.list_user_pb_answers_by_section() for block in blocks]
+        # The last block only selects answers which were read already.
+        self.assertEqual(len(queries), 2)
+        self.assertIn('"name" IN', queries[1]['sql'])
+        self.assertEqual(sections[0][0]['questions'], [{'answer': 'FIRST', 'question': 'Question?'}])
+        self.assertEqual(sections[1][0]['questions'], [
+            {'answer': 'SECOND', 'question': 'Question?'},
+            {'answer': 'Not answered yet.', 'question': 'Question?'},
+        ])
+        self.assertEqual(sections[2][0]['questions'], [
+            {'answer': 'Not answered yet.', 'question': 'Question?'},
+            {'answer': 'FIRST', 'question': 'Question?'},
+        ])
+        self.assertEqual(self.make_block('missing').list_user_pb_answers_by_section(), [])
+
+    def test_primed_answers_read_in_one_query(self):
+        loader = loaders.get_loader('answers', load_answers)
+        loader.prime([('course', 'student', 'first'), ('course', 'other', 'first')])
+        with self.assertNumQueries(1):
+            self.assertEqual(loader.load(('course', 'student', 'second')), 'SECOND')
+            self.assertEqual(loader.load(('course', 'other', 'first')), 'other')
+        # Answers read along with the requested ones are not kept.
+        with self.assertNumQueries(1):
+            self.assertIsNone(loader.load(('course', 'other', 'second')))
+
+    def test_current_user_in_one_query(self):
+        blocks = [self.make_block('first'), self.make_block('second')]
+        with self.assertNumQueries(1):
+            users = [block._get_current_user() for block in blocks]  # pylint: disable=protected-access
+        self.assertEqual(users, [self.user, self.user])
+
+    def test_course_blocks_fetched_once(self):
+        blocks = [self.make_block('first'), self.make_block('second')]
+        with patch('eoc_journal.course_data.fetch_pb_answer_blocks', return_value={'blocks': {}}) as fetch:
+            for block in blocks:
+                block._fetch_pb_answer_blocks()  # pylint: disable=protected-access
+            block._fetch_pb_answer_blocks(all_blocks=True)  # pylint: disable=protected-access
+        self.assertEqual(fetch.call_count, 2)
+        fetch.assert_any_call('course', self.user, False)
+        fetch.assert_any_call('course', self.user, True)
@@ -0,0 +1,69 @@
+"""
+Test listing and searching the pb-answers of a course in the Studio editor.
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from mock import Mock
+
+from eoc_journal.eoc_journal import provide_pb_answer_list
+from eoc_journal.utils import paginate, search_choices
+
+PB_ANSWERS = [
+    {
+        'id': 'block-{}'.format(index),
+        'name': 'answer{}'.format(index),
+        'display_name': 'Answer {}'.format(index),
+        'section': 'Section',
+        'subsection': 'Subsection',
+        'unit': 'Unit {}'.format(index),
+    }
+    for index in range(5)
+]
+
+
+class TestPbAnswerList(TestCase):
+    """
+    Test the pb-answer choices of the `selected_pb_answer_blocks` field.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def make_block(self, course_version):
+        return Mock(
+            _get_course_id=Mock(return_value='course-v1:Org+Course+Run'),
+            _get_course_version=Mock(return_value=course_version),
+            list_pb_answers=Mock(return_value=PB_ANSWERS),
+        )
+
+    def test_labels(self):
+        choices = provide_pb_answer_list(self.make_block(None))
+        self.assertEqual(choices[1], {'display_name': 'Section / Subsection / Unit 1 / Answer 1', 'value': 'block-1'})
+
+    def test_cached_per_course_version(self):
+        block = self.make_block('v1')
+        first = provide_pb_answer_list(block)
+        self.assertEqual(provide_pb_answer_list(block), first)
+        self.assertEqual(block.list_pb_answers.call_count, 1)
+
+        block._get_course_version.return_value = 'v2'  # pylint: disable=protected-access
+        provide_pb_answer_list(block)
+        self.assertEqual(block.list_pb_answers.call_count, 2)
+
+    def test_not_cached_without_course_version(self):
+        block = self.make_block(None)
+        provide_pb_answer_list(block)
+        provide_pb_answer_list(block)
+        self.assertEqual(block.list_pb_answers.call_count, 2)
+
+    def test_search_and_paginate(self):
+        choices = provide_pb_answer_list(self.make_block(None))
+        self.assertEqual(search_choices(choices, 'unit 3 ANSWER'), [choices[3]])
+        self.assertEqual(search_choices(choices, ''), choices)
+
+        page = paginate(choices, 3, 2)
+        self.assertEqual(page, {'results': choices[4:], 'page': 3, 'num_pages': 3, 'count': 5})
+        self.assertEqual(paginate(choices, 10, 2)['page'], 3)
+        self.assertEqual(paginate([], 1, 2), {'results': [], 'page': 1, 'num_pages': 1, 'count': 0})
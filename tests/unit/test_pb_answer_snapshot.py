@@ -0,0 +1,112 @@
+"""
+Test the snapshot of the selected pb-answers stored on the block.
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from mock import Mock, patch
+from xblock.field_data import DictFieldData
+from xblock.test.tools import TestRuntime
+
+from eoc_journal.eoc_journal import EOCJournalXBlock
+
+PB_ANSWERS = [
+    {
+        'id': 'block-{}'.format(index),
+        'name': 'answer{}'.format(index),
+        'display_name': 'Answer {}'.format(index),
+        'question': 'Question {}?'.format(index),
+        'section': 'Section',
+        'subsection': 'Subsection',
+        'unit': 'Unit',
+    }
+    for index in range(3)
+]
+
+
+class TestPbAnswerSnapshot(TestCase):
+    """
+    Test storing and verifying `selected_pb_answer_snapshot`.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.block = EOCJournalXBlock(TestRuntime(services={'user': Mock()}), DictFieldData({}), Mock())
+        patcher = patch.object(EOCJournalXBlock, 'list_pb_answers', return_value=PB_ANSWERS)
+        self.list_pb_answers = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.object(EOCJournalXBlock, '_get_course_version', return_value='v1')
+        self.get_course_version = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.object(EOCJournalXBlock, '_get_current_anonymous_user_id', return_value='learner')
+        self.get_anonymous_user_id = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def save(self, selected):
+        data = {'selected_pb_answer_blocks': selected}
+        self.block.clean_studio_edits(data)
+        for field_name, value in data.items():
+            setattr(self.block, field_name, value)
+
+    def test_snapshot_stored_on_save(self):
+        self.save(['block-2', 'block-0'])
+        self.list_pb_answers.assert_called_once_with(all_blocks=True)
+        self.assertEqual(self.block.selected_pb_answer_snapshot, [
+            {'id': 'block-0', 'section': 'Section', 'name': 'answer0', 'question': 'Question 0?'},
+            {'id': 'block-2', 'section': 'Section', 'name': 'answer2', 'question': 'Question 2?'},
+        ])
+
+    def test_snapshot_verified_once_per_course_version(self):
+        self.save(['block-1'])
+        snapshot = self.block.selected_pb_answer_snapshot
+        self.list_pb_answers.reset_mock()
+
+        # pylint: disable=protected-access
+        self.assertEqual(self.block._get_selected_pb_answers(), snapshot)
+        self.assertEqual(self.block._get_selected_pb_answers(), snapshot)
+        # Once for the pb-answers visible to the learner, once for the verification.
+        self.assertEqual(self.list_pb_answers.call_count, 2)
+
+        self.list_pb_answers.return_value = [dict(PB_ANSWERS[1], question='Edited?')]
+        self.get_course_version.return_value = 'v2'
+        self.assertEqual(self.block._get_selected_pb_answers(), [dict(snapshot[0], question='Edited?')])
+        self.assertEqual(self.list_pb_answers.call_count, 4)
+
+    def test_hidden_pb_answers_left_out(self):
+        self.save(['block-0', 'block-2'])
+        self.list_pb_answers.return_value = PB_ANSWERS[:2]
+        # pylint: disable=protected-access
+        self.assertEqual(self.block._get_selected_pb_answers(), [
+            {'id': 'block-0', 'section': 'Section', 'name': 'answer0', 'question': 'Question 0?'},
+        ])
+
+    def test_selection_without_snapshot(self):
+        self.block.selected_pb_answer_blocks = ['block-1']
+        # pylint: disable=protected-access
+        self.assertEqual(self.block._get_selected_pb_answers(), [
+            {'id': 'block-1', 'section': 'Section', 'name': 'answer1', 'question': 'Question 1?'},
+        ])
+        self.list_pb_answers.assert_called_with()
+
+    def test_reset_selection_completed_by_learners(self):
+        self.save(['block-0'])
+        self.block.selected_pb_answer_blocks = ['block-1', 'block-2']
+        entries = [
+            {'id': 'block-{}'.format(index), 'section': 'Section', 'name': 'answer{}'.format(index),
+             'question': 'Question {}?'.format(index)}
+            for index in range(3)
+        ]
+        # pylint: disable=protected-access
+        for learner, visible, expected, calls in (
+                ('first', PB_ANSWERS[:2], entries[1:2], 2),
+                # Sees a selected pb-answer the first learner could not: the snapshot is completed.
+                ('second', PB_ANSWERS[1:], entries[1:], 2),
+                ('third', PB_ANSWERS[2:], entries[2:], 1),
+        ):
+            self.list_pb_answers.reset_mock()
+            self.list_pb_answers.return_value = visible
+            self.get_anonymous_user_id.return_value = learner
+            self.assertEqual(self.block._get_selected_pb_answers(), expected)
+            self.assertEqual(self.list_pb_answers.call_count, calls)
+
@@ -0,0 +1,72 @@
+"""
+Test the compact records of the pb-answers of a course.
+"""
+
+import pickle
+import unittest
+
+from eoc_journal.pb_answers import PBAnswer, PBAnswerList
+
+
+def course_blocks(count):
+    """
+    Returns (section, subsection, unit, block) tuples of `count` pb-answers in two units.
+    """
+    return [
+        (
+            'Section', 'Subsection', 'Unit {}'.format(index % 2),
+            {
+                'id': 'block-{}'.format(index),
+                'display_name': 'Answer {}'.format(index),
+                'student_view_data': {'name': 'answer{}'.format(index), 'question': 'Question {}?'.format(index)},
+            },
+        )
+        for index in range(count)
+    ]
+
+
+class TestPBAnswerList(unittest.TestCase):
+    """
+    Test `PBAnswer` and `PBAnswerList`.
+    """
+
+    def setUp(self):
+        self.blocks = PBAnswerList.from_course_blocks(course_blocks(4))
+
+    def test_dict_access(self):
+        block = self.blocks[1]
+        self.assertEqual(dict(block), {
+            'section': 'Section',
+            'subsection': 'Subsection',
+            'unit': 'Unit 1',
+            'id': 'block-1',
+            'name': 'answer1',
+            'question': 'Question 1?',
+            'display_name': 'Answer 1',
+        })
+        self.assertEqual(block['name'], block.name)
+        self.assertEqual(block.get('missing', 'default'), 'default')
+        self.assertEqual(block, dict(block))
+        self.assertEqual(dict(block, question='Edited?')['question'], 'Edited?')
+        with self.assertRaises(KeyError):
+            block['missing']  # pylint: disable=pointless-statement
+
+    def test_ancestors_shared(self):
+        self.assertIs(self.blocks[0]._ancestors, self.blocks[2]._ancestors)  # pylint: disable=protected-access
+        self.assertIsNot(self.blocks[0]._ancestors, self.blocks[1]._ancestors)  # pylint: disable=protected-access
+        self.assertIs(self.blocks[0].section, self.blocks[1].section)
+        self.assertFalse(hasattr(self.blocks[0], '__dict__'))
+
+    def test_select(self):
+        self.assertEqual(self.blocks.position('block-2'), 2)
+        self.assertIsNone(self.blocks.position('missing'))
+        selected = self.blocks.select(['block-3', 'missing', 'block-0', 'block-3'])
+        self.assertEqual([block.id for block in selected], ['block-0', 'block-3'])
+
+    def test_pickle(self):
+        blocks = pickle.loads(pickle.dumps(self.blocks, pickle.HIGHEST_PROTOCOL))
+        self.assertIsInstance(blocks, PBAnswerList)
+        self.assertIsInstance(blocks[0], PBAnswer)
+        self.assertEqual(blocks, self.blocks)
+        self.assertEqual(blocks.position('block-3'), 3)
+        self.assertIs(blocks[0]._ancestors, blocks[2]._ancestors)  # pylint: disable=protected-access
@@ -0,0 +1,152 @@
+"""
+PDF rendering benchmark matrix.
+
+Sweeps the rich and plain text renderers, size and speed optimization, the default and a custom
+TTF font, the number of sections, the number of questions per section and the answer length, and
+records render time, output size and peak allocations (tracemalloc) for every combination.
+
+The benchmark is skipped unless EOC_JOURNAL_PDF_BENCHMARK is set. Environment variables:
+
+    EOC_JOURNAL_PDF_BENCHMARK_OUTPUT     Path to write the measured results to (JSON).
+    EOC_JOURNAL_PDF_BENCHMARK_BASELINE   Path to previously saved results to compare against.
+    EOC_JOURNAL_PDF_BENCHMARK_THRESHOLD  Allowed relative regression per metric (default 0.25).
+    EOC_JOURNAL_PDF_BENCHMARK_REPEAT     Number of renders per cell; the fastest is kept (default 3).
+
+Example:
+
+    EOC_JOURNAL_PDF_BENCHMARK=1 EOC_JOURNAL_PDF_BENCHMARK_OUTPUT=baseline.json \\
+        python run_tests.py tests/unit/test_pdf_benchmark.py
+"""
+
+from __future__ import print_function
+import itertools
+import json
+import os
+import random
+import time
+import tracemalloc
+import unittest
+
+from eoc_journal.pdf_generator import (
+    OPTIMIZE_FOR_SIZE,
+    OPTIMIZE_FOR_SPEED,
+    PLAIN_TEXT_RENDERER,
+    RICH_TEXT_RENDERER,
+    build_pdf,
+)
+
+RENDERERS = [RICH_TEXT_RENDERER, PLAIN_TEXT_RENDERER]
+OPTIMIZATIONS = [OPTIMIZE_FOR_SIZE, OPTIMIZE_FOR_SPEED]
+FONTS = [None, 'Vera.ttf']
+SECTION_COUNTS = [1, 10]
+QUESTION_COUNTS = [1, 10]
+ANSWER_LENGTHS = [100, 5000]
+
+METRICS = ['render_seconds', 'output_bytes', 'peak_alloc_bytes']
+
+WORDS = ['lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing', 'elit', 'sed', 'do']
+
+
+def make_answer_sections(section_count, question_count, answer_length):
+    """
+    Returns deterministic answer sections in the format used by the PDF report.
+    """
+    rng = random.Random(section_count * 1000 + question_count)
+    sections = []
+    for section_index in range(section_count):
+        questions = []
+        for question_index in range(question_count):
+            answer = []
+            while sum(len(word) + 1 for word in answer) < answer_length:
+                answer.append(rng.choice(WORDS))
+            questions.append({
+                'question': 'Question {} of section {}?'.format(question_index + 1, section_index + 1),
+                'answer': ' '.join(answer),
+            })
+        sections.append({'name': 'Section {}'.format(section_index + 1), 'questions': questions})
+    return sections
+
+
+def cell_key(renderer, optimize_for, font, section_count, question_count, answer_length):
+    """
+    Returns the string identifying a cell of the benchmark matrix.
+    """
+    return 'renderer={}/optimize={}/font={}/sections={}/questions={}/answer={}'.format(
+        renderer, optimize_for, font or 'default', section_count, question_count, answer_length
+    )
+
+
+def measure(answer_sections, renderer, optimize_for, font, repeat):
+    """
+    Renders the report `repeat` times and returns the fastest render time and output size,
+    along with the peak traced allocation of one extra render.
+
+    Allocations are traced in a separate render because tracemalloc slows rendering down.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.time()
+        pdf = build_pdf(
+            'Benchmark', answer_sections, font_url=font, renderer=renderer, optimize_for=optimize_for
+        )
+        timings.append(time.time() - start)
+
+    tracemalloc.start()
+    try:
+        build_pdf(
+            'Benchmark', answer_sections, font_url=font, renderer=renderer, optimize_for=optimize_for
+        )
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'render_seconds': min(timings),
+        'output_bytes': len(pdf),
+        'peak_alloc_bytes': peak,
+    }
+
+
+@unittest.skipUnless(os.environ.get('EOC_JOURNAL_PDF_BENCHMARK'), 'Set EOC_JOURNAL_PDF_BENCHMARK=1 to run.')
+class TestPdfBenchmark(unittest.TestCase):
+    """
+    Runs the benchmark matrix and fails when any cell regresses beyond the threshold.
+    """
+    threshold = float(os.environ.get('EOC_JOURNAL_PDF_BENCHMARK_THRESHOLD', '0.25'))
+    repeat = max(int(os.environ.get('EOC_JOURNAL_PDF_BENCHMARK_REPEAT', '3')), 1)
+
+    def run_matrix(self):
+        results = {}
+        for renderer, optimize_for, font, sections, questions, length in itertools.product(
+                RENDERERS, OPTIMIZATIONS, FONTS, SECTION_COUNTS, QUESTION_COUNTS, ANSWER_LENGTHS):
+            answer_sections = make_answer_sections(sections, questions, length)
+            key = cell_key(renderer, optimize_for, font, sections, questions, length)
+            results[key] = measure(answer_sections, renderer, optimize_for, font, self.repeat)
+            print('{:<85} {render_seconds:>9.4f}s {output_bytes:>10}B {peak_alloc_bytes:>12}B'.format(
+                key, **results[key]
+            ))
+        return results
+
+    def test_pdf_rendering_matrix(self):
+        results = self.run_matrix()
+
+        output_path = os.environ.get('EOC_JOURNAL_PDF_BENCHMARK_OUTPUT')
+        if output_path:
+            with open(output_path, 'w') as output_file:
+                json.dump(results, output_file, indent=2, sort_keys=True)
+
+        baseline_path = os.environ.get('EOC_JOURNAL_PDF_BENCHMARK_BASELINE')
+        if not baseline_path:
+            return
+        with open(baseline_path) as baseline_file:
+            baseline = json.load(baseline_file)
+
+        regressions = []
+        for key, measured in sorted(results.items()):
+            if key not in baseline:
+                continue
+            for metric in METRICS:
+                limit = baseline[key][metric] * (1 + self.threshold)
+                if measured[metric] > limit:
+                    regressions.append('{} {}: {} > {}'.format(key, metric, measured[metric], limit))
+        self.assertFalse(regressions, 'PDF rendering regressed:\n' + '\n'.join(regressions))
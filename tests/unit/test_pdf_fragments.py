@@ -0,0 +1,91 @@
+"""
+Test building PDF reports from section fragments.
+"""
+
+import unittest
+from io import BytesIO
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from mock import patch
+
+from eoc_journal import pdf_fragments
+from eoc_journal.render_pool import render_pdfs
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+SECTIONS = [
+    {'name': 'Section {}'.format(index), 'questions': [{'question': 'Question?', 'answer': 'Answer {}'.format(index)}]}
+    for index in range(3)
+]
+OPTIONS = {'renderer': 'plain'}
+
+
+@unittest.skipIf(PdfReader is None, 'pypdf is not installed.')
+@override_settings(EOC_JOURNAL_PDF_FRAGMENTS=True, EOC_JOURNAL_PDF_RENDER_WORKERS=0)
+class TestPdfFragments(TestCase):
+    """
+    Test `eoc_journal.pdf_fragments`.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        patcher = patch('eoc_journal.pdf_fragments.render_pdfs', side_effect=render_pdfs)
+        self.render_pdfs = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def rendered_fragments(self):
+        """
+        Returns the (title, sections) of the fragments rendered so far.
+        """
+        return [args for call in self.render_pdfs.call_args_list for args, _ in call[0][0]]
+
+    def test_split_report(self):
+        self.assertEqual(pdf_fragments.split_report('Title', SECTIONS), [
+            ('Title', SECTIONS[:1]),
+            (None, SECTIONS[1:2]),
+            (None, SECTIONS[2:]),
+        ])
+        self.assertEqual(pdf_fragments.split_report('Title', []), [('Title', [])])
+
+    def test_is_enabled(self):
+        self.assertTrue(pdf_fragments.is_enabled())
+        with override_settings(EOC_JOURNAL_PDF_FRAGMENTS=False):
+            self.assertFalse(pdf_fragments.is_enabled())
+
+    def test_build_report(self):
+        pdf = pdf_fragments.build_report('Title', SECTIONS, OPTIONS)
+
+        reader = PdfReader(BytesIO(pdf))
+        self.assertEqual(reader.metadata.title, 'Title')
+        text = [page.extract_text() for page in reader.pages]
+        self.assertEqual(len(text), 3)
+        for index, page_text in enumerate(text):
+            self.assertIn('Answer {}'.format(index), page_text)
+        self.assertIn('Title', text[0])
+        self.assertNotIn('Title', text[1])
+        self.assertEqual(self.rendered_fragments(), pdf_fragments.split_report('Title', SECTIONS))
+
+    def test_only_changed_sections_are_rendered(self):
+        pdf_fragments.build_report('Title', SECTIONS, OPTIONS)
+        self.render_pdfs.reset_mock()
+
+        changed = [SECTIONS[0], SECTIONS[1], dict(SECTIONS[2], questions=[{'question': 'Q?', 'answer': 'New'}])]
+        pdf = pdf_fragments.build_report('Title', changed, OPTIONS)
+
+        self.assertEqual(self.rendered_fragments(), [(None, changed[2:])])
+        self.assertIn('New', PdfReader(BytesIO(pdf)).pages[2].extract_text())
+
+        self.render_pdfs.reset_mock()
+        pdf_fragments.build_report('Title', changed, OPTIONS)
+        self.render_pdfs.assert_not_called()
+
+    @override_settings(EOC_JOURNAL_PDF_FRAGMENT_CACHE_TIMEOUT=0)
+    def test_cache_disabled(self):
+        pdf_fragments.build_report('Title', SECTIONS, OPTIONS)
+        pdf_fragments.build_report('Title', SECTIONS, OPTIONS)
+        self.assertEqual(len(self.rendered_fragments()), 6)
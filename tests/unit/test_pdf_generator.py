@@ -0,0 +1,112 @@
+"""
+Test the PDF report generator.
+"""
+
+import os
+import unittest
+
+from reportlab.lib.utils import rl_isfile
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Paragraph
+from reportlab.rl_config import TTFSearchPath
+
+from eoc_journal.pdf_canvas import LineWrapper, WIDTH
+from eoc_journal.pdf_generator import (
+    OPTIMIZE_FOR_SIZE,
+    OPTIMIZE_FOR_SPEED,
+    PLAIN_TEXT_RENDERER,
+    RICH_TEXT_RENDERER,
+    FlowableStream,
+    build_pdf,
+    get_style_sheet,
+    split_text,
+)
+
+
+class TestPdfGenerator(unittest.TestCase):
+    """
+    Test rendering of PDF reports.
+    """
+
+    def test_split_text_respects_markup(self):
+        text = 'one <b>two <font color="red">three four<br/> five</font> six</b> seven <i>eight</i>'
+        chunks = [chunk for _, chunk in split_text(text, 5)]
+        self.assertGreater(len(chunks), 4)
+        style = get_style_sheet()['Normal']
+        for chunk in chunks:
+            # Raises ValueError on unbalanced markup.
+            Paragraph(chunk, style)
+        self.assertEqual(chunks[1], '<b>two</b>')
+        self.assertEqual(chunks[3], '<b><font color="red">four<br/></font></b>')
+        self.assertEqual(
+            ' '.join(Paragraph(chunk, style).getPlainText() for chunk in chunks),
+            Paragraph(text, style).getPlainText(),
+        )
+
+    def test_split_text_markup_spanning_paragraphs(self):
+        text = '<b>' + 'word ' * 12 + '\n\nmore</b> end'
+        chunks = list(split_text(text, 20))
+        style = get_style_sheet()['Normal']
+        for _, chunk in chunks:
+            Paragraph(chunk, style)
+        self.assertEqual([starts for starts, _ in chunks], [True, False, False, False, True])
+        self.assertEqual(chunks[-1], (True, '<b>more</b> end'))
+
+        # Long answers with markup spanning a blank line render like short ones.
+        answer = '<b>' + 'word ' * 1200 + '\n\n' + 'more ' * 100 + '</b>'
+        sections = [{'name': 'Section', 'questions': [{'question': 'Question?', 'answer': answer}]}]
+        self.assertTrue(build_pdf('Title', sections, long_answer_threshold=5000).startswith(b'%PDF'))
+
+    def test_flowable_stream_buffers_items(self):
+        consumed = []
+
+        def items():
+            for index in range(100):
+                consumed.append(index)
+                yield index
+
+        stream = FlowableStream(items(), buffer_size=10)
+        self.assertEqual(len(consumed), 10)
+        handled = []
+        while len(stream):
+            handled.append(stream[0])
+            del stream[0]
+            self.assertLessEqual(len(consumed) - len(handled), 10)
+        self.assertEqual(handled, list(range(100)))
+
+    def test_build_pdf_with_long_answers(self):
+        answer = '\n\n'.join(' '.join(['word'] * 200) for _ in range(20))
+        sections = [{'name': 'Section', 'questions': [{'question': 'Question?', 'answer': answer}]}]
+        pdf = build_pdf('Title', sections, long_answer_threshold=500)
+        self.assertTrue(pdf.startswith(b'%PDF'))
+
+    def test_build_pdf_with_plain_text_renderer(self):
+        sections = [{'name': 'Section', 'questions': [{'question': 'Question?', 'answer': 'a < b & c'}]}]
+        pdf = build_pdf('Title', sections, renderer=PLAIN_TEXT_RENDERER)
+        self.assertTrue(pdf.startswith(b'%PDF'))
+
+    def test_line_wrapper(self):
+        style = get_style_sheet()['Normal']
+        text = ' '.join(['word'] * 500) + '\nnext line'
+        lines = LineWrapper().wrap(text, style)
+        self.assertGreater(len(lines), 2)
+        self.assertEqual(lines[-1], 'next line')
+        self.assertEqual(' '.join(lines[:-1]), ' '.join(['word'] * 500))
+        for line in lines:
+            self.assertLessEqual(stringWidth(line, style.fontName, style.fontSize), WIDTH)
+
+    def test_optimize_for_size(self):
+        sections = [{'name': 'Section', 'questions': [{'question': 'Question?', 'answer': 'answer ' * 500}]}]
+        for renderer in (RICH_TEXT_RENDERER, PLAIN_TEXT_RENDERER):
+            small = build_pdf('Title', sections, renderer=renderer, optimize_for=OPTIMIZE_FOR_SIZE)
+            fast = build_pdf('Title', sections, renderer=renderer, optimize_for=OPTIMIZE_FOR_SPEED)
+            self.assertLess(len(small), len(fast))
+
+    def test_custom_font_is_subset(self):
+        font_path = next(
+            os.path.join(directory, 'Vera.ttf') for directory in TTFSearchPath
+            if rl_isfile(os.path.join(directory, 'Vera.ttf'))
+        )
+        sections = [{'name': 'Section', 'questions': [{'question': 'Question?', 'answer': 'answer'}]}]
+        pdf = build_pdf('Title', sections, font_url=font_path, optimize_for=OPTIMIZE_FOR_SIZE)
+        self.assertLess(len(pdf), os.path.getsize(font_path))
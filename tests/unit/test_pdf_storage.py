@@ -0,0 +1,191 @@
+"""
+Test storing PDF reports in the Django default storage.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from mock import Mock, patch
+from problem_builder.models import Answer
+from xblock.field_data import DictFieldData
+
+from eoc_journal import pdf_storage
+from eoc_journal.cache import make_key
+from eoc_journal.eoc_journal import EOCJournalXBlock
+
+SECTIONS = [{'name': 'Section', 'questions': [{'question': 'Question?', 'answer': 'Answer'}]}]
+
+
+class TestPdfStorage(TestCase):
+    """
+    Test `eoc_journal.pdf_storage`.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, EOC_JOURNAL_PDF_STORAGE=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        patcher = patch('eoc_journal.pdf_storage.start_sweep')
+        self.start_sweep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_or_store(self):
+        render = Mock(return_value=b'%PDF report')
+        self.assertEqual(pdf_storage.get_or_store('student', 'abcdef', render), b'%PDF report')
+        self.assertEqual(pdf_storage.get_or_store('student', 'abcdef', render), b'%PDF report')
+        self.assertEqual(render.call_count, 1)
+        self.assertTrue(default_storage.exists('eoc_journal/reports/student/abcdef.pdf'))
+        self.start_sweep.assert_called_once_with()
+
+    def test_current_report(self):
+        pdf_storage.get_or_store('student', 'abcdef', lambda: b'%PDF report')
+        pdf_storage.remember_report('journal', 'student', 'fingerprint', 'abcdef')
+        self.assertEqual(pdf_storage.get_current_report('journal', 'student', 'fingerprint'), b'%PDF report')
+        # Reports rendered with other settings or course versions are not served.
+        self.assertIsNone(pdf_storage.get_current_report('journal', 'student', 'other'))
+        self.assertIsNone(pdf_storage.get_current_report('journal', 'other', 'fingerprint'))
+
+        pdf_storage.delete_learner_reports('student')
+        self.assertIsNone(pdf_storage.get_current_report('journal', 'student', 'fingerprint'))
+        self.assertFalse(default_storage.exists('eoc_journal/reports/student/abcdef.pdf'))
+        pdf_storage.delete_learner_reports('unknown')
+
+    def test_register_journals(self):
+        pdf_storage.register_journal('course', 'first', ['answer', 'other'])
+        pdf_storage.register_journal('course', 'second', ['answer'])
+        pdf_storage.register_journal('course', 'first', ['answer'])
+        self.assertEqual(pdf_storage.journals_with_answer('course', 'answer'), ['first', 'second'])
+        self.assertEqual(pdf_storage.journals_with_answer('course', 'other'), ['first'])
+        self.assertEqual(pdf_storage.journals_with_answer('course', 'unknown'), [])
+
+    @override_settings(EOC_JOURNAL_PDF_STORAGE_BACKEND='django.core.files.storage.FileSystemStorage')
+    def test_storage_backend(self):
+        self.assertIsNot(pdf_storage.get_storage(), default_storage)
+        self.assertIs(pdf_storage.get_storage(), pdf_storage.get_storage())
+
+    @override_settings(EOC_JOURNAL_PDF_STORAGE_MAX_BYTES=10, EOC_JOURNAL_PDF_STORAGE_MAX_AGE=100)
+    def test_sweep(self):
+        self._test_sweep()
+
+    @override_settings(
+        EOC_JOURNAL_PDF_STORAGE_MAX_BYTES=10, EOC_JOURNAL_PDF_STORAGE_MAX_AGE=100,
+        TIME_ZONE='America/New_York', USE_TZ=True,
+    )
+    def test_sweep_time_zone(self):
+        self._test_sweep()
+
+    def _test_sweep(self):
+        for digest in ('old', 'downloaded', 'recent', 'newest'):
+            pdf_storage.get_or_store('student', digest, lambda: b'12345')
+        now = time.time()
+        os.utime(default_storage.path(pdf_storage.report_path('student', 'old')), (now - 200, now - 200))
+        os.utime(default_storage.path(pdf_storage.report_path('student', 'downloaded')), (now - 200, now - 200))
+        os.utime(default_storage.path(pdf_storage.report_path('student', 'recent')), (now - 50, now - 50))
+        pdf_storage.record_download('downloaded')
+
+        pdf_storage.sweep()
+
+        # Reports not used for longer than the maximum age are removed, then the least recently
+        # used ones until the reports fit the size cap.
+        remaining = [
+            digest for digest in ('old', 'downloaded', 'recent', 'newest')
+            if default_storage.exists(pdf_storage.report_path('student', digest))
+        ]
+        self.assertEqual(remaining, ['downloaded', 'newest'])
+
+    @override_settings(EOC_JOURNAL_PDF_REGENERATION_DELAY=0.05)
+    @patch('eoc_journal.pdf_storage._get_regeneration_task', Mock(return_value=None))
+    def test_regeneration_debounced(self):
+        called = threading.Event()
+        regenerate = Mock(side_effect=lambda *args: called.set())
+        with patch('eoc_journal.pdf_storage.regenerate_pdf_report', regenerate):
+            for _ in range(3):
+                pdf_storage.schedule_regeneration('journal', 'student')
+            self.assertTrue(called.wait(5))
+            time.sleep(0.1)
+        regenerate.assert_called_once_with('journal', 'student')
+        self.assertEqual(pdf_storage.pending_regenerations(), 0)
+
+    @override_settings(EOC_JOURNAL_PDF_REGENERATION_DELAY=30)
+    def test_regeneration_task(self):
+        task = Mock()
+        pdf_storage.remember_report('journal', 'student', 'fingerprint', 'abcdef')
+        with patch('eoc_journal.pdf_storage._get_regeneration_task', return_value=task), \
+                patch('eoc_journal.pdf_storage.regenerate_pdf_report') as regenerate:
+            for _ in range(2):
+                pdf_storage.schedule_regeneration('journal', 'student')
+            self.assertEqual(task.apply_async.call_count, 2)
+            self.assertEqual(task.apply_async.call_args[1], {'countdown': 30})
+            self.assertIsNone(cache.get(make_key('pdf_current_report', 'journal', 'student')))
+            # Only the latest task regenerates the report.
+            for call in task.apply_async.call_args_list:
+                pdf_storage.run_regeneration(*call[0][0])
+        regenerate.assert_called_once_with('journal', 'student')
+
+    @patch('eoc_journal.pdf_storage.schedule_regeneration')
+    def test_answer_save_schedules_regeneration(self, mock_schedule_regeneration):
+        pdf_storage.register_journal('course', 'journal', ['first', 'second'])
+        Answer.objects.create(student_id='student', course_key='course', name='second', student_input='edited')
+        Answer.objects.create(student_id='student', course_key='course', name='other', student_input='edited')
+        self.assertEqual(mock_schedule_regeneration.call_count, 1)
+        mock_schedule_regeneration.assert_called_with('journal', 'student')
+
+
+class TestStoredReportDownloads(TestCase):
+    """
+    Test downloading stored reports.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, EOC_JOURNAL_PDF_STORAGE=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for target, kwargs in (
+                ('eoc_journal.pdf_storage.start_sweep', {}),
+                ('eoc_journal.pdf_storage._get_regeneration_task', {'return_value': Mock()}),
+        ):
+            patcher = patch(target, **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        runtime = Mock(course_id='course', anonymous_student_id='student')
+        self.block = EOCJournalXBlock(runtime, DictFieldData({}), Mock())
+        for name, value in (
+                ('_get_course_version', 'version'),
+                ('_get_course_name', 'Course'),
+                ('_get_selected_pb_answers', [{'name': 'first'}]),
+                ('list_user_pb_answers_by_section', SECTIONS),
+        ):
+            patcher = patch.object(self.block, name, return_value=value)
+            setattr(self, name.lstrip('_'), patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def test_unchanged_report_served_without_loading_answers(self):
+        pdf = self.block._render_pdf_report(downloaded=True)  # pylint: disable=protected-access
+        self.assertTrue(pdf.startswith(b'%PDF'))
+        self.assertEqual(self.block._render_pdf_report(downloaded=True), pdf)  # pylint: disable=protected-access
+        self.assertEqual(self.list_user_pb_answers_by_section.call_count, 1)
+
+        # Saving an answer of the report loads the answers again.
+        Answer.objects.create(student_id='student', course_key='course', name='first', student_input='edited')
+        self.block._render_pdf_report(downloaded=True)  # pylint: disable=protected-access
+        self.assertEqual(self.list_user_pb_answers_by_section.call_count, 2)
+
+        # So does publishing the course.
+        self.get_course_version.return_value = 'new version'
+        self.block._render_pdf_report(downloaded=True)  # pylint: disable=protected-access
+        self.assertEqual(self.list_user_pb_answers_by_section.call_count, 3)
@@ -0,0 +1,115 @@
+"""
+Test the sampled profiling of the student view and PDF downloads.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from mock import Mock
+from six import StringIO
+
+from eoc_journal import profiling
+from eoc_journal.management.commands.eoc_journal_profiling import Command
+
+
+class Block(object):  # pylint: disable=useless-object-inheritance,too-few-public-methods
+    """
+    A minimal block with a profiled method.
+    """
+
+    def __init__(self):
+        self.scope_ids = Mock(usage_id='block-v1:Org+Course+Run+type@eoc-journal+block@journal')
+        self.runtime = Mock(course_id='course-v1:Org+Course+Run')
+        self.calls = 0
+
+    @profiling.profiled('view')
+    def view(self):
+        """
+        Annotates the profile and returns the number of calls.
+        """
+        self.calls += 1
+        profiling.annotate(answer_count=3, font=None)
+        return self.calls
+
+
+class TestProfiling(TestCase):
+    """
+    Test `eoc_journal.profiling`.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        settings_override = override_settings(EOC_JOURNAL_PROFILE_DIR=self.directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.block = Block()
+
+    def profiles(self):
+        """
+        Returns the metadata of the written profiles.
+        """
+        profiles = []
+        for entry in sorted(os.listdir(self.directory)):
+            if entry.endswith('.json'):
+                self.assertTrue(os.path.exists(os.path.join(self.directory, entry[:-len('.json')] + '.prof')))
+                with open(os.path.join(self.directory, entry)) as metadata:
+                    profiles.append(json.load(metadata))
+        return profiles
+
+    def test_disabled_without_directory(self):
+        with override_settings(EOC_JOURNAL_PROFILE_DIR=None, EOC_JOURNAL_PROFILE_SAMPLE_RATE=1):
+            self.assertEqual(self.block.view(), 1)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    @override_settings(EOC_JOURNAL_PROFILE_SAMPLE_RATE=1)
+    def test_sampled_call_written_with_metadata(self):
+        self.assertEqual(self.block.view(), 1)
+        profiles = self.profiles()
+        self.assertEqual(len(profiles), 1)
+        self.assertEqual(profiles[0]['handler'], 'view')
+        self.assertEqual(profiles[0]['course_id'], 'course-v1:Org+Course+Run')
+        self.assertEqual(profiles[0]['usage_id'], 'block-v1:Org+Course+Run+type@eoc-journal+block@journal')
+        self.assertEqual(profiles[0]['answer_count'], 3)
+        self.assertIsNone(profiles[0]['font'])
+        self.assertTrue(profiles[0]['sampled'])
+
+    @override_settings(EOC_JOURNAL_PROFILE_SAMPLE_RATE=0, EOC_JOURNAL_PROFILE_SLOW_SECONDS=3600)
+    def test_fast_calls_not_written(self):
+        self.block.view()
+        self.assertEqual(self.profiles(), [])
+
+    @override_settings(EOC_JOURNAL_PROFILE_SAMPLE_RATE=0, EOC_JOURNAL_PROFILE_SLOW_SECONDS=0)
+    def test_slow_calls_written(self):
+        self.block.view()
+        profiles = self.profiles()
+        self.assertEqual(len(profiles), 1)
+        self.assertFalse(profiles[0]['sampled'])
+
+    @override_settings(EOC_JOURNAL_PROFILE_SAMPLE_RATE=1, EOC_JOURNAL_PROFILE_MAX_FILES=2)
+    def test_retention(self):
+        for _ in range(4):
+            self.block.view()
+        self.assertEqual(len(self.profiles()), 2)
+        self.assertEqual(len(os.listdir(self.directory)), 4)
+
+    @override_settings(EOC_JOURNAL_PROFILE_SAMPLE_RATE=0)
+    def test_runtime_config(self):
+        stdout = StringIO()
+        call_command(Command(), '--sample-rate', '1', '--max-files', '5', stdout=stdout)
+        self.assertIn('sample_rate: 1', stdout.getvalue())
+        self.assertEqual(profiling.get_config()['max_files'], 5)
+        self.block.view()
+        self.assertEqual(len(self.profiles()), 1)
+
+        call_command(Command(), '--reset', stdout=StringIO())
+        self.assertEqual(profiling.get_config()['sample_rate'], 0)
+        self.block.view()
+        self.assertEqual(len(self.profiles()), 1)
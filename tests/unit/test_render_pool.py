@@ -0,0 +1,95 @@
+"""
+Test rendering PDF reports in the render pool.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from mock import patch
+
+from eoc_journal import render_pool
+from eoc_journal.cache import make_key
+from eoc_journal.render_pool import RenderQueueFull, RenderTimeout, render_pdf, render_pdfs, render_stats
+
+SECTIONS = [{'name': 'Section', 'questions': [{'question': 'Question?', 'answer': 'Answer'}]}]
+
+
+class TestRenderPool(TestCase):
+    """
+    Test `render_pdf`.
+    """
+
+    @override_settings(EOC_JOURNAL_PDF_RENDER_WORKERS=1)
+    def test_render_in_worker_process(self):
+        rendered = render_stats()['rendered']
+        pdf = render_pdf('Title', SECTIONS)
+        self.assertTrue(pdf.startswith(b'%PDF'))
+        stats = render_stats()
+        self.assertEqual(stats['rendered'], rendered + 1)
+        self.assertEqual(stats['queue_length'], 0)
+
+    @override_settings(EOC_JOURNAL_PDF_RENDER_WORKERS=2)
+    def test_render_several_in_parallel(self):
+        rendered = render_stats()['rendered']
+        pdfs = render_pdfs([(('Title', SECTIONS), {}), ((None, SECTIONS), {'renderer': 'plain'})])
+        self.assertEqual(len(pdfs), 2)
+        self.assertTrue(all(pdf.startswith(b'%PDF') for pdf in pdfs))
+        self.assertEqual(render_stats()['rendered'], rendered + 2)
+
+    @override_settings(EOC_JOURNAL_PDF_RENDER_WORKERS=0)
+    def test_render_inline(self):
+        self.assertTrue(render_pdf('Title', SECTIONS).startswith(b'%PDF'))
+
+    @override_settings(EOC_JOURNAL_PDF_RENDER_QUEUE_LIMIT=0, EOC_JOURNAL_PDF_RENDER_RETRY_AFTER=7)
+    def test_rejected_when_queue_full(self):
+        rejected = render_stats()['rejected']
+        with self.assertRaises(RenderQueueFull) as context:
+            render_pdf('Title', SECTIONS)
+        self.assertEqual(context.exception.retry_after, 7)
+        self.assertEqual(render_stats()['rejected'], rejected + 1)
+
+    @override_settings(EOC_JOURNAL_PDF_RENDER_QUEUE_LIMIT=1)
+    def test_queue_limit_shared_between_processes(self):
+        # Another web process holds the only render slot.
+        cache.add(make_key('pdf_render_slot', 0), 'other', 60)
+        self.addCleanup(cache.delete, make_key('pdf_render_slot', 0))
+        with self.assertRaises(RenderQueueFull):
+            render_pdf('Title', SECTIONS)
+
+        cache.delete(make_key('pdf_render_slot', 0))
+        self.assertTrue(render_pdf('Title', SECTIONS).startswith(b'%PDF'))
+        # The slot is released once the render is done.
+        self.assertIsNone(cache.get(make_key('pdf_render_slot', 0)))
+
+    @override_settings(EOC_JOURNAL_PDF_RENDER_WORKERS=1, EOC_JOURNAL_PDF_RENDER_TIMEOUT=0.1)
+    def test_timeout(self):
+        # The render blocks until the web worker gave up waiting for it.
+        finish = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        self.addCleanup(finish.set)
+        with patch('eoc_journal.render_pool._get_executor', return_value=executor), \
+                patch('eoc_journal.render_pool._timed_build_pdf', side_effect=lambda *args: finish.wait()):
+            with self.assertRaises(RenderTimeout):
+                render_pdf('Title', SECTIONS)
+        self.assertEqual(render_stats()['queue_length'], 0)
+        self.assertIsNone(cache.get(make_key('pdf_render_slot', 0)))
+
+    @override_settings(EOC_JOURNAL_PDF_RENDER_QUEUE_LIMIT=1)
+    def test_expired_slot_not_released(self):
+        # The slot of this render expired and was taken by another render before it finished.
+        def build_pdf(*args):
+            cache.set(make_key('pdf_render_slot', 0), 'other', 60)
+            return 0.0, b'%PDF'
+
+        self.addCleanup(cache.delete, make_key('pdf_render_slot', 0))
+        with patch('eoc_journal.render_pool._timed_build_pdf', side_effect=build_pdf):
+            render_pdf('Title', SECTIONS)
+        self.assertEqual(cache.get(make_key('pdf_render_slot', 0)), 'other')
+
+    def test_executor_restarted_when_workers_change(self):
+        executor = render_pool._get_executor(1)  # pylint: disable=protected-access
+        self.assertIs(render_pool._get_executor(1), executor)  # pylint: disable=protected-access
+        self.assertIsNot(render_pool._get_executor(2), executor)  # pylint: disable=protected-access
@@ -0,0 +1,117 @@
+"""
+Test single-flight coalescing of concurrent computations.
+"""
+
+import threading
+
+from django.core.cache import cache
+from django.test import TestCase
+from mock import Mock, patch
+
+from eoc_journal.cache import make_key
+from eoc_journal.course_data import visibility_context
+from eoc_journal.singleflight import SingleFlight, cache_single_flight
+
+COURSE_ID = 'course-v1:Org+Course+Run'
+
+
+class TestSingleFlight(TestCase):
+    """
+    Test `SingleFlight` and `cache_single_flight`.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_concurrent_calls_share_result(self):
+        group = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 'result'
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(group.do(('key',), compute)))
+        leader.start()
+        started.wait(5)
+        followers = [
+            threading.Thread(target=lambda: results.append(group.do(('key',), compute)))
+            for _ in range(3)
+        ]
+        for follower in followers:
+            follower.start()
+        release.set()
+        for thread in [leader] + followers:
+            thread.join(5)
+
+        self.assertEqual(results, ['result'] * 4)
+        self.assertEqual(len(calls), 1)
+        # Calls after the computation finished compute again.
+        self.assertEqual(group.do(('key',), lambda: 'new result'), 'new result')
+
+    def test_errors_are_raised(self):
+        group = SingleFlight()
+        with self.assertRaises(ValueError):
+            group.do(('key',), Mock(side_effect=ValueError))
+        self.assertEqual(group.do(('key',), lambda: 'result'), 'result')
+
+    def test_cache_lock_leader(self):
+        compute = Mock(return_value='result')
+        self.assertEqual(cache_single_flight(('key',), compute, 5), 'result')
+        self.assertIsNone(cache.get(make_key('single_flight_lock', 'key')))
+        self.assertEqual(cache_single_flight(('key',), compute, 5), 'result')
+        self.assertEqual(compute.call_count, 2)
+
+    def test_cache_lock_follower_shares_result(self):
+        cache.add(make_key('single_flight_lock', 'key'), 'token', 5)
+        cache.set(make_key('single_flight_result', 'token'), ('shared',), 5)
+        compute = Mock(return_value='result')
+        self.assertEqual(cache_single_flight(('key',), compute, 5), 'shared')
+        compute.assert_not_called()
+
+    def test_cache_lock_follower_computes_when_result_is_missing(self):
+        cache.add(make_key('single_flight_lock', 'key'), 'token', 5)
+        timer = threading.Timer(0.1, cache.delete, [make_key('single_flight_lock', 'key')])
+        timer.start()
+        self.assertEqual(cache_single_flight(('key',), lambda: 'result', 5), 'result')
+        timer.join()
+
+
+class TestVisibilityContext(TestCase):
+    """
+    Test the key under which Course Blocks API fetches of learners are coalesced.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        patcher = patch('eoc_journal.course_data.get_course_version', return_value='version')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def visibility_context(self, username, groups, library_content=()):
+        """
+        Returns the visibility context of the user `username` in the partition `groups`.
+        """
+        with patch('eoc_journal.course_data.get_user_partition_groups', return_value=groups), \
+                patch('eoc_journal.course_data.get_course_block_usage_keys', return_value=list(library_content)):
+            return visibility_context(COURSE_ID, Mock(username=username))
+
+    def test_learners_in_same_groups_share_context(self):
+        first = self.visibility_context('first', [(50, 1), (51, 2)])
+        self.assertEqual(first, self.visibility_context('second', [(50, 1), (51, 2)]))
+        self.assertNotEqual(first, self.visibility_context('third', [(50, 2), (51, 2)]))
+
+    def test_per_user_context(self):
+        # Course staff see all content.
+        self.assertEqual(self.visibility_context('staff', None), 'staff')
+        self.assertEqual(visibility_context('course', Mock(username='learner')), 'learner')
+
+    def test_randomized_content(self):
+        self.assertEqual(self.visibility_context('learner', [(50, 1)], ['library_content']), 'learner')
@@ -0,0 +1,66 @@
+"""
+Test the process statistics and the staff diagnostics handler.
+"""
+
+import json
+
+from django.core.cache import cache as django_cache
+from django.test import TestCase
+from mock import Mock, patch
+from xblock.field_data import DictFieldData
+
+from eoc_journal import cache, stats
+from eoc_journal.base_api_client import BaseApiClient
+from eoc_journal.eoc_journal import EOCJournalXBlock
+
+
+class TestStats(TestCase):
+    """
+    Test `eoc_journal.stats`.
+    """
+
+    def setUp(self):
+        stats.reset()
+        self.addCleanup(stats.reset)
+        django_cache.clear()
+        self.addCleanup(django_cache.clear)
+
+    def test_cache_layers(self):
+        cache.get_or_set('key', lambda: 1, 60, layer='test')
+        cache.get_or_set('key', lambda: 1, 60, layer='test')
+        cache.get_or_set('key', lambda: 1, 60, layer='test')
+        lru = cache.LRUCache(maxsize=2, name='test_lru')
+        lru.get_or_set('key', lambda: 1)
+
+        caches = stats.snapshot()['caches']
+        self.assertEqual(caches['test'], {'hits': 2, 'misses': 1, 'hit_rate': 2.0 / 3})
+        self.assertEqual(caches['test_lru'], {'hits': 0, 'misses': 1, 'hit_rate': 0.0})
+
+    def test_http_calls(self):
+        with patch.object(BaseApiClient, '_connect'):
+            client = BaseApiClient(Mock(), 'course')
+        client.client = Mock(get=Mock(side_effect=[Mock(status_code=200), Mock(status_code=500), IOError]))
+        client._request('/a')  # pylint: disable=protected-access
+        client._request('/b')  # pylint: disable=protected-access
+        with self.assertRaises(IOError):
+            client._request('/c')  # pylint: disable=protected-access
+
+        http = stats.snapshot()['http']['BaseApiClient']
+        self.assertEqual(http['calls'], 3)
+        self.assertEqual(http['errors'], 2)
+        self.assertGreaterEqual(http['max_seconds'], http['average_seconds'])
+
+    def test_diagnostics_handler(self):
+        block = EOCJournalXBlock(Mock(), DictFieldData({}), Mock())
+        cache.get_or_set('key', lambda: 1, 60, layer='test')
+
+        with patch.object(EOCJournalXBlock, '_user_is_staff', return_value=False):
+            self.assertEqual(block.diagnostics(Mock()).status_code, 403)
+
+        with patch.object(EOCJournalXBlock, '_user_is_staff', return_value=True):
+            response = block.diagnostics(Mock())
+        snapshot = json.loads(response.body.decode('utf-8'))
+        self.assertEqual(snapshot['caches']['test']['misses'], 1)
+        self.assertIn('rendered', snapshot['pdf_renders'])
+        self.assertIn('average_bytes', snapshot['pdf_renders'])
+        self.assertEqual(set(snapshot['queues']), {'pdf_render', 'pdf_regeneration', 'single_flight'})
@@ -0,0 +1,44 @@
+"""
+Test memoizing the data of the student view for the mobile Course Blocks API.
+"""
+
+from django.test import TestCase, override_settings
+from mock import Mock
+from xblock.field_data import DictFieldData
+
+from eoc_journal.eoc_journal import EOCJournalXBlock, static_url_cache, student_view_data_cache
+
+
+class TestStudentViewData(TestCase):
+    """
+    Test `EOCJournalXBlock.student_view_data`.
+    """
+
+    def setUp(self):
+        student_view_data_cache.clear()
+        static_url_cache.clear()
+        self.addCleanup(student_view_data_cache.clear)
+        self.addCleanup(static_url_cache.clear)
+        self.runtime = Mock(course_id='course-v1:Org+Course+Run', spec=['handler_url', 'replace_urls', 'course_id'])
+        self.runtime.handler_url.return_value = '/handler/serve_pdf'
+        self.runtime.replace_urls.side_effect = lambda text: text.replace('/static/', '/asset/')
+        scope_ids = Mock(usage_id='block-v1:Org+Course+Run+type@eoc-journal+block@journal')
+        self.block = EOCJournalXBlock(self.runtime, DictFieldData({
+            'display_key_takeaways_section': True,
+            'key_takeaways_pdf': '/static/takeaways.pdf',
+        }), scope_ids)
+
+    @override_settings(ENV_TOKENS={'LMS_BASE': 'lms.base'}, HTTPS='on')
+    def test_memoized_per_content(self):
+        data = self.block.student_view_data({'extra': 1})
+        self.assertEqual(data['key_takeaways_pdf_url'], 'https://lms.base/asset/takeaways.pdf')
+        self.assertEqual(data['pdf_report_url'], 'https://lms.base/handler/serve_pdf')
+        self.assertEqual(data['extra'], 1)
+        del data['extra']
+        self.assertEqual(self.block.student_view_data(), data)
+        self.assertEqual(self.runtime.replace_urls.call_count, 1)
+
+        self.block.pdf_report_link_text = 'Download'
+        self.assertEqual(self.block.student_view_data()['pdf_report_link_text'], 'Download')
+        # The static URL expansion is still memoized for the course.
+        self.assertEqual(self.runtime.replace_urls.call_count, 1)
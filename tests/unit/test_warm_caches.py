@@ -0,0 +1,78 @@
+"""
+Test the warm_eoc_journal_caches management command.
+"""
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from mock import Mock, patch
+from opaque_keys.edx.keys import CourseKey
+from six import StringIO
+
+from eoc_journal.management.commands.warm_eoc_journal_caches import Command
+from eoc_journal.render_pool import RenderQueueFull
+
+COMMAND_MODULE = 'eoc_journal.management.commands.warm_eoc_journal_caches'
+COURSE_KEY = CourseKey.from_string('course-v1:Org+Course+Run')
+JOURNAL_KEYS = [COURSE_KEY.make_usage_key('eoc-journal', name) for name in ('first', 'second')]
+
+
+class TestWarmCaches(TestCase):
+    """
+    Test warming the caches of the journals of a course.
+    """
+
+    def setUp(self):
+        self.staff = User.objects.create(username='staff')
+        self.learners = [User.objects.create(username='learner{}'.format(index)) for index in range(3)]
+        self.blocks = {}
+
+        def load_block(user, usage_key):
+            return self.blocks.setdefault((user.username, usage_key), Mock())
+
+        for name, kwargs in (
+                ('get_course_block_usage_keys', {'return_value': JOURNAL_KEYS}),
+                ('iter_active_learners', {'return_value': self.learners}),
+                ('load_block_for_user', {'side_effect': load_block}),
+        ):
+            patcher = patch('{}.{}'.format(COMMAND_MODULE, name), **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_warm_course_structure(self):
+        out = StringIO()
+        call_command(Command(), str(COURSE_KEY), username='staff', stdout=out)
+        self.assertEqual(set(self.blocks), {('staff', key) for key in JOURNAL_KEYS})
+        for block in self.blocks.values():
+            block.warm_caches.assert_called_once_with(pdf=False)
+        self.assertIn('Warmed course structure: 2/2 (0 failed)', out.getvalue())
+
+    def test_warm_pdfs(self):
+        out = StringIO()
+        call_command(Command(), str(COURSE_KEY), username='staff', pdfs=True, workers=2, stdout=out)
+        learner_blocks = [block for (username, _), block in self.blocks.items() if username != 'staff']
+        self.assertEqual(len(learner_blocks), 6)
+        for block in learner_blocks:
+            block.warm_caches.assert_called_once_with(pdf=True)
+        self.assertIn('Warmed PDF reports: 6 (0 failed)', out.getvalue())
+
+    @patch(COMMAND_MODULE + '.time.sleep')
+    def test_retry_when_render_queue_full(self, sleep):
+        out = StringIO()
+        with patch(COMMAND_MODULE + '.RENDER_RETRIES', 1):
+            self.learners[1:] = []
+            self.blocks[('learner0', JOURNAL_KEYS[0])] = Mock(**{
+                'warm_caches.side_effect': [RenderQueueFull(3), None],
+            })
+            self.blocks[('learner0', JOURNAL_KEYS[1])] = Mock(**{
+                'warm_caches.side_effect': RenderQueueFull(3),
+            })
+            call_command(Command(), str(COURSE_KEY), username='staff', pdfs=True, stdout=out)
+        sleep.assert_called_with(3)
+        self.assertEqual(sleep.call_count, 2)
+        self.assertIn('Warmed PDF reports: 2 (1 failed)', out.getvalue())
+
+    def test_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command(Command(), str(COURSE_KEY), username='nobody')